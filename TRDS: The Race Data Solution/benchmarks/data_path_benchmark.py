@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 TRDS Data Path Benchmark Suite
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Reproducible benchmarks for the TRDS data paths: pool checkout,
+    RaceManager CRUD, get_all_races at several table sizes, CSV roster
+    import, results ranking (fetch, compute, write back) and the
+    race_summary and race_results views. Fields are generated from the
+    databases/imports rosters with a fixed seed, and every benchmark race
+    is named "TRMS Benchmark ..." and removed afterwards.
+
+    Results are written as JSON (benchmarks/results/<timestamp>.json) and
+    compared with a stored baseline; a benchmark whose median is more
+    than --tolerance slower is reported as a regression and the exit
+    status is 1, so the suite can gate CI.
+
+    Run against a disposable local database, never the race-day one:
+
+        DB_NAME=trms_bench python3 benchmarks/data_path_benchmark.py --setup-schema
+        DB_NAME=trms_bench python3 benchmarks/data_path_benchmark.py --save-baseline
+        DB_NAME=trms_bench python3 benchmarks/data_path_benchmark.py
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import csv
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, date, timedelta
+from pathlib import Path
+from typing import Optional, Dict, List, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from libraries.database.connection import db_manager
+from libraries.models.race import Race, race_manager
+from libraries.models.participant import participant_manager
+from libraries.models.race_time import race_time_manager
+from libraries.results.ranking import compute_places
+from libraries.timing.simulator import RaceDaySimulator, FINISH_PROFILES
+from libraries.utils.paths import TRDS_DIR
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = TRDS_DIR / 'benchmarks'
+RESULTS_DIR = BENCHMARK_DIR / 'results'
+BASELINE_FILE = BENCHMARK_DIR / 'baseline.json'
+SCHEMA_FILES = ('02_create_tables.sql', '03_create_views.sql')
+
+BENCH_PREFIX = "TRMS Benchmark"
+GROUPS = ('pool', 'crud', 'races', 'roster', 'ranking', 'views')
+
+# Medians this much slower than the baseline are regressions
+DEFAULT_TOLERANCE = 0.20
+
+# Differences below this are timer noise, whatever the ratio
+MIN_REGRESSION_MS = 0.05
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Reduce per-run seconds to the reported milliseconds."""
+    ordered = sorted(samples)
+    return {
+        'runs': len(ordered),
+        'min_ms': round(ordered[0] * 1000, 4),
+        'median_ms': round(statistics.median(ordered) * 1000, 4),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 4),
+        'mean_ms': round(statistics.mean(ordered) * 1000, 4),
+    }
+
+def measure(func: Callable, repeat: int, warmup: int = 1) -> List[float]:
+    """Time ``repeat`` calls after ``warmup`` untimed ones."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def apply_schema():
+    """Create the TRDS tables and views in the configured database."""
+    for name in SCHEMA_FILES:
+        script = (TRDS_DIR / 'sql' / 'init' / name).read_text()
+        lines = [line for line in script.splitlines() if not line.strip().startswith('--')]
+        statements = [s.strip() for s in "\n".join(lines).split(';') if s.strip()]
+        with db_manager.transaction() as cursor:
+            for statement in statements:
+                # The scripts select trms_db; stay in the configured database
+                if statement.upper().startswith('USE '):
+                    continue
+                cursor.execute(statement)
+        print(f"✅ Applied {name} ({len(statements)} statements)")
+
+class DataPathBenchmarks:
+    """Benchmark runner; each bench_* method records one group."""
+
+    def __init__(self, repeat: int = 20, sizes: tuple = (100, 1000, 10000), runners: int = 2000,
+                 random_seed: int = 2024):
+        """Initialize benchmark runner."""
+        self.repeat = repeat
+        self.sizes = sizes
+        self.runners = runners
+        self.random_seed = random_seed
+        self.results: Dict[str, Dict] = {}
+        self.simulator = RaceDaySimulator(runners=runners, random_seed=random_seed)
+        self.rng = random.Random(random_seed)
+        self._filler_races = 0
+        self.ranked_race_id: Optional[int] = None
+
+    def record(self, name: str, samples: List[float], **extra):
+        """Store one benchmark's summary."""
+        self.results[name] = {**summarize(samples), **extra}
+        result = self.results[name]
+        print(f"  {name:<34} median {result['median_ms']:>10.3f}ms   p95 {result['p95_ms']:>10.3f}ms")
+
+    def cleanup(self):
+        """Remove every benchmark race with its participants and times."""
+        races = db_manager.execute_query("SELECT race_id FROM races WHERE race_name LIKE %s", (f"{BENCH_PREFIX}%",))
+        removed = sum(race_manager.delete_race(race['race_id']) for race in races)
+        self._filler_races = 0
+        if removed:
+            logger.info(f"Removed {removed} benchmark races")
+
+    def _race(self, label: str) -> Race:
+        """A benchmark race."""
+        return Race(race_name=f"{BENCH_PREFIX} {label}", race_date=date.today(),
+                    race_distances=self.simulator.distance, chip_timing=True, timing_method="rfid")
+
+    def _create_race(self, label: str) -> int:
+        """Create a benchmark race."""
+        race_id = race_manager.create_race(self._race(label))
+        if not race_id:
+            raise RuntimeError(f"Could not create benchmark race {label}")
+        return race_id
+
+    def _fill_races(self, count: int):
+        """Top the races table up with benchmark rows until it holds ``count`` of them."""
+        missing = count - self._filler_races
+        if missing <= 0:
+            return
+        start = date(2000, 1, 1)
+        rows = [(f"{BENCH_PREFIX} filler {self._filler_races + i}",
+                 start + timedelta(days=self.rng.randrange(9000)), 'road_race', '5K')
+                for i in range(missing)]
+        for offset in range(0, len(rows), 1000):
+            db_manager.execute_many(
+                "INSERT INTO races (race_name, race_date, race_type, race_distances) VALUES (%s, %s, %s, %s)",
+                rows[offset:offset + 1000]
+            )
+        self._filler_races = count
+
+    def _write_roster(self, path: Path, race_id: int):
+        """Write the seeded field as a roster CSV in the road race layout."""
+        field = self.simulator.generate_field(race_id)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['bib', 'name', 'dob', 'rfid'])
+            for runner in field:
+                dob = runner.date_of_birth or date(date.today().year - (runner.age_on_race_day or 30), 1, 1)
+                writer.writerow([runner.bib_number, f"{runner.first_name} {runner.last_name}",
+                                 dob.isoformat(), runner.rfid_tag])
+
+    def bench_pool(self):
+        """Checking a connection out of the pool and back."""
+        def checkout():
+            with db_manager.get_connection():
+                pass
+        self.record('pool.checkout', measure(checkout, self.repeat * 10, warmup=5))
+
+    def bench_crud(self):
+        """RaceManager create, read, update and delete, one race at a time."""
+        timings: Dict[str, List[float]] = {'create': [], 'get': [], 'update': [], 'delete': []}
+        for run in range(self.repeat):
+            race = self._race(f"crud {run}")
+
+            started = time.perf_counter()
+            race_id = race_manager.create_race(race)
+            timings['create'].append(time.perf_counter() - started)
+            if not race_id:
+                raise RuntimeError("Could not create benchmark race")
+
+            started = time.perf_counter()
+            race_manager.get_race_by_id(race_id)
+            timings['get'].append(time.perf_counter() - started)
+
+            race.race_venue = "Benchmark Park"
+            started = time.perf_counter()
+            race_manager.update_race(race_id, race)
+            timings['update'].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            race_manager.delete_race(race_id)
+            timings['delete'].append(time.perf_counter() - started)
+
+        for operation, samples in timings.items():
+            self.record(f'race.{operation}', samples)
+
+    def bench_races(self):
+        """get_all_races as the races table grows."""
+        for size in sorted(self.sizes):
+            self._fill_races(size)
+            total = db_manager.execute_query("SELECT COUNT(*) AS n FROM races")[0]['n']
+            self.record(f'race.get_all[{size}]', measure(race_manager.get_all_races, self.repeat), rows=total)
+
+    def bench_roster(self):
+        """CSV roster import into a fresh race."""
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / 'roster.csv'
+            self._write_roster(csv_path, 0)
+
+            samples = []
+            for run in range(max(3, self.repeat // 4)):
+                race_id = self._create_race(f"roster {run}")
+                started = time.perf_counter()
+                imported = participant_manager.import_roster_csv(race_id, csv_path, self.simulator.distance)
+                samples.append(time.perf_counter() - started)
+                race_manager.delete_race(race_id)
+                if imported != self.runners:
+                    raise RuntimeError(f"Roster import wrote {imported} of {self.runners} runners")
+        self.record(f'roster.import[{self.runners}]', samples, rows=self.runners)
+
+    def _timed_race(self) -> int:
+        """A race with the seeded field started and finished."""
+        race_id = self._create_race(f"ranking {self.runners}")
+        participant_manager.import_participants(race_id, self.simulator.generate_field(race_id))
+        runners = db_manager.execute_query(
+            "SELECT participant_id, bib_number FROM participants WHERE race_id = %s ORDER BY participant_id",
+            (race_id,)
+        )
+
+        gun_time = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=8)
+        median, sigma, fastest = FINISH_PROFILES[self.simulator.distance]
+        starts, finishes = [], []
+        for runner in runners:
+            net = max(fastest, median * self.rng.lognormvariate(0, sigma))
+            starts.append((runner['participant_id'], runner['bib_number'], gun_time))
+            finishes.append((runner['participant_id'], runner['bib_number'], gun_time + net, None, None, None))
+        race_time_manager.record_starts(race_id, starts)
+        race_time_manager.record_finishes(race_id, finishes)
+        return race_id
+
+    def bench_ranking(self):
+        """Results ranking: fetch rows, compute places, write them back."""
+        race_id = self._timed_race()
+        self.ranked_race_id = race_id
+        rows = race_time_manager.get_ranking_rows(race_id)
+        placements = compute_places(rows)
+
+        self.record(f'ranking.fetch[{self.runners}]',
+                    measure(lambda: race_time_manager.get_ranking_rows(race_id), self.repeat), rows=len(rows))
+        self.record(f'ranking.compute[{self.runners}]',
+                    measure(lambda: compute_places(rows), self.repeat), rows=len(rows))
+        self.record(f'ranking.write[{self.runners}]',
+                    measure(lambda: race_time_manager.write_placements(race_id, placements),
+                            max(3, self.repeat // 4)), rows=len(placements))
+
+    def bench_views(self):
+        """race_summary and race_results view queries."""
+        race_id = self.ranked_race_id or self._timed_race()
+        queries = {
+            'view.race_summary[race]': ("SELECT * FROM race_summary WHERE race_id = %s", (race_id,)),
+            'view.race_summary[all]': ("SELECT * FROM race_summary", None),
+            'view.race_results[race]': ("SELECT * FROM race_results WHERE race_id = %s", (race_id,)),
+        }
+        for name, (query, params) in queries.items():
+            rows = len(db_manager.execute_query(query, params))
+            self.record(name, measure(lambda: db_manager.execute_query(query, params), self.repeat), rows=rows)
+
+    def run(self, groups: List[str]) -> Dict[str, Dict]:
+        """Run the selected groups in a fixed order."""
+        self.cleanup()
+        try:
+            for group in GROUPS:
+                if group in groups:
+                    print(f"\n▶ {group}")
+                    getattr(self, f'bench_{group}')()
+        finally:
+            self.cleanup()
+        return self.results
+
+def environment_info(args) -> Dict:
+    """What the numbers were measured on."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=str(TRDS_DIR),
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    try:
+        mysql_version = db_manager.execute_query("SELECT VERSION() AS v")[0]['v']
+    except Exception:
+        mysql_version = None
+
+    status = db_manager.get_status()
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'mysql': mysql_version,
+        'host': status['host'],
+        'database': status['database'],
+        'pool_size': status['pool_size'],
+        'repeat': args.repeat,
+        'sizes': list(args.sizes),
+        'runners': args.runners,
+        'random_seed': args.random_seed,
+    }
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[Dict]:
+    """Benchmarks whose median regressed beyond the tolerance."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if not before:
+            continue
+        ratio = result['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+        if ratio > 1 + tolerance and result['median_ms'] - before['median_ms'] > MIN_REGRESSION_MS:
+            regressions.append({'name': name, 'baseline_ms': before['median_ms'],
+                                'median_ms': result['median_ms'], 'ratio': round(ratio, 3)})
+    return regressions
+
+def main() -> int:
+    """Run the benchmark suite."""
+    parser = argparse.ArgumentParser(description="TRDS data path benchmarks")
+    parser.add_argument('--only', nargs='+', choices=GROUPS, default=list(GROUPS), help="Groups to run")
+    parser.add_argument('--repeat', type=int, default=20, help="Timed runs per benchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help="races table sizes for get_all_races")
+    parser.add_argument('--runners', type=int, default=2000, help="Field size for roster and ranking")
+    parser.add_argument('--random-seed', type=int, default=2024)
+    parser.add_argument('--output', type=Path, help="Results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE, help="Baseline to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed median slowdown before flagging (0.2 = 20%%)")
+    parser.add_argument('--setup-schema', action='store_true', help="Create the TRDS tables and views, then exit")
+    parser.add_argument('--allow-main-db', action='store_true', help="Allow running against trms_db")
+    parser.add_argument('--allow-cloud', action='store_true', help="Allow running against the cloud database")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if db_manager.is_cloud_connected and not args.allow_cloud:
+        print("❌ Refusing to benchmark the CLOUD database. Use a local database or pass --allow-cloud.")
+        return 1
+    if db_manager.config.database == 'trms_db' and not args.allow_main_db:
+        print("❌ Refusing to benchmark trms_db. Set DB_NAME to a disposable database or pass --allow-main-db.")
+        return 1
+
+    if args.setup_schema:
+        apply_schema()
+        return 0
+
+    # The slow query log's EXPLAINs would compete with the measured queries
+    db_manager.config.slow_query_ms = 0
+
+    suite = DataPathBenchmarks(args.repeat, tuple(args.sizes), args.runners, args.random_seed)
+    document = {'environment': environment_info(args), 'results': suite.run(args.only)}
+
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2))
+    print(f"\n📄 Results written to {output}")
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(document, indent=2))
+        print(f"📌 Baseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print("ℹ️  No baseline to compare against; run with --save-baseline to store one")
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    regressions = compare(document['results'], baseline['results'], args.tolerance)
+    print(f"\nCompared with baseline from {baseline['environment']['timestamp']} "
+          f"({baseline['environment'].get('commit') or 'unknown commit'})")
+    if not regressions:
+        print(f"✅ No regressions beyond {args.tolerance:.0%}")
+        return 0
+
+    print(f"❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+    for regression in regressions:
+        print(f"  {regression['name']:<34} {regression['baseline_ms']:>10.3f}ms → "
+              f"{regression['median_ms']:>10.3f}ms  (x{regression['ratio']})")
+    return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+📜 TRMS Logging Overhead Benchmark
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Measures what one logger.info call costs the calling thread with a
+    plain synchronous FileHandler, a synchronous RotatingFileHandler and
+    the queued setup from libraries.utils.log_setup (text and JSON): mean,
+    p99 and worst call, plus how long the listener then needs to write the
+    backlog. A small --max-bytes makes rollovers happen during the run.
+    --rate paces events like a busy race-day process; without it every
+    event is logged in one burst, where the listener competes with the
+    caller for the GIL. Run from the TRDS directory:
+
+        python3 benchmarks/logging_benchmark.py --events 100000 --max-bytes 1048576 --rate 5000
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from libraries.utils.config import config
+from libraries.utils.log_setup import setup_logging, shutdown_logging
+
+def _reset_root():
+    """Detach every handler from the root logger."""
+    shutdown_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.setLevel(logging.INFO)
+
+def _emit(events: int, rate: float) -> List[int]:
+    """Log events from this thread, paced at ``rate`` per second; returns nanoseconds per call."""
+    logger = logging.getLogger('trms.benchmark')
+    clock = time.perf_counter_ns
+    samples = []
+    begin = time.perf_counter()
+    for i in range(events):
+        if rate and i % 50 == 0:
+            ahead = begin + i / rate - time.perf_counter()
+            if ahead > 0:
+                time.sleep(ahead)
+        started = clock()
+        logger.info("Read bib %s at %s from reader %d", 1000 + i % 5000, "finish", i % 4)
+        samples.append(clock() - started)
+    return samples
+
+def run_sync(handler: logging.Handler, events: int, rate: float) -> List[int]:
+    """Per-call cost with a synchronous handler."""
+    _reset_root()
+    handler.setFormatter(logging.Formatter(config.logging.format))
+    logging.getLogger().addHandler(handler)
+    samples = _emit(events, rate)
+    _reset_root()
+    return samples
+
+def run_queued(log_path: Path, events: int, rate: float, json_format: bool):
+    """Per-call cost with the queued setup; returns (samples, drain seconds)."""
+    _reset_root()
+    setup_logging(log_path=log_path, json_format=json_format, console=False)
+    samples = _emit(events, rate)
+    started = time.perf_counter()
+    shutdown_logging()
+    return samples, time.perf_counter() - started
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Per-event logging overhead")
+    parser.add_argument('--events', type=int, default=100000)
+    parser.add_argument('--max-bytes', type=int, default=config.logging.max_bytes,
+                        help="Rotation size for the rotating setups")
+    parser.add_argument('--rate', type=float, default=0, help="Events per second (0 = one burst)")
+    args = parser.parse_args()
+    events = args.events
+    config.logging.max_bytes = args.max_bytes
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp_dir = Path(tmp)
+        results = [
+            ('FileHandler (sync)', run_sync(logging.FileHandler(tmp_dir / 'plain.log'), events, args.rate), None),
+            ('RotatingFileHandler (sync)', run_sync(
+                RotatingFileHandler(tmp_dir / 'rotating.log', maxBytes=config.logging.max_bytes,
+                                    backupCount=config.logging.backup_count), events, args.rate), None),
+        ]
+        for label, json_format in (('queued text', False), ('queued JSON', True)):
+            samples, drain = run_queued(tmp_dir / f"{label.replace(' ', '_')}.log", events, args.rate, json_format)
+            results.append((label, samples, drain))
+
+    pace = f"{args.rate:.0f}/s" if args.rate else "one burst"
+    print(f"\n{events} events ({pace}), rotating at {args.max_bytes} bytes")
+    print(f"{'Setup':<28} {'mean':>9} {'p99':>9} {'worst':>10} {'drain after':>12}")
+    print("-" * 72)
+    for label, samples, drain in results:
+        ordered = sorted(samples)
+        p99 = ordered[int(len(ordered) * 0.99)]
+        drain_text = f"{drain * 1000:>10.0f}ms" if drain is not None else f"{'-':>12}"
+        print(f"{label:<28} {statistics.mean(samples) / 1000:>7.2f}µs {p99 / 1000:>7.2f}µs "
+              f"{ordered[-1] / 1e6:>8.2f}ms {drain_text}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🔎 TRMS Participant Search Benchmark
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Checks the typeahead budget of libraries.search.index: a query should
+    answer in under 5 ms on a history of a million participant entries.
+    The history is generated in memory with a fixed seed (names from the
+    databases/imports rosters, first and last names mixed independently,
+    a few dozen cities, bibs reused across races); nothing is read from
+    or written to the database, though importing the library connects to
+    the configured one like every TRDS process. Each query class (single
+    prefix, first and last name, name and city, bib, a two-word query
+    nobody matches) is timed as the user types it, one keystroke at a
+    time. The exit status is 1 when a class's p99 is over --budget-ms.
+    Run from the TRDS directory:
+
+        python3 benchmarks/search_benchmark.py --entries 1000000
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import csv
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from libraries.search.index import SearchIndex
+from libraries.utils.paths import TRDS_DIR
+
+IMPORTS_DIR = TRDS_DIR / 'databases' / 'imports'
+
+CITIES = (
+    'Indianapolis', 'Carmel', 'Fishers', 'Noblesville', 'Westfield', 'Zionsville', 'Greenwood',
+    'Bloomington', 'Lafayette', 'Muncie', 'Anderson', 'Kokomo', 'Franklin', 'Avon', 'Plainfield',
+    'Brownsburg', 'Lebanon', 'Columbus', 'Shelbyville', 'Martinsville', 'Danville', 'Mooresville',
+    'Richmond', 'Terre Haute', 'Evansville', 'Fort Wayne', 'South Bend', 'Elkhart', 'Goshen',
+    'Valparaiso', 'Crown Point', 'Merrillville', 'Chicago', 'Louisville', 'Cincinnati', 'Dayton',
+)
+
+DISTANCES = ('5K', '10K', 'Half Marathon', 'Marathon')
+
+# Default per-query budget in milliseconds
+DEFAULT_BUDGET_MS = 5.0
+
+def load_names() -> tuple:
+    """First and last names from the import rosters."""
+    firsts, lasts = set(), set()
+    for path in sorted(IMPORTS_DIR.glob('*.csv')):
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                first, _, last = (row.get('name') or '').strip().partition(' ')
+                if first and last:
+                    firsts.add(first)
+                    lasts.add(last)
+    if not firsts:
+        raise ValueError(f"No roster names found in {IMPORTS_DIR}")
+    return sorted(firsts), sorted(lasts)
+
+def generate_rows(entries: int, per_race: int, rng: random.Random) -> List[Dict]:
+    """Search query rows for a synthetic multi-season history."""
+    firsts, lasts = load_names()
+    rows = []
+    first_race = date(2024, 12, 31)
+    for participant_id in range(1, entries + 1):
+        race_id = (participant_id - 1) // per_race + 1
+        finished = rng.random() < 0.9
+        rows.append({
+            'participant_id': participant_id,
+            'race_id': race_id,
+            'race_name': f"Benchmark Race {race_id}",
+            'race_date': first_race - timedelta(days=race_id),
+            'first_name': rng.choice(firsts),
+            'last_name': rng.choice(lasts),
+            'city': rng.choice(CITIES),
+            'state': 'IN',
+            'bib_number': str(rng.randint(1, per_race * 2)),
+            'distance': rng.choice(DISTANCES),
+            'registration_status': 'confirmed',
+            'net_time': timedelta(seconds=rng.randint(900, 18000)) if finished else None,
+            'overall_place': rng.randint(1, per_race) if finished else None,
+            'changed_at': datetime(2025, 1, 1),
+        })
+    return rows
+
+def build_index(rows: List[Dict]) -> SearchIndex:
+    """Fill an index from generated rows the way SearchIndex.rebuild does."""
+    index = SearchIndex(path=Path('/dev/null'))
+    index._apply_rows(rows)
+    index._vocab = sorted(index._postings)
+    index._race_ids = {row['race_id'] for row in rows}
+    return index
+
+def keystrokes(query: str) -> List[str]:
+    """Every prefix of a query from two characters on, as typed."""
+    return [query[:end] for end in range(2, len(query) + 1) if not query[end - 1].isspace()]
+
+def query_classes(rows: List[Dict], rng: random.Random, samples: int) -> Dict[str, List[str]]:
+    """Typed queries per class, drawn from the generated history."""
+    picks = [rng.choice(rows) for _ in range(samples)]
+    return {
+        'single prefix': [q for row in picks for q in keystrokes(row['last_name'])],
+        'first + last': [q for row in picks for q in keystrokes(f"{row['first_name']} {row['last_name']}")],
+        'name + city': [q for row in picks for q in keystrokes(f"{row['last_name']} {row['city']}")],
+        'bib': [q for row in picks for q in keystrokes(row['bib_number'])],
+        'no match': [q for row in picks for q in keystrokes(f"{row['last_name']} qqzz")],
+    }
+
+def measure(index: SearchIndex, queries: List[str], limit: int) -> List[float]:
+    """Seconds per query."""
+    samples = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, limit=limit)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Typeahead latency on a large participant history")
+    parser.add_argument('--entries', type=int, default=1000000, help="Participant entries in the history")
+    parser.add_argument('--per-race', type=int, default=1000, help="Entries per race")
+    parser.add_argument('--samples', type=int, default=200, help="Typed queries per class")
+    parser.add_argument('--limit', type=int, default=10, help="Hits per query")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS, help="p99 budget per query")
+    parser.add_argument('--seed', type=int, default=2024)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    started = time.perf_counter()
+    rows = generate_rows(args.entries, args.per_race, rng)
+    index = build_index(rows)
+    print(f"🔎 Indexed {len(index)} entries, {len(index._vocab)} words "
+          f"in {time.perf_counter() - started:.1f}s")
+
+    classes = query_classes(rows, rng, args.samples)
+    del rows
+
+    over_budget = []
+    print(f"\n{'Query class':<16} {'queries':>8} {'median':>9} {'p99':>9} {'worst':>9}")
+    print("-" * 56)
+    for label, queries in classes.items():
+        measure(index, queries[:50], args.limit)
+        ordered = sorted(measure(index, queries, args.limit))
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+        print(f"{label:<16} {len(ordered):>8} {statistics.median(ordered) * 1000:>7.3f}ms "
+              f"{p99:>7.3f}ms {ordered[-1] * 1000:>7.3f}ms")
+        if p99 > args.budget_ms:
+            over_budget.append(label)
+
+    if over_budget:
+        print(f"\n❌ p99 over {args.budget_ms}ms: {', '.join(over_budget)}")
+        return 1
+    print(f"\n✅ Every query class within {args.budget_ms}ms at p99")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
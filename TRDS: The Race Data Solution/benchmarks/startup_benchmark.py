@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+⏱️ TRMS Startup Import Benchmark
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Measures how long each entry point takes to import in a fresh
+    interpreter, with the config snapshot bypassed (TRMS_CONFIG_CACHE=0)
+    and with it warm. Run from the TRDS directory:
+
+        python3 benchmarks/startup_benchmark.py --runs 10
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+TRDS_DIR = Path(__file__).resolve().parent.parent
+TRMS_BASE = TRDS_DIR.parent
+CONSOLE_DIR = TRMS_BASE / 'TRRS: The Race Registration Solution' / 'console'
+
+# (label, sys.path entry, module)
+ENTRY_POINTS = [
+    ('config', TRDS_DIR, 'libraries.utils.config'),
+    ('database', TRDS_DIR, 'libraries.database.connection'),
+    ('models', TRDS_DIR, 'libraries.models.participant'),
+    ('api server', TRDS_DIR, 'libraries.api.server'),
+    ('mailer', TRDS_DIR, 'libraries.registration.mailer'),
+    ('trrs console', CONSOLE_DIR, 'race_registration_console'),
+]
+
+CHILD = """
+import sys, time
+sys.path.insert(0, {path!r})
+started = time.perf_counter()
+try:
+    import {module}
+    print(f"ok {{time.perf_counter() - started:.6f}}")
+except BaseException as e:
+    print(f"error {{type(e).__name__}}: {{str(e)[:80]}}")
+"""
+
+def time_import(path: Path, module: str, snapshot: bool) -> Optional[float]:
+    """Import a module in a fresh interpreter; returns seconds or None."""
+    env = dict(os.environ, TRMS_BASE=str(TRMS_BASE), TRMS_CONFIG_CACHE='1' if snapshot else '0')
+    result = subprocess.run([sys.executable, '-c', CHILD.format(path=str(path), module=module)],
+                            capture_output=True, text=True, env=env, cwd=str(TRDS_DIR))
+    line = result.stdout.strip().splitlines()[-1] if result.stdout.strip() else 'error no output'
+    if not line.startswith('ok '):
+        print(f"   ⚠️  {module}: {line}")
+        return None
+    return float(line.split()[1])
+
+def measure(path: Path, module: str, snapshot: bool, runs: int) -> List[float]:
+    """Time several fresh imports."""
+    if snapshot:
+        # Make sure the snapshot exists before timing
+        time_import(path, module, True)
+    samples = []
+    for _ in range(runs):
+        seconds = time_import(path, module, snapshot)
+        if seconds is None:
+            break
+        samples.append(seconds)
+    return samples
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Import-time benchmark for TRMS entry points")
+    parser.add_argument('--runs', type=int, default=10, help="Fresh interpreters per measurement")
+    args = parser.parse_args()
+
+    print(f"\n{'Entry point':<16} {'no snapshot':>12} {'snapshot':>12} {'saved':>8}")
+    print("-" * 52)
+    results: Dict[str, tuple] = {}
+    for label, path, module in ENTRY_POINTS:
+        cold = measure(path, module, False, args.runs)
+        warm = measure(path, module, True, args.runs) if cold else []
+        if not cold or not warm:
+            print(f"{label:<16} {'failed':>12}")
+            continue
+        cold_ms = statistics.median(cold) * 1000
+        warm_ms = statistics.median(warm) * 1000
+        results[label] = (cold_ms, warm_ms)
+        print(f"{label:<16} {cold_ms:>10.1f}ms {warm_ms:>10.1f}ms {cold_ms - warm_ms:>6.1f}ms")
+
+    return 0 if results else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
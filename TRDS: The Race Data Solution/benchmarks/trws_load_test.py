@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+📈 TRWS Local Load Test
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Starts the TRWS server with 1, 2, 4... workers and drives it with
+    keep-alive HTTP clients to show how throughput scales with the worker
+    count. Run from the TRDS directory against a local database:
+
+        python3 benchmarks/trws_load_test.py --workers 1 2 4 --clients 64
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List
+
+TRDS_DIR = Path(__file__).resolve().parent.parent
+
+async def read_body(reader: asyncio.StreamReader, headers: Dict[str, str]) -> int:
+    """Consume a response body, fixed-length or chunked; returns its size."""
+    if 'chunked' in headers.get('transfer-encoding', '').lower():
+        size = 0
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            chunk = int(line.split(b";", 1)[0].strip(), 16)
+            if chunk == 0:
+                # Trailer fields, if any, end with an empty line
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return size
+            await reader.readexactly(chunk + 2)
+            size += chunk
+
+    length = int(headers.get('content-length') or 0)
+    if length:
+        await reader.readexactly(length)
+    return length
+
+async def client(host: str, port: int, path: str, deadline: float, conditional: bool, stats: Dict):
+    """One keep-alive client issuing requests until the deadline."""
+    reader, writer = await asyncio.open_connection(host, port)
+    etag = None
+    try:
+        while time.perf_counter() < deadline:
+            request = f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+            if conditional and etag:
+                request += f"If-None-Match: {etag}\r\n"
+            writer.write((request + "\r\n").encode('latin-1'))
+            await writer.drain()
+
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode('latin-1').split("\r\n")
+            status = int(lines[0].split(" ")[1])
+            headers = {k.strip().lower(): v.strip() for k, _, v in (line.partition(":") for line in lines[1:] if line)}
+            await read_body(reader, headers)
+
+            etag = headers.get('etag', etag)
+            stats[status] = stats.get(status, 0) + 1
+    finally:
+        writer.close()
+
+async def drive(host: str, port: int, path: str, clients: int, duration: float, conditional: bool) -> Dict:
+    """Run all clients concurrently."""
+    stats: Dict[int, int] = {}
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(client(host, port, path, deadline, conditional, stats) for _ in range(clients)))
+    return stats
+
+def wait_ready(url: str, timeout: float = 30.0):
+    """Wait for the server to answer its health check."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except Exception:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server did not become ready at {url}")
+
+def run_level(workers: int, args) -> Dict:
+    """Start a server with N workers, load it and stop it."""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'libraries.api.server', '--host', args.host,
+         '--port', str(args.port), '--workers', str(workers), '--no-rate-limit'],
+        cwd=TRDS_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        wait_ready(f"http://{args.host}:{args.port}/healthz")
+        stats = asyncio.run(drive(args.host, args.port, args.path, args.clients, args.duration, args.conditional))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    total = sum(stats.values())
+    return {'workers': workers, 'requests': total, 'rps': total / args.duration, 'statuses': stats}
+
+def main(argv: List[str] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="TRWS throughput vs worker count")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--clients', type=int, default=64, help="Concurrent keep-alive connections")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds per worker level")
+    parser.add_argument('--path', default='/api/trrs/races')
+    parser.add_argument('--conditional', action='store_true', help="Send If-None-Match (304 path)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=18000)
+    args = parser.parse_args(argv)
+
+    results = [run_level(workers, args) for workers in args.workers]
+    baseline = results[0]['rps'] or 1.0
+
+    print("\n" + "="*60)
+    print(f"📈 TRWS LOAD TEST  {args.path}  ({args.clients} clients, {args.duration:.0f}s each)")
+    print("="*60)
+    print(f"{'Workers':<10} {'Requests':<12} {'Req/s':<12} {'Scaling':<10} Statuses")
+    print("-"*60)
+    for result in results:
+        print(f"{result['workers']:<10} {result['requests']:<12} {result['rps']:<12.0f} "
+              f"{result['rps'] / baseline:<10.2f} {result['statuses']}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
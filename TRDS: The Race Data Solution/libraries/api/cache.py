@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🗃️ TRMS API Response Cache
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Shared in-process cache of rendered API responses with strong ETags.
+    Entries are dropped when the underlying data changes, so conditional
+    GETs can be answered with 304 without touching the database.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import hashlib
+import threading
+import time
+from typing import Optional, Dict, List, NamedTuple
+
+class CachedResponse(NamedTuple):
+    """Rendered response body and its validator."""
+    etag: str
+    body: bytes
+    content_type: str
+    created: float
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from the values that identify a representation."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'"{digest[:32]}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    return any((candidate[2:] if candidate.startswith('W/') else candidate) == opaque
+               for candidate in candidates)
+
+class ResponseCache:
+    """Thread-safe response cache keyed by request path."""
+
+    def __init__(self, max_entries: int = 1024):
+        """Initialize response cache."""
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: Dict[str, CachedResponse] = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Get a cached response."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key: str, etag: str, body: bytes, content_type: str = 'application/json',
+            generation: Optional[int] = None) -> CachedResponse:
+        """Store a rendered response.
+
+        Pass the ``generation`` read before rendering; if the cache was
+        invalidated while rendering, the response is returned but not stored.
+        """
+        entry = CachedResponse(etag, body, content_type, time.monotonic())
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return entry
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                # Drop the oldest entry; dicts keep insertion order
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = entry
+        return entry
+
+    def invalidate(self, prefix: str = ""):
+        """Drop every entry whose key starts with prefix."""
+        with self._lock:
+            self.generation += 1
+            if not prefix:
+                self._entries.clear()
+                return
+            stale: List[str] = [key for key in self._entries if key.startswith(prefix)]
+            for key in stale:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache statistics."""
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🏁 TRMS Race Read API
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Framework-independent read API over RaceManager for TRWS. Responses
+    carry strong ETags derived from races.updated_at and a digest of the
+    body (updated_at only has one-second resolution) and are kept in a
+    shared response cache, so repeat and conditional requests are served
+    from memory. The cache is dropped on race writes in this process and
+    revalidated across processes with a cheap COUNT/MAX(updated_at) probe.
+
+        GET /api/trrs/races
+        GET /api/trrs/races/{id}
+        GET /api/trrs/races/{id}/results?format=ndjson&limit=500&cursor=...
+
+    Result lists are streamed from a server-side cursor rather than cached.
+    Database work goes through DatabaseManager.public_reads so spectator
+    traffic cannot take the connections reserved for timing writes; when
+    the pool is busy cached responses are served as they are and anything
+    else is shed with 503.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Optional, Dict, List, NamedTuple, Tuple, Union
+from urllib.parse import parse_qs
+
+from ..database.connection import db_manager, PoolBusyError, settled_version
+from ..models.race import race_manager
+from ..utils.config import config
+from .cache import ResponseCache, CachedResponse, make_etag, etag_matches
+from .streaming import StreamingResponse, NDJSON, accepts_gzip, decode_cursor, encode_cursor, stream_rows
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class APIResponse(NamedTuple):
+    """HTTP response produced by an API handler."""
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+def json_response(status: int, payload, extra_headers: Optional[Dict[str, str]] = None) -> APIResponse:
+    """Build an uncached JSON response."""
+    body = json.dumps(payload, default=str).encode('utf-8')
+    headers = {'Content-Type': 'application/json', 'Content-Length': str(len(body))}
+    headers.update(extra_headers or {})
+    return APIResponse(status, headers, body)
+
+def busy_response() -> APIResponse:
+    """Shed a request while the database is busy."""
+    return json_response(503, {'error': 'Server busy, please retry'}, {'Retry-After': '1'})
+
+MAX_PAGE_SIZE = 5000
+
+# Finishers in place order, then everyone else; keyset is (unplaced, place, time_id)
+RESULTS_QUERY = """
+    SELECT rt.time_id, rt.participant_id,
+           CONCAT(p.first_name, ' ', p.last_name) AS participant_name,
+           rt.bib_number, p.distance, p.gender, p.age_group, p.city, p.state,
+           rt.net_time, rt.overall_place, rt.gender_place, rt.age_group_place, rt.timing_status
+    FROM race_times rt
+    LEFT JOIN participants p ON p.participant_id = rt.participant_id AND p.race_id = rt.race_id
+    WHERE rt.race_id = %s AND rt.timing_status IN ('finished', 'dnf', 'dsq')
+"""
+
+class RaceAPI:
+    """Cached, conditional-GET aware race endpoints."""
+
+    def __init__(self, cache: Optional[ResponseCache] = None, revalidate_seconds: float = 5.0,
+                 prefix: Optional[str] = None):
+        """Initialize race API."""
+        self.cache = cache or ResponseCache()
+        self.revalidate_seconds = revalidate_seconds
+        self.prefix = (prefix or config.web.trrs_api_url).rstrip('/') + '/races'
+
+        self._version: Optional[Tuple] = None
+        self._version_checked = 0.0
+        self._version_lock = threading.Lock()
+
+        race_manager.add_change_listener(self._on_race_change)
+
+    def _on_race_change(self, race_id: Optional[int]):
+        """Drop cached race responses after a write in this process."""
+        self.cache.invalidate(self.prefix)
+        self._version_checked = 0.0
+
+    def _check_version(self) -> Tuple:
+        """Revalidate the cache against the races table at most once per interval."""
+        now = time.monotonic()
+        if self._version is not None and now - self._version_checked < self.revalidate_seconds:
+            return self._version
+
+        with self._version_lock:
+            if self._version is not None and now - self._version_checked < self.revalidate_seconds:
+                return self._version
+
+            # With a known version, keep serving it rather than wait for the pool
+            with db_manager.public_reads(timeout=0 if self._version is not None else None):
+                rows = db_manager.execute_query(
+                    f"SELECT COUNT(*) AS race_count, MAX(updated_at) AS last_updated, NOW() AS now "
+                    f"FROM {race_manager.table_name}"
+                )
+            row = rows[0]
+            version = (row['race_count'], row['last_updated'])
+
+            # Another process wrote a race since the last probe
+            if version != self._version:
+                self.cache.invalidate(self.prefix)
+
+            self._version = settled_version(version, row['last_updated'], row['now'])
+            self._version_checked = time.monotonic()
+            return version
+
+    def handle(self, method: str, path: str,
+               headers: Optional[Dict[str, str]] = None) -> Union[APIResponse, StreamingResponse]:
+        """Route a request."""
+        headers = {key.lower(): value for key, value in (headers or {}).items()}
+        path, _, query_string = path.partition('?')
+        path = path.rstrip('/')
+
+        if not path.startswith(self.prefix):
+            return json_response(404, {'error': 'Not found'})
+        if method not in ('GET', 'HEAD'):
+            return json_response(405, {'error': 'Method not allowed'}, {'Allow': 'GET, HEAD'})
+
+        try:
+            version = self._check_version()
+        except PoolBusyError:
+            if self._version is None:
+                return busy_response()
+            version = self._version
+        except Exception as e:
+            logger.error(f"Race API version probe failed: {e}")
+            return json_response(503, {'error': 'Database unavailable'})
+
+        remainder = path[len(self.prefix):]
+        try:
+            if remainder == '':
+                entry = self._get_or_render(path, lambda: self._render_list(version))
+            elif remainder.startswith('/') and remainder[1:].isdigit():
+                race_id = int(remainder[1:])
+                entry = self._get_or_render(path, lambda: self._render_race(race_id))
+            elif remainder.startswith('/') and remainder.endswith('/results') and remainder[1:-8].isdigit():
+                return self._stream_results(int(remainder[1:-8]), parse_qs(query_string), headers,
+                                            head_only=(method == 'HEAD'))
+            else:
+                return json_response(404, {'error': 'Not found'})
+        except PoolBusyError:
+            return busy_response()
+
+        if entry is None:
+            return json_response(404, {'error': 'Race not found'})
+        return self._respond(entry, headers, head_only=(method == 'HEAD'))
+
+    def _get_or_render(self, key: str, render) -> Optional[CachedResponse]:
+        """Serve from the cache or render and store."""
+        entry = self.cache.get(key)
+        if entry is not None:
+            return entry
+
+        generation = self.cache.generation
+        with db_manager.public_reads():
+            rendered = render()
+        if rendered is None:
+            return None
+        version_tag, payload = rendered
+        body = json.dumps(payload, default=str).encode('utf-8')
+        # Two writes in the same second share an updated_at but not a body
+        etag = make_etag(version_tag, hashlib.sha1(body).hexdigest())
+        return self.cache.put(key, etag, body, generation=generation)
+
+    def _render_list(self, version: Tuple):
+        """Render the race list."""
+        races = race_manager.get_all_races()
+        race_count, last_updated = version
+        etag = make_etag('races', race_count, last_updated)
+        return etag, {'races': [race.dict() for race in races], 'count': len(races)}
+
+    def _render_race(self, race_id: int):
+        """Render a single race."""
+        race = race_manager.get_race_by_id(race_id)
+        if race is None:
+            return None
+        return make_etag('race', race_id, race.updated_at), race.dict()
+
+    def _stream_results(self, race_id: int, params: Dict[str, List[str]], headers: Dict[str, str],
+                        head_only: bool = False) -> Union[APIResponse, StreamingResponse]:
+        """Stream a race's results, optionally one keyset page at a time."""
+        with db_manager.public_reads():
+            race = race_manager.get_race_by_id(race_id)
+        if race is None:
+            return json_response(404, {'error': 'Race not found'})
+
+        try:
+            limit = int(params['limit'][0]) if 'limit' in params else None
+        except ValueError:
+            return json_response(400, {'error': 'limit must be an integer'})
+        if limit is not None and not 0 < limit <= MAX_PAGE_SIZE:
+            return json_response(400, {'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'})
+
+        query = RESULTS_QUERY
+        query_params: list = [race_id]
+        if 'distance' in params:
+            query += " AND p.distance = %s"
+            query_params.append(params['distance'][0])
+
+        after = decode_cursor(params.get('cursor', [None])[0])
+        if 'cursor' in params and (after is None or len(after) != 3):
+            return json_response(400, {'error': 'Invalid cursor'})
+        if after:
+            query += " AND (rt.overall_place IS NULL, COALESCE(rt.overall_place, 0), rt.time_id) > (%s, %s, %s)"
+            query_params.extend(after)
+
+        query += " ORDER BY rt.overall_place IS NULL, rt.overall_place, rt.time_id"
+        if limit is not None:
+            # One extra row tells us whether there is a next page
+            query += " LIMIT %s"
+            query_params.append(limit + 1)
+
+        # The stream holds a connection for its whole life; shed it up front if none is free
+        if not db_manager.has_read_capacity():
+            return busy_response()
+
+        ndjson = params.get('format', [''])[0] == 'ndjson' or NDJSON in headers.get('accept', '')
+        gzip = accepts_gzip(headers)
+        if head_only:
+            return stream_rows(iter(()), ndjson, gzip)
+
+        page = {'last': None, 'more': False, 'sent': 0}
+
+        def batches():
+            """Row batches up to the page limit."""
+            with db_manager.public_reads():
+                rows = db_manager.stream_query(query, tuple(query_params), batch_size=500)
+                try:
+                    for batch in rows:
+                        if limit is not None and page['sent'] + len(batch) > limit:
+                            batch = batch[:limit - page['sent']]
+                            page['more'] = True
+                        if batch:
+                            page['sent'] += len(batch)
+                            page['last'] = batch[-1]
+                            yield batch
+                        if page['more']:
+                            return
+                finally:
+                    rows.close()
+
+        def trailer():
+            """Next page cursor, once the page is complete."""
+            last = page['last']
+            if not page['more'] or last is None:
+                return None
+            return {'next_cursor': encode_cursor(int(last['overall_place'] is None),
+                                                 last['overall_place'] or 0, last['time_id'])}
+
+        return stream_rows(batches(), ndjson, gzip, trailer)
+
+    @staticmethod
+    def _respond(entry: CachedResponse, headers: Dict[str, str], head_only: bool = False) -> APIResponse:
+        """Answer from a cache entry, honouring If-None-Match."""
+        response_headers = {
+            'ETag': entry.etag,
+            'Cache-Control': 'no-cache',
+            'Content-Type': entry.content_type,
+        }
+
+        if etag_matches(headers.get('if-none-match'), entry.etag):
+            return APIResponse(304, response_headers, b'')
+
+        response_headers['Content-Length'] = str(len(entry.body))
+        return APIResponse(200, response_headers, b'' if head_only else entry.body)
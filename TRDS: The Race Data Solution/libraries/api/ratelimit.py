@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🚦 TRMS API Rate Limiting
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Token-bucket rate limiting per client and endpoint for the public TRWS
+    API. Each (client, endpoint) pair gets its own bucket; expensive
+    endpoints such as streamed result lists refill more slowly. Buckets for
+    clients that have gone quiet are evicted least recently used first.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Tuple
+
+from ..utils.config import config
+
+# Retry-After for a bucket that does not refill (a rate of 0)
+MAX_RETRY_AFTER = 3600.0
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` per second."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float):
+        """Initialize a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self, cost: float = 1.0) -> float:
+        """Take tokens; returns 0 if allowed, else seconds until they would be."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return 0.0
+        if self.rate <= 0:
+            return MAX_RETRY_AFTER
+        return min(MAX_RETRY_AFTER, (cost - self.tokens) / self.rate)
+
+class RateLimiter:
+    """Per-client, per-endpoint token buckets."""
+
+    def __init__(self, rate: Optional[float] = None, burst: Optional[int] = None,
+                 endpoint_rules: Optional[Dict[str, Tuple[float, float]]] = None,
+                 max_clients: int = 10000):
+        """Initialize rate limiter.
+
+        ``endpoint_rules`` maps an endpoint name to (rate, burst) and
+        overrides the default rule for that endpoint.
+        """
+        # An explicit 0 is a real setting, not "use the default"
+        rate = config.web.rate_limit_per_second if rate is None else rate
+        burst = config.web.rate_limit_burst if burst is None else burst
+        self.default_rule = (rate, float(burst))
+        self.endpoint_rules = endpoint_rules if endpoint_rules is not None else {
+            'results': (rate / 5, max(2.0, burst / 5)),
+            'search': (rate * 2, float(burst)),
+        }
+        self.max_clients = max_clients
+
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self.limited = 0
+
+    def check(self, client: str, endpoint: str = 'api', cost: float = 1.0) -> float:
+        """Charge a request; returns 0 if allowed, else a Retry-After in seconds."""
+        key = (client, endpoint)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(*self.endpoint_rules.get(endpoint, self.default_rule))
+                if len(self._buckets) > self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(key)
+
+            wait = bucket.take(cost)
+            if wait:
+                self.limited += 1
+            return wait
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get limiter statistics."""
+        return {'buckets': len(self._buckets), 'limited': self.limited}
+
+def client_address(peer: Optional[str], headers: Dict[str, str]) -> str:
+    """Identify the client, trusting X-Forwarded-For only behind a known proxy."""
+    if config.web.trust_forwarded_for and headers.get('x-forwarded-for'):
+        return headers['x-forwarded-for'].split(',')[0].strip()
+    return peer or 'unknown'
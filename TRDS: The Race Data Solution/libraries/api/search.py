@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🔎 TRMS Search API
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Typeahead endpoint over the cross-race participant search index. The
+    index is opened from its disk snapshot on first use and caught up from
+    updated_at at most once per refresh interval, skipping the catch-up
+    while the database is busy.
+
+        GET /api/search?q=smith+indy&limit=10&race=12
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import logging
+import threading
+from typing import Optional, Dict
+from urllib.parse import parse_qs
+
+from ..database.connection import db_manager, PoolBusyError
+from ..search.index import SearchIndex
+from .races import APIResponse, json_response
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+MAX_LIMIT = 50
+
+class SearchAPI:
+    """Participant typeahead endpoint."""
+
+    def __init__(self, index: Optional[SearchIndex] = None, prefix: str = '/api/search'):
+        """Initialize search API."""
+        self.index = index or SearchIndex()
+        self.prefix = prefix
+        self._opened = False
+        self._open_lock = threading.Lock()
+
+    def _ensure_open(self):
+        """Open the index on first use."""
+        if self._opened:
+            return
+        with self._open_lock:
+            if not self._opened:
+                self.index.open()
+                self._opened = True
+
+    def handle(self, method: str, path: str, headers: Optional[Dict[str, str]] = None) -> APIResponse:
+        """Answer a typeahead query."""
+        route, _, query_string = path.partition('?')
+        if route.rstrip('/') != self.prefix:
+            return json_response(404, {'error': 'Not found'})
+        if method not in ('GET', 'HEAD'):
+            return json_response(405, {'error': 'Method not allowed'}, {'Allow': 'GET, HEAD'})
+
+        params = parse_qs(query_string)
+        query = params.get('q', [''])[0]
+        try:
+            limit = max(1, min(int(params.get('limit', ['10'])[0]), MAX_LIMIT))
+            race_id = int(params['race'][0]) if 'race' in params else None
+        except ValueError:
+            return json_response(400, {'error': 'limit and race must be integers'})
+
+        if not self._opened:
+            try:
+                with db_manager.public_reads():
+                    self._ensure_open()
+            except Exception as e:
+                logger.error(f"Search index unavailable: {e}")
+                return json_response(503, {'error': 'Search unavailable'}, {'Retry-After': '1'})
+
+        # Under load answer from the index as it is rather than wait to catch up
+        try:
+            with db_manager.public_reads(timeout=0):
+                self.index.maybe_refresh()
+        except PoolBusyError:
+            pass
+
+        hits = self.index.search(query, limit, race_id)
+        return json_response(200, {'query': query, 'results': [hit._asdict() for hit in hits]},
+                             {'Cache-Control': 'no-cache'})
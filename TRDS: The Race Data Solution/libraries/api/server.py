@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🌐 TRWS Application Server
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Asyncio HTTP/1.1 server for the TRWS API. A master process binds the
+    listening socket and forks WebConfig.workers worker processes; each
+    worker runs its own event loop and its own TRDS connection pool sized by
+    WebConfig.worker_pool_size. Blocking database calls run on a thread pool
+    no larger than the connection pool. API requests are rate limited per
+    client and endpoint with token buckets and answered 429 when over.
+    Each worker watches its configuration and swaps its connection pool
+    when database settings change, without dropping requests.
+
+        python3 -m libraries.api.server --workers 4
+
+    Endpoints:
+        GET /healthz     Process is up
+        GET /readyz      Database answers SELECT 1 within READY_TIMEOUT
+        GET /metrics     This worker's timing histograms (Prometheus text)
+        GET /api/search  Participant typeahead
+        GET /api/...     TRDS read API
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Optional, Dict, List, Tuple, Union
+
+from ..database.config_watcher import ConfigWatcher
+from ..database.connection import db_manager
+from ..utils.config import config
+from ..utils.metrics import metrics, start_file_export
+from .races import RaceAPI, APIResponse, json_response
+from .ratelimit import RateLimiter, client_address
+from .search import SearchAPI
+from .streaming import StreamingResponse
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+MAX_HEADER_BYTES = 65536
+KEEP_ALIVE_TIMEOUT = 15.0
+
+# Seconds /readyz waits for the database to answer SELECT 1
+READY_TIMEOUT = 2.0
+
+class HTTPWorker:
+    """One worker process: event loop, request handling and graceful drain."""
+
+    def __init__(self, sock: socket.socket, worker_id: int, pool_size: int,
+                 shutdown_timeout: float, rate_limit: bool = True):
+        """Initialize worker."""
+        self.sock = sock
+        self.worker_id = worker_id
+        self.pool_size = pool_size
+        self.shutdown_timeout = shutdown_timeout
+
+        self.api: Optional[RaceAPI] = None
+        self.search_api: Optional[SearchAPI] = None
+        self.limiter: Optional[RateLimiter] = RateLimiter() if rate_limit else None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.watcher: Optional[ConfigWatcher] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.draining = False
+        self.in_flight = 0
+        self.connections: set = set()
+        self.requests_served = 0
+
+    def run(self):
+        """Worker process entry point."""
+        # The pool inherited from the master process must not be shared
+        db_manager.reinitialize({'local_pool_size': self.pool_size, 'cloud_pool_size': self.pool_size})
+        self.watcher = ConfigWatcher().start()
+        # Counts inherited from the master belong to no worker
+        metrics.reset()
+        exporter = start_file_export(f"trws-{self.worker_id}")
+        self.api = RaceAPI()
+        self.search_api = SearchAPI()
+        self.executor = ThreadPoolExecutor(max_workers=self.pool_size,
+                                           thread_name_prefix=f"trws-{self.worker_id}")
+        asyncio.run(self._serve())
+        self.watcher.stop()
+        if exporter:
+            exporter.stop()
+        logger.info(f"Worker {self.worker_id} stopped after {self.requests_served} requests")
+
+    async def _serve(self):
+        """Serve until SIGTERM/SIGINT, then drain."""
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signum, stop.set)
+
+        self.server = await asyncio.start_server(self._handle_connection, sock=self.sock,
+                                                 limit=MAX_HEADER_BYTES)
+        logger.info(f"Worker {self.worker_id} (pid {os.getpid()}) serving with DB pool of {self.pool_size}")
+
+        await stop.wait()
+        await self._drain()
+
+    async def _drain(self):
+        """Stop accepting, finish in-flight requests, then release the pool."""
+        self.draining = True
+        self.server.close()
+
+        deadline = asyncio.get_running_loop().time() + self.shutdown_timeout
+        while self.in_flight and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(0.05)
+
+        # Idle keep-alive connections are closed rather than waited on
+        for writer in list(self.connections):
+            writer.close()
+
+        self.executor.shutdown(wait=True)
+        logger.info(f"Worker {self.worker_id} drained ({self.in_flight} requests abandoned)")
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve requests on one keep-alive connection."""
+        self.connections.add(writer)
+        peername = writer.get_extra_info('peername')
+        peer = peername[0] if peername else None
+        try:
+            while not self.draining:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+
+                method, path, version, headers = request
+                self.in_flight += 1
+                try:
+                    response = await self._dispatch(method, path, headers, peer)
+                    keep_alive = self._keep_alive(version, headers) and not self.draining
+                    if isinstance(response, StreamingResponse):
+                        keep_alive = await self._write_stream(writer, response, keep_alive, version,
+                                                              head_only=(method == 'HEAD'))
+                    else:
+                        await self._write_response(writer, response, keep_alive, head_only=(method == 'HEAD'))
+                finally:
+                    self.in_flight -= 1
+                    self.requests_served += 1
+
+                if not keep_alive:
+                    break
+        except Exception as e:
+            logger.error(f"Worker {self.worker_id} connection error: {e}")
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+        """Read a request line and headers; bodies are read and ignored."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            return None
+        if not head.strip():
+            return None
+
+        lines = head.decode('latin-1').split("\r\n")
+        try:
+            method, path, version = lines[0].split(" ", 2)
+        except ValueError:
+            return None
+
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get('content-length') or 0)
+        if length:
+            await reader.readexactly(length)
+        return method.upper(), path, version, headers
+
+    async def _dispatch(self, method: str, path: str, headers: Dict[str, str],
+                        peer: Optional[str] = None) -> Union[APIResponse, StreamingResponse]:
+        """Route a request to health checks or the API."""
+        route = path.split('?', 1)[0]
+
+        if route == '/healthz':
+            return json_response(200, {'status': 'ok', 'worker': self.worker_id})
+        if route == '/readyz':
+            return await self._readiness()
+        if route == '/metrics':
+            if not metrics.enabled:
+                return json_response(404, {'error': 'Metrics are disabled'})
+            return APIResponse(200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'},
+                               metrics.render().encode('utf-8'))
+
+        if route.startswith(self.search_api.prefix):
+            handler, endpoint = self.search_api.handle, 'search'
+        else:
+            handler = self.api.handle
+            endpoint = 'results' if route.rstrip('/').endswith('/results') else 'api'
+
+        retry_after = self.limiter.check(client_address(peer, headers), endpoint) if self.limiter else 0
+        if retry_after:
+            return json_response(429, {'error': 'Too many requests'},
+                                 {'Retry-After': str(max(1, math.ceil(retry_after)))})
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, handler, method, path, headers)
+        except Exception as e:
+            logger.error(f"Request {method} {path} failed: {e}")
+            return json_response(500, {'error': 'Internal server error'})
+
+    async def _readiness(self) -> APIResponse:
+        """Report readiness from a SELECT 1 round trip to the database."""
+        if self.draining:
+            return json_response(503, {'ready': False, 'reason': 'draining'})
+
+        # The default executor, so the probe does not queue behind API requests
+        loop = asyncio.get_running_loop()
+        try:
+            ready = await asyncio.wait_for(loop.run_in_executor(None, db_manager.ping, READY_TIMEOUT),
+                                           READY_TIMEOUT)
+        except asyncio.TimeoutError:
+            ready = False
+        status = {
+            'ready': ready,
+            'connected': ready,
+            'is_cloud': db_manager.is_cloud_connected,
+            'worker': self.worker_id,
+        }
+        if not ready:
+            status['reason'] = 'database did not answer'
+        return json_response(200 if ready else 503, status)
+
+    @staticmethod
+    def _keep_alive(version: str, headers: Dict[str, str]) -> bool:
+        """HTTP/1.1 keeps connections open unless told otherwise."""
+        connection = headers.get('connection', '').lower()
+        if version.upper() == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    @staticmethod
+    async def _write_response(writer: asyncio.StreamWriter, response: APIResponse,
+                              keep_alive: bool, head_only: bool = False):
+        """Write status line, headers and body."""
+        status = HTTPStatus(response.status)
+        headers = dict(response.headers)
+        if status.value != 304:
+            headers.setdefault('Content-Length', str(len(response.body)))
+        headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        # One write per response so Nagle never holds the body back
+        payload = head.encode('latin-1') + b"\r\n"
+        if not head_only and status.value != 304:
+            payload += response.body
+        writer.write(payload)
+        await writer.drain()
+
+    async def _write_stream(self, writer: asyncio.StreamWriter, response: StreamingResponse,
+                            keep_alive: bool, version: str, head_only: bool = False) -> bool:
+        """Write a streamed body with chunked transfer encoding.
+
+        Chunks are pulled on the thread pool because producing them reads
+        from the database; drain() holds the producer back for slow clients.
+        HTTP/1.0 clients get an unframed body ended by closing the
+        connection. Returns whether the connection stays open.
+        """
+        status = HTTPStatus(response.status)
+        headers = dict(response.headers)
+        chunked = version.upper() != 'HTTP/1.0'
+        if chunked:
+            headers['Transfer-Encoding'] = 'chunked'
+        else:
+            keep_alive = False
+        headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(head.encode('latin-1') + b"\r\n")
+
+        loop = asyncio.get_running_loop()
+        chunks = iter(response.chunks)
+        try:
+            while not head_only:
+                chunk = await loop.run_in_executor(self.executor, next, chunks, None)
+                if chunk is None:
+                    break
+                if not chunk:
+                    continue
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk) if chunked else chunk)
+                await writer.drain()
+            if chunked and not head_only:
+                writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            # Releases the database connection if the client went away
+            close = getattr(chunks, 'close', None)
+            if close:
+                await loop.run_in_executor(self.executor, close)
+        return keep_alive
+
+def _worker_main(sock: socket.socket, worker_id: int, pool_size: int, shutdown_timeout: float,
+                 rate_limit: bool):
+    """Forked worker entry point."""
+    HTTPWorker(sock, worker_id, pool_size, shutdown_timeout, rate_limit).run()
+
+def create_listen_socket(host: str, port: int, backlog: int = 1024) -> socket.socket:
+    """Bind the shared listening socket in the master process."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.setblocking(False)
+    return sock
+
+def serve(host: Optional[str] = None, port: Optional[int] = None, workers: Optional[int] = None,
+          pool_size: Optional[int] = None, shutdown_timeout: Optional[float] = None,
+          rate_limit: bool = True):
+    """Run the master process: bind, fork workers, forward shutdown signals."""
+    host = host or config.web.host
+    port = port or config.web.port
+    workers = workers or config.web.workers
+    pool_size = pool_size or config.web.worker_pool_size
+    shutdown_timeout = shutdown_timeout if shutdown_timeout is not None else config.web.shutdown_timeout
+
+    sock = create_listen_socket(host, port)
+    context = multiprocessing.get_context('fork')
+    processes: List[multiprocessing.Process] = []
+
+    for worker_id in range(workers):
+        process = context.Process(target=_worker_main, name=f"trws-worker-{worker_id}",
+                                  args=(sock, worker_id, pool_size, shutdown_timeout, rate_limit))
+        process.start()
+        processes.append(process)
+
+    print(f"🌐 TRWS listening on http://{host}:{port} with {workers} workers "
+          f"(DB pool {pool_size} per worker)")
+
+    def _forward(signum, frame):
+        """Pass shutdown on to the workers."""
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+
+    for process in processes:
+        process.join()
+    sock.close()
+    print("👋 TRWS stopped")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="TRWS asyncio application server")
+    parser.add_argument('--host', help=f"Bind address (default {config.web.host})")
+    parser.add_argument('--port', type=int, help=f"Port (default {config.web.port})")
+    parser.add_argument('--workers', type=int, help=f"Worker processes (default {config.web.workers})")
+    parser.add_argument('--pool-size', type=int, help=f"DB pool per worker (default {config.web.worker_pool_size})")
+    parser.add_argument('--no-rate-limit', action='store_true', help="Disable per-client rate limiting")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.DEBUG if config.web.debug else logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    serve(args.host, args.port, args.workers, args.pool_size, rate_limit=not args.no_rate_limit)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🌊 TRMS Streaming JSON Responses
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Encoders that turn batches of rows from DatabaseManager.stream_query
+    into response chunks as they arrive, so large result lists are never
+    held in memory as a whole list or one giant string. Supports a JSON
+    document with a streamed array, NDJSON, optional gzip, and opaque
+    keyset cursors for paging.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import base64
+import json
+import zlib
+from typing import Optional, Dict, List, Iterable, Iterator, NamedTuple, Callable
+
+NDJSON = 'application/x-ndjson'
+JSON = 'application/json'
+
+class StreamingResponse(NamedTuple):
+    """HTTP response whose body is produced chunk by chunk."""
+    status: int
+    headers: Dict[str, str]
+    chunks: Iterator[bytes]
+
+def encode_cursor(*values) -> str:
+    """Encode keyset values as an opaque page cursor."""
+    raw = json.dumps(list(values), separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token: Optional[str]) -> Optional[List]:
+    """Decode a page cursor; returns None for a missing or malformed one."""
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        return None
+    return values if isinstance(values, list) else None
+
+def accepts_gzip(headers: Dict[str, str]) -> bool:
+    """Check Accept-Encoding for gzip."""
+    encodings = headers.get('accept-encoding', '')
+    return any(encoding.split(';')[0].strip() == 'gzip' for encoding in encodings.split(','))
+
+def _dumps(row: Dict) -> str:
+    """Serialize one row compactly."""
+    return json.dumps(row, separators=(',', ':'), default=str)
+
+def ndjson_chunks(batches: Iterable[List[Dict]],
+                  trailer: Optional[Callable[[], Optional[Dict]]] = None) -> Iterator[bytes]:
+    """One JSON object per line, one chunk per batch.
+
+    ``trailer`` is called after the last batch; a dict it returns is
+    written as a final line (used for the next page cursor).
+    """
+    for batch in batches:
+        if batch:
+            yield ("\n".join(_dumps(row) for row in batch) + "\n").encode('utf-8')
+    extra = trailer() if trailer else None
+    if extra:
+        yield (_dumps(extra) + "\n").encode('utf-8')
+
+def json_array_chunks(batches: Iterable[List[Dict]], key: str = 'results',
+                      trailer: Optional[Callable[[], Optional[Dict]]] = None) -> Iterator[bytes]:
+    """A JSON document whose ``key`` array is streamed, one chunk per batch.
+
+    Members returned by ``trailer`` are written after the array, once the
+    count and next cursor are known.
+    """
+    yield f'{{"{key}":['.encode('utf-8')
+    count = 0
+    for batch in batches:
+        if not batch:
+            continue
+        prefix = ',' if count else ''
+        yield (prefix + ','.join(_dumps(row) for row in batch)).encode('utf-8')
+        count += len(batch)
+
+    tail = {'count': count}
+    tail.update((trailer() if trailer else None) or {})
+    yield (']' + ''.join(f',{json.dumps(name)}:{_dumps(value)}' for name, value in tail.items())
+           + '}').encode('utf-8')
+
+def gzip_chunks(chunks: Iterable[bytes], level: int = 6) -> Iterator[bytes]:
+    """Gzip a chunk stream, flushing after each chunk so clients see progress."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            if data:
+                yield data
+        yield compressor.flush(zlib.Z_FINISH)
+    finally:
+        close = getattr(chunks, 'close', None)
+        if close:
+            close()
+
+def stream_rows(batches: Iterable[List[Dict]], ndjson: bool = False, gzip: bool = False,
+                trailer: Optional[Callable[[], Optional[Dict]]] = None,
+                extra_headers: Optional[Dict[str, str]] = None) -> StreamingResponse:
+    """Build a streaming response over row batches."""
+    chunks = ndjson_chunks(batches, trailer) if ndjson else json_array_chunks(batches, trailer=trailer)
+    headers = {'Content-Type': NDJSON if ndjson else JSON, 'Cache-Control': 'no-cache'}
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+        headers['Vary'] = 'Accept-Encoding'
+    headers.update(extra_headers or {})
+    return StreamingResponse(200, headers, chunks)
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🔌 TRMS API WSGI Adapter
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Exposes the TRDS read API as a WSGI application so it can be mounted in
+    any WSGI server. Running the module starts a development server:
+
+        python3 -m libraries.api.wsgi
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from http import HTTPStatus
+from typing import Optional
+
+from ..utils.config import config
+from .races import RaceAPI
+from .streaming import StreamingResponse
+
+def make_wsgi_app(api: Optional[RaceAPI] = None):
+    """Wrap a RaceAPI in a WSGI callable."""
+    api = api or RaceAPI()
+
+    def application(environ, start_response):
+        """WSGI entry point."""
+        headers = {}
+        for name in ('If-None-Match', 'Accept', 'Accept-Encoding'):
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            if key in environ:
+                headers[name] = environ[key]
+
+        path = environ.get('PATH_INFO', '/')
+        if environ.get('QUERY_STRING'):
+            path += '?' + environ['QUERY_STRING']
+
+        response = api.handle(environ['REQUEST_METHOD'], path, headers)
+        status = HTTPStatus(response.status)
+        start_response(f"{status.value} {status.phrase}", list(response.headers.items()))
+        if isinstance(response, StreamingResponse):
+            return response.chunks
+        return [response.body]
+
+    return application
+
+def main():
+    """Run a development server."""
+    from wsgiref.simple_server import make_server
+
+    host, port = config.web.host, config.web.port
+    with make_server(host, port, make_wsgi_app()) as server:
+        print(f"🌐 TRDS API listening on http://{host}:{port}{config.web.trrs_api_url}/races")
+        server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,570 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+💾 TRDS Backup Engine
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Parallel, compressed backups of the TRDS database without a long lock.
+    Worker connections each open a REPEATABLE READ snapshot while a global
+    read lock is held for a few milliseconds, so every table is dumped as
+    of the same moment while timing writes carry on. Large tables are split
+    into primary key ranges and every part streams through gzip into
+    backups/<frequency>/<backup id>/ as JSON lines; manifest.json is written
+    last, so an interrupted backup is never mistaken for a complete one.
+
+    Incremental backups only copy rows whose updated_at is at or after the
+    previous backup's watermark, plus the table's primary keys so deleted
+    rows are deleted on restore. Restores replay the chain (full backup,
+    then each incremental) with one connection per file and foreign key
+    checks off.
+
+        python3 -m libraries.database.backup --backup --frequency daily
+        python3 -m libraries.database.backup --backup --frequency hourly --incremental
+        python3 -m libraries.database.backup --restore 20240601-093000-incr --database trms_restore --yes
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import logging
+import math
+import os
+import queue
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Optional, Dict, Any, List, NamedTuple, Tuple
+
+from mysql.connector import Error
+
+from ..utils.paths import paths
+from .connection import db_manager
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+BACKUP_FORMAT = 1
+MANIFEST = 'manifest.json'
+
+DEFAULT_WORKERS = 4
+
+# Rows per dump file for tables split into primary key ranges
+CHUNK_ROWS = 50000
+
+# Rows per fetch while dumping and per INSERT batch while restoring
+FETCH_ROWS = 5000
+INSERT_BATCH = 2000
+
+# gzip level; higher levels cost far more CPU than they save on row data
+COMPRESS_LEVEL = 3
+
+# Seconds to wait for the global read lock before dumping without it
+LOCK_WAIT_TIMEOUT = 5
+
+# Seconds the watermark is moved back when open transactions cannot be listed
+WATERMARK_MARGIN = 600
+
+class TableInfo(NamedTuple):
+    """What a backup needs to know about a table."""
+    name: str
+    columns: List[str]
+    primary_key: List[str]
+    integer_key: bool
+    has_updated_at: bool
+    estimated_rows: int
+    ddl: str
+
+class DumpTask(NamedTuple):
+    """One file of a backup."""
+    table: str
+    file: str
+    columns: List[str]
+    where: str
+    params: tuple
+    estimated_rows: int
+
+def _encode(value):
+    """JSON form of the MySQL values json cannot write itself."""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, timedelta):
+        sign = '-' if value < timedelta(0) else ''
+        seconds = abs(value)
+        hours, rest = divmod(seconds.days * 86400 + seconds.seconds, 3600)
+        minutes, secs = divmod(rest, 60)
+        micros = f".{seconds.microseconds:06d}" if seconds.microseconds else ""
+        return f"{sign}{hours:02d}:{minutes:02d}:{secs:02d}{micros}"
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (bytes, bytearray)):
+        try:
+            return bytes(value).decode('utf-8')
+        except UnicodeDecodeError:
+            return {'b64': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, set):
+        return ",".join(sorted(value))
+    raise TypeError(f"Cannot back up {type(value).__name__} value")
+
+def _decode(row: list) -> tuple:
+    """Row values ready to insert; MySQL parses the date, time and decimal strings."""
+    return tuple(base64.b64decode(value['b64']) if isinstance(value, dict) else value for value in row)
+
+def _quote(name: str) -> str:
+    """Quote an identifier."""
+    return "`" + name.replace("`", "``") + "`"
+
+def _session(conn, restore: bool = False):
+    """Session settings shared by every backup and restore connection."""
+    cursor = conn.cursor()
+    # TIMESTAMP values and watermarks are compared in UTC
+    cursor.execute("SET SESSION time_zone = '+00:00'")
+    if restore:
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute("SET SESSION unique_checks = 0")
+    cursor.close()
+
+def read_manifest(backup_dir: Path) -> Dict[str, Any]:
+    """Load a backup's manifest."""
+    with open(backup_dir / MANIFEST) as f:
+        return json.load(f)
+
+class BackupEngine:
+    """Parallel backup and restore of the TRDS database."""
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, chunk_rows: int = CHUNK_ROWS):
+        """Initialize backup engine."""
+        self.workers = max(1, workers)
+        self.chunk_rows = chunk_rows
+        self.root = paths.TRDS_DIR / 'backups'
+
+    def list_backups(self, frequency: Optional[str] = None) -> List[Tuple[Path, Dict[str, Any]]]:
+        """Complete backups, oldest first."""
+        pattern = f"{frequency or '*'}/*/{MANIFEST}"
+        backups = [(path.parent, read_manifest(path.parent)) for path in self.root.glob(pattern)]
+        return sorted(backups, key=lambda item: item[1]['created_at'])
+
+    def find(self, backup: str) -> Path:
+        """Resolve a backup ID, frequency/ID or directory."""
+        candidates = [Path(backup), self.root / backup] + list(self.root.glob(f"*/{backup}"))
+        for candidate in candidates:
+            if (candidate / MANIFEST).exists():
+                return candidate
+        raise FileNotFoundError(f"No complete backup {backup} under {self.root}")
+
+    def chain(self, backup_dir: Path) -> List[Tuple[Path, Dict[str, Any]]]:
+        """The full backup and every incremental up to this one, in restore order."""
+        chain = []
+        while True:
+            manifest = read_manifest(backup_dir)
+            chain.append((backup_dir, manifest))
+            if manifest['kind'] == 'full':
+                return list(reversed(chain))
+            backup_dir = self.find(manifest['parent'])
+
+    def _open_snapshots(self) -> Tuple[list, datetime, bool]:
+        """Open one snapshot connection per worker, all at the same point in time."""
+        conns = []
+        locker = db_manager.direct_connection()
+        try:
+            for _ in range(self.workers):
+                conn = db_manager.direct_connection()
+                _session(conn)
+                conns.append(conn)
+
+            cursor = locker.cursor()
+            _session(locker)
+            consistent = True
+            try:
+                cursor.execute(f"SET SESSION lock_wait_timeout = {LOCK_WAIT_TIMEOUT}")
+                # Blocks writes only while the snapshots below are opened
+                cursor.execute("FLUSH TABLES WITH READ LOCK")
+            except Error as e:
+                consistent = False
+                logger.warning(f"No global read lock ({e}); snapshots may differ by in-flight commits")
+
+            try:
+                watermark = self._watermark(cursor)
+                for conn in conns:
+                    snapshot = conn.cursor()
+                    snapshot.execute("SET SESSION TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+                    snapshot.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT, READ ONLY")
+                    snapshot.close()
+            finally:
+                if consistent:
+                    cursor.execute("UNLOCK TABLES")
+                cursor.close()
+        except Exception:
+            for conn in conns:
+                conn.close()
+            raise
+        finally:
+            locker.close()
+
+        return conns, watermark, consistent
+
+    def _watermark(self, cursor) -> datetime:
+        """Earliest updated_at a change missing from the snapshots can carry.
+
+        Read before the snapshots open. A transaction still open then stamps
+        rows with its statement times but commits too late for this backup,
+        so the watermark goes back to the oldest open transaction's start.
+        Rows copied twice are harmless; restores upsert.
+        """
+        try:
+            cursor.execute("SELECT NOW(), MIN(trx_started) FROM information_schema.innodb_trx")
+            now, oldest = cursor.fetchone()
+            return min(now, oldest) if oldest else now
+        except Error as e:
+            logger.warning(f"Cannot list open transactions ({e}); watermark moved back {WATERMARK_MARGIN}s")
+            cursor.execute("SELECT NOW() - INTERVAL %s SECOND", (WATERMARK_MARGIN,))
+            return cursor.fetchone()[0]
+
+    def _tables(self, conn) -> List[TableInfo]:
+        """Describe every base table in the database."""
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute("""
+            SELECT c.TABLE_NAME, c.COLUMN_NAME, c.COLUMN_KEY, c.DATA_TYPE, c.EXTRA, t.TABLE_ROWS
+            FROM information_schema.COLUMNS c
+            JOIN information_schema.TABLES t
+              ON t.TABLE_SCHEMA = c.TABLE_SCHEMA AND t.TABLE_NAME = c.TABLE_NAME
+            WHERE c.TABLE_SCHEMA = DATABASE() AND t.TABLE_TYPE = 'BASE TABLE'
+            ORDER BY c.TABLE_NAME, c.ORDINAL_POSITION
+        """)
+        columns: Dict[str, list] = {}
+        for row in cursor.fetchall():
+            columns.setdefault(row['TABLE_NAME'], []).append(row)
+
+        tables = []
+        for name, rows in columns.items():
+            cursor.execute(f"SHOW CREATE TABLE {_quote(name)}")
+            ddl = cursor.fetchone()['Create Table']
+            key = [row['COLUMN_NAME'] for row in rows if row['COLUMN_KEY'] == 'PRI']
+            key_types = [row['DATA_TYPE'] for row in rows if row['COLUMN_KEY'] == 'PRI']
+            tables.append(TableInfo(
+                name=name,
+                # Generated columns are recomputed by MySQL on restore
+                columns=[row['COLUMN_NAME'] for row in rows if 'GENERATED' not in row['EXTRA'].upper()],
+                primary_key=key,
+                # Ranges split on the leading key column, e.g. time_id of (time_id, race_id)
+                integer_key=bool(key) and key_types[0] in ('int', 'bigint', 'mediumint', 'smallint', 'tinyint'),
+                has_updated_at=any(row['COLUMN_NAME'] == 'updated_at' for row in rows),
+                estimated_rows=int(rows[0]['TABLE_ROWS'] or 0),
+                ddl=ddl,
+            ))
+        cursor.close()
+        return tables
+
+    def _full_tasks(self, conn, table: TableInfo) -> List[DumpTask]:
+        """Dump a whole table, in primary key ranges if it is large."""
+        whole = [DumpTask(table.name, f"{table.name}.jsonl.gz", table.columns, "", (), table.estimated_rows)]
+        if not table.integer_key or table.estimated_rows <= self.chunk_rows:
+            return whole
+
+        key = _quote(table.primary_key[0])
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT MIN({key}), MAX({key}) FROM {_quote(table.name)}")
+        low, high = cursor.fetchone()
+        cursor.close()
+        if low is None:
+            return whole
+
+        parts = math.ceil(table.estimated_rows / self.chunk_rows)
+        width = max(1, math.ceil((high - low + 1) / parts))
+        tasks = []
+        for part, start in enumerate(range(low, high + 1, width)):
+            last = start + width > high
+            where = f"{key} >= %s" if last else f"{key} >= %s AND {key} < %s"
+            params = (start,) if last else (start, start + width)
+            tasks.append(DumpTask(table.name, f"{table.name}.{part:04d}.jsonl.gz", table.columns,
+                                  where, params, table.estimated_rows // parts))
+        return tasks
+
+    def _dump(self, conns: queue.Queue, directory: Path, task: DumpTask) -> int:
+        """Stream one task's rows into a gzip file on a free snapshot connection."""
+        conn = conns.get()
+        try:
+            query = f"SELECT {', '.join(_quote(c) for c in task.columns)} FROM {_quote(task.table)}"
+            if task.where:
+                query += f" WHERE {task.where}"
+            cursor = conn.cursor(buffered=False)
+            rows_written = 0
+            try:
+                cursor.execute(query, task.params)
+                with gzip.open(directory / task.file, 'wt', encoding='utf-8', compresslevel=COMPRESS_LEVEL) as f:
+                    while True:
+                        rows = cursor.fetchmany(FETCH_ROWS)
+                        if not rows:
+                            break
+                        f.write("".join(json.dumps(row, default=_encode, ensure_ascii=False) + "\n" for row in rows))
+                        rows_written += len(rows)
+            finally:
+                cursor.close()
+            return rows_written
+        finally:
+            conns.put(conn)
+
+    def backup(self, frequency: str = 'daily', incremental: bool = False,
+               parent: Optional[str] = None) -> Dict[str, Any]:
+        """Take a full or incremental backup; returns its manifest."""
+        started = time.perf_counter()
+        parent_dir = None
+        parent_manifest = None
+        if incremental:
+            if parent:
+                parent_dir = self.find(parent)
+            else:
+                backups = self.list_backups(frequency) or self.list_backups()
+                if not backups:
+                    raise ValueError("No earlier backup to build an incremental backup on")
+                parent_dir = backups[-1][0]
+            parent_manifest = read_manifest(parent_dir)
+
+        conns, watermark, consistent = self._open_snapshots()
+        backup_id = f"{datetime.now():%Y%m%d-%H%M%S}-{'incr' if incremental else 'full'}"
+        final_dir = paths.get_backup_dir(frequency) / backup_id
+        work_dir = final_dir.with_name(f"{backup_id}.partial")
+        work_dir.mkdir(parents=True)
+
+        try:
+            tables = self._tables(conns[0])
+            since = datetime.fromisoformat(parent_manifest['watermark']) if parent_manifest else None
+
+            tasks: List[DumpTask] = []
+            table_entries: Dict[str, Dict[str, Any]] = {}
+            for table in tables:
+                changes_only = (since is not None and table.has_updated_at
+                                and table.name in parent_manifest['tables'])
+                if changes_only:
+                    table_tasks = [
+                        DumpTask(table.name, f"{table.name}.jsonl.gz", table.columns,
+                                 "`updated_at` >= %s", (since,), table.estimated_rows),
+                        DumpTask(table.name, f"{table.name}.keys.jsonl.gz", table.primary_key,
+                                 "", (), table.estimated_rows),
+                    ]
+                else:
+                    table_tasks = self._full_tasks(conns[0], table)
+                tasks.extend(table_tasks)
+                table_entries[table.name] = {
+                    'mode': 'changes' if changes_only else 'full',
+                    'columns': table.columns,
+                    'primary_key': table.primary_key,
+                    'files': [task.file for task in table_tasks if not task.file.endswith('.keys.jsonl.gz')],
+                    'keys_file': f"{table.name}.keys.jsonl.gz" if changes_only else None,
+                    'rows': 0,
+                    'ddl': table.ddl,
+                }
+
+            # Biggest first so one large table does not finish last on its own
+            tasks.sort(key=lambda task: task.estimated_rows, reverse=True)
+            free = queue.Queue()
+            for conn in conns:
+                free.put(conn)
+            with ThreadPoolExecutor(max_workers=len(conns), thread_name_prefix="trds-backup") as pool:
+                results = list(pool.map(lambda task: (task, self._dump(free, work_dir, task)), tasks))
+        except Exception:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            raise
+        finally:
+            for conn in conns:
+                try:
+                    conn.rollback()
+                    conn.close()
+                except Error:
+                    pass
+
+        for task, rows in results:
+            if not task.file.endswith('.keys.jsonl.gz'):
+                table_entries[task.table]['rows'] += rows
+
+        manifest = {
+            'format': BACKUP_FORMAT,
+            'backup_id': backup_id,
+            'kind': 'incremental' if incremental else 'full',
+            'frequency': frequency,
+            'parent': str(parent_dir.relative_to(self.root)) if parent_dir else None,
+            'database': db_manager.config.database,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'watermark': watermark.isoformat(sep=' '),
+            'consistent': consistent,
+            'workers': self.workers,
+            'seconds': round(time.perf_counter() - started, 3),
+            'bytes': sum(path.stat().st_size for path in work_dir.iterdir()),
+            'tables': table_entries,
+        }
+        tmp_path = work_dir / f"{MANIFEST}.tmp"
+        tmp_path.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp_path, work_dir / MANIFEST)
+        os.replace(work_dir, final_dir)
+
+        logger.info(f"Backup {frequency}/{backup_id}: {sum(t['rows'] for t in table_entries.values())} rows, "
+                    f"{manifest['bytes']} bytes in {manifest['seconds']}s")
+        return manifest
+
+    def _load(self, backup_dir: Path, table: str, entry: Dict[str, Any], file: str,
+              upsert: bool, database: Optional[str]) -> int:
+        """Insert one dump file on its own connection."""
+        columns = entry['columns']
+        query = (f"INSERT INTO {_quote(table)} ({', '.join(_quote(c) for c in columns)}) "
+                 f"VALUES ({', '.join(['%s'] * len(columns))})")
+        if upsert:
+            updates = [c for c in columns if c not in entry['primary_key']] or columns[:1]
+            query += " ON DUPLICATE KEY UPDATE " + ", ".join(f"{_quote(c)} = VALUES({_quote(c)})" for c in updates)
+
+        conn = db_manager.direct_connection(database)
+        loaded = 0
+        try:
+            _session(conn, restore=True)
+            cursor = conn.cursor()
+            batch = []
+            with gzip.open(backup_dir / file, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    batch.append(_decode(json.loads(line)))
+                    if len(batch) >= INSERT_BATCH:
+                        cursor.executemany(query, batch)
+                        loaded += len(batch)
+                        batch = []
+            if batch:
+                cursor.executemany(query, batch)
+                loaded += len(batch)
+            conn.commit()
+            cursor.close()
+        finally:
+            conn.close()
+        return loaded
+
+    def _prune(self, conn, backup_dir: Path, table: str, entry: Dict[str, Any]) -> int:
+        """Delete rows whose keys are missing from an incremental backup's key list."""
+        with gzip.open(backup_dir / entry['keys_file'], 'rt', encoding='utf-8') as f:
+            kept = {tuple(json.loads(line)) for line in f}
+
+        key_columns = ", ".join(_quote(c) for c in entry['primary_key'])
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {key_columns} FROM {_quote(table)}")
+        gone = [key for key in cursor.fetchall() if tuple(key) not in kept]
+
+        deleted = 0
+        placeholder = f"({', '.join(['%s'] * len(entry['primary_key']))})"
+        for offset in range(0, len(gone), 1000):
+            keys = gone[offset:offset + 1000]
+            cursor.execute(
+                f"DELETE FROM {_quote(table)} WHERE ({key_columns}) IN ({', '.join([placeholder] * len(keys))})",
+                [value for key in keys for value in key]
+            )
+            deleted += cursor.rowcount
+        conn.commit()
+        cursor.close()
+        return deleted
+
+    def restore(self, backup: str, database: Optional[str] = None) -> Dict[str, Any]:
+        """Replace the database's contents with a backup (and the chain it builds on)."""
+        started = time.perf_counter()
+        chain = self.chain(self.find(backup))
+        stats = {'backups': [manifest['backup_id'] for _, manifest in chain], 'rows': 0, 'deleted': 0}
+
+        admin = db_manager.direct_connection(database)
+        try:
+            _session(admin, restore=True)
+            cursor = admin.cursor()
+            cursor.execute("SHOW FULL TABLES WHERE Table_type = 'BASE TABLE'")
+            existing = {row[0] for row in cursor.fetchall()}
+
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="trds-restore") as pool:
+                for backup_dir, manifest in chain:
+                    tables = manifest['tables']
+                    for table, entry in tables.items():
+                        if table not in existing:
+                            cursor.execute(entry['ddl'])
+                            existing.add(table)
+                        elif entry['mode'] == 'full':
+                            cursor.execute(f"TRUNCATE TABLE {_quote(table)}")
+                    admin.commit()
+
+                    loads = [
+                        (table, entry, file)
+                        for table, entry in tables.items() for file in entry['files']
+                    ]
+                    loads.sort(key=lambda item: (backup_dir / item[2]).stat().st_size, reverse=True)
+                    futures = [
+                        pool.submit(self._load, backup_dir, table, entry, file,
+                                    entry['mode'] == 'changes', database)
+                        for table, entry, file in loads
+                    ]
+                    stats['rows'] += sum(future.result() for future in futures)
+
+                    for table, entry in tables.items():
+                        if entry['mode'] == 'changes':
+                            stats['deleted'] += self._prune(admin, backup_dir, table, entry)
+
+                    logger.info(f"Restored {manifest['kind']} backup {manifest['backup_id']}")
+            cursor.close()
+        finally:
+            admin.close()
+
+        stats['seconds'] = round(time.perf_counter() - started, 3)
+        return stats
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="TRDS parallel backup and restore")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--backup', action='store_true', help="Take a backup")
+    mode.add_argument('--restore', metavar='BACKUP', help="Restore a backup ID, frequency/ID or directory")
+    mode.add_argument('--list', action='store_true', help="List complete backups")
+    parser.add_argument('--frequency', help="Backup folder: hourly, daily, race-day... (default daily)")
+    parser.add_argument('--incremental', action='store_true', help="Only rows changed since the last backup")
+    parser.add_argument('--parent', help="Backup to build the incremental on (default: latest)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Parallel connections")
+    parser.add_argument('--database', help="Restore into this database instead of the configured one")
+    parser.add_argument('--yes', action='store_true', help="Confirm replacing the target database's data")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    engine = BackupEngine(workers=args.workers)
+
+    if args.list:
+        for backup_dir, manifest in engine.list_backups(args.frequency):
+            rows = sum(table['rows'] for table in manifest['tables'].values())
+            print(f"{backup_dir.relative_to(engine.root)!s:<36} {manifest['kind']:<12} {rows:>10} rows "
+                  f"{manifest['bytes'] / 1048576:>8.1f} MB  {manifest['seconds']:>7.1f}s"
+                  f"{'' if manifest['consistent'] else '  (no global lock)'}")
+        return 0
+
+    if args.backup:
+        try:
+            manifest = engine.backup(args.frequency or 'daily', args.incremental, args.parent)
+        except Exception as e:
+            logger.error(f"Backup failed: {e}")
+            return 1
+        print(f"💾 {manifest['frequency']}/{manifest['backup_id']} written in {manifest['seconds']}s")
+        return 0
+
+    target = args.database or db_manager.config.database
+    if not args.yes:
+        print(f"❌ Restoring replaces every table in {target}. Pass --yes to confirm.")
+        return 1
+    try:
+        stats = engine.restore(args.restore, args.database)
+    except Exception as e:
+        logger.error(f"Restore failed: {e}")
+        return 1
+    print(f"♻️  Restored {' → '.join(stats['backups'])} into {target}: {stats['rows']} rows loaded, "
+          f"{stats['deleted']} deleted in {stats['seconds']}s")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🔄 TRMS Configuration Watcher
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Applies configuration changes to a running process. A background thread
+    watches config/{env}.yaml and the database.* rows of system_settings
+    (for example database.use_cloud or database.cloud_host, so every
+    machine can be switched from one place), read through the settings
+    cache so an unchanged table costs one version probe. A changed configuration is
+    validated first; new database settings are handed to
+    DatabaseManager.swap_pool, which builds and tests the new pool before
+    swapping it in and drains the old one, so in-flight queries finish.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import logging
+import os
+import threading
+from typing import Optional, Dict, Tuple
+
+from ..utils.config import config, load_config, DatabaseConfig, TRMSConfig
+from ..utils.log_setup import reload_logging
+from ..utils.paths import TRDS_DIR
+from ..models.settings import settings_manager
+from .connection import db_manager, PoolBusyError
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# DatabaseConfig fields system_settings may override; credentials stay in the config file
+RUNTIME_DATABASE_SETTINGS = (
+    'use_cloud', 'cloud_host', 'cloud_port', 'local_host', 'local_port', 'auto_failover',
+    'local_pool_size', 'cloud_pool_size', 'reserved_write_connections', 'public_read_timeout',
+)
+
+# Sections replaced in place on the shared config object
+RELOADABLE_SECTIONS = ('web', 'docker', 'email', 'logging')
+
+class ConfigWatcher:
+    """Background watcher that hot-reloads configuration."""
+
+    def __init__(self, interval: Optional[float] = None, environment: Optional[str] = None,
+                 drain_timeout: float = 30.0):
+        """Initialize configuration watcher."""
+        self.interval = config.database.reload_interval if interval is None else interval
+        self.environment = environment or os.getenv('TRMS_ENV', 'development')
+        self.config_file = TRDS_DIR / 'config' / f'{self.environment}.yaml'
+        self.drain_timeout = drain_timeout
+
+        self._file_stamp = self._stamp()
+        self._file_config: TRMSConfig = config
+        self._raw_settings: Dict[str, str] = {}
+        self._settings: Dict[str, str] = {}
+        # Compared without process-level overrides, which swap_pool reapplies
+        self._applied_db = self._db_fields(config.database)
+
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.reloads = 0
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        """Identify the config file's current contents."""
+        try:
+            stat = self.config_file.stat()
+            return stat.st_mtime_ns, stat.st_size
+        except OSError:
+            return None
+
+    @staticmethod
+    def _db_fields(db_config: DatabaseConfig) -> Dict:
+        """Comparable view of database settings."""
+        return db_config.model_dump()
+
+    def _read_settings(self) -> Optional[Dict[str, str]]:
+        """Read database.* overrides; None if the database is too busy to ask."""
+        try:
+            with db_manager.public_reads(timeout=0):
+                settings_manager.refresh()
+        except PoolBusyError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read database settings: {e}")
+            return None
+
+        return settings_manager.get_prefixed('database.')
+
+    def check(self) -> bool:
+        """Check for changes once and apply them; returns True if anything was applied."""
+        file_changed = False
+        stamp = self._stamp()
+        if stamp != self._file_stamp:
+            self._file_stamp = stamp
+            try:
+                self._file_config = load_config(self.environment)
+                file_changed = True
+            except Exception as e:
+                logger.error(f"Ignoring invalid {self.config_file.name}: {e}")
+                return False
+
+        settings = self._read_settings()
+        settings_changed = settings is not None and settings != self._raw_settings
+        if settings_changed:
+            self._raw_settings = settings
+            self._settings = {}
+            for field, value in settings.items():
+                if field in RUNTIME_DATABASE_SETTINGS:
+                    self._settings[field] = value
+                else:
+                    logger.warning(f"Ignoring unsupported setting database.{field}")
+        if not file_changed and not settings_changed:
+            return False
+
+        try:
+            database = DatabaseConfig(**{**self._file_config.database.model_dump(), **self._settings})
+        except Exception as e:
+            logger.error(f"Ignoring invalid database settings {self._settings}: {e}")
+            return False
+
+        applied = False
+        if file_changed:
+            for section in RELOADABLE_SECTIONS:
+                new_section = getattr(self._file_config, section)
+                if new_section != getattr(config, section):
+                    setattr(config, section, new_section)
+                    # Handlers are built once by setup_logging; rebuild them from the new section
+                    if section == 'logging':
+                        reload_logging()
+                    logger.info(f"Reloaded {section} configuration")
+                    applied = True
+
+        if self._db_fields(database) != self._applied_db:
+            if db_manager.swap_pool(database, self.drain_timeout):
+                self._applied_db = self._db_fields(database)
+                config.database = database
+                applied = True
+
+        if applied:
+            self.reloads += 1
+        return applied
+
+    def _run(self):
+        """Poll until stopped."""
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Configuration check failed: {e}")
+            if self._stop.wait(self.interval):
+                break
+
+    def start(self) -> 'ConfigWatcher':
+        """Start watching in a daemon thread; a zero interval disables it."""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="trms-config-watcher", daemon=True)
+            self._thread.start()
+            logger.info(f"Watching {self.config_file.name} and system_settings every {self.interval}s")
+        return self
+
+    def stop(self):
+        """Stop watching."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
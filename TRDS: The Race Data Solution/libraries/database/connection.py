@@ -7,7 +7,10 @@
 
 📝 DESCRIPTION:
     Database connection management with automatic cloud/local switching,
-    connection pooling, and failover support.
+    connection pooling, and failover support. Changed settings are applied
+    without a restart by swap_pool: the new pool is built and tested first,
+    then swapped in, and the old pool is closed once connections already
+    checked out of it have come back.
 
 👤 AUTHOR: TRMS Development Team
 📅 CREATED: 2024
@@ -19,28 +22,52 @@
 import mysql.connector
 from mysql.connector import Error, pooling
 import logging
-from typing import Optional, Dict, Any, List
+import os
+import threading
+from typing import Optional, Dict, Any, List, Iterator
 from contextlib import contextmanager
 import time
+from datetime import datetime, timedelta
 
 from ..utils.config import config
+from ..utils.metrics import metrics, timed
 from ..utils.paths import paths
+from .slow_queries import SlowQueryLog
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+class PoolBusyError(Exception):
+    """No connection is free for a public read without touching the write reserve."""
+
+def settled_version(version: tuple, latest: Optional[datetime], now: Optional[datetime]) -> Optional[tuple]:
+    """Version to keep from a MAX(updated_at) probe, or None to probe again.
+
+    updated_at has one-second resolution; a second write within the same
+    second would not move it, so a version that recent is not trusted.
+    """
+    if latest is None or now is None or latest < now - timedelta(seconds=1):
+        return version
+    return None
+
 class DatabaseManager:
     """Unified database manager with cloud/local support."""
     
     def __init__(self, config_override: Optional[Dict] = None):
         """Initialize database manager."""
         self.config = config.database
+        self._overrides: Dict[str, Any] = dict(config_override or {})
         if config_override:
             for key, value in config_override.items():
                 setattr(self.config, key, value)
         
         self.pool = None
         self.is_cloud_connected = False
+        self._public_gate: Optional[threading.BoundedSemaphore] = None
+        self._swap_lock = threading.Lock()
+        self._checkout_lock = threading.Lock()
+        self._checkouts: Dict[int, int] = {}
+        self.slow_queries = SlowQueryLog(self.direct_connection)
         self._initialize_pool()
     
     def _initialize_pool(self):
@@ -48,30 +75,52 @@ class DatabaseManager:
         # Try cloud connection first if configured
         if self.config.use_cloud and self.config.cloud_host:
             if self._try_cloud_connection():
+                self._reset_public_gate()
                 return
         
         # Fall back to local connection
         self._try_local_connection()
+        self._reset_public_gate()
     
-    def _try_cloud_connection(self) -> bool:
-        """Attempt to connect to cloud database."""
-        try:
-            logger.info(f"Attempting cloud database connection to {self.config.cloud_host}")
-            
-            pool_config = {
+    def _reset_public_gate(self):
+        """Size the public read gate to the pool minus the write reserve."""
+        pool_size = self.pool.pool_size if self.pool else 1
+        self._public_gate = threading.BoundedSemaphore(max(1, pool_size - self.config.reserved_write_connections))
+    
+    @staticmethod
+    def _pool_config(db_config, cloud: bool) -> Dict[str, Any]:
+        """Build pool arguments for the cloud or local database."""
+        if cloud:
+            return {
                 'pool_name': 'trms_cloud_pool',
-                'pool_size': 10,
+                'pool_size': db_config.cloud_pool_size,
                 'pool_reset_session': True,
-                'host': self.config.cloud_host,
-                'port': self.config.cloud_port,
-                'user': self.config.user,
-                'password': self.config.password,
-                'database': self.config.database,
+                'host': db_config.cloud_host,
+                'port': db_config.cloud_port,
+                'user': db_config.user,
+                'password': db_config.password,
+                'database': db_config.database,
                 'raise_on_warnings': False,
                 'connection_timeout': 10
             }
+        return {
+            'pool_name': 'trms_local_pool',
+            'pool_size': db_config.local_pool_size,
+            'pool_reset_session': True,
+            'host': db_config.local_host,
+            'port': db_config.local_port,
+            'user': db_config.user,
+            'password': db_config.password,
+            'database': db_config.database,
+            'raise_on_warnings': False
+        }
+    
+    def _try_cloud_connection(self) -> bool:
+        """Attempt to connect to cloud database."""
+        try:
+            logger.info(f"Attempting cloud database connection to {self.config.cloud_host}")
             
-            self.pool = pooling.MySQLConnectionPool(**pool_config)
+            self.pool = pooling.MySQLConnectionPool(**self._pool_config(self.config, cloud=True))
             
             # Test connection
             with self.get_connection() as conn:
@@ -95,33 +144,142 @@ class DatabaseManager:
         try:
             logger.info(f"Connecting to local database at {self.config.local_host}")
             
-            pool_config = {
-                'pool_name': 'trms_local_pool',
-                'pool_size': 5,
-                'pool_reset_session': True,
-                'host': self.config.local_host,
-                'port': self.config.local_port,
-                'user': self.config.user,
-                'password': self.config.password,
-                'database': self.config.database,
-                'raise_on_warnings': False
-            }
-            
-            self.pool = pooling.MySQLConnectionPool(**pool_config)
+            self.pool = pooling.MySQLConnectionPool(**self._pool_config(self.config, cloud=False))
             self.is_cloud_connected = False
             logger.info("✅ Connected to LOCAL database successfully")
             return True
             
         except Error as e:
             logger.error(f"Local database connection failed: {e}")
+            if os.environ.get('TRMS_WORKING_SET'):
+                # Timing laptop serving its race from a working set file
+                logger.warning("No database; running offline from the working set")
+                return False
             raise
     
+    def reinitialize(self, config_override: Optional[Dict] = None):
+        """Rebuild the connection pool, e.g. in a freshly forked worker process."""
+        if config_override:
+            self._overrides.update(config_override)
+            self.config = self.config.copy(update=config_override)
+        self.pool = None
+        self.is_cloud_connected = False
+        self._checkouts = {}
+        self._initialize_pool()
+    
+    def _build_pool(self, db_config):
+        """Build and test a pool without touching the current one; returns (pool, is_cloud)."""
+        if db_config.use_cloud and db_config.cloud_host:
+            try:
+                pool = pooling.MySQLConnectionPool(**self._pool_config(db_config, cloud=True))
+                probe = pool.get_connection()
+                try:
+                    cursor = probe.cursor()
+                    cursor.execute("SELECT 1")
+                    cursor.fetchone()
+                    cursor.close()
+                finally:
+                    probe.close()
+                return pool, True
+            except Error as e:
+                logger.warning(f"Cloud database connection failed: {e}")
+                if not db_config.auto_failover:
+                    raise
+        
+        return pooling.MySQLConnectionPool(**self._pool_config(db_config, cloud=False)), False
+    
+    def swap_pool(self, new_config, drain_timeout: float = 30.0) -> bool:
+        """Switch to a pool for new settings without failing in-flight queries.
+        
+        Process-level overrides (such as a server worker's pool size) are
+        kept. The current pool stays in use if the new one cannot connect.
+        """
+        if self._overrides:
+            new_config = new_config.copy(update=self._overrides)
+        try:
+            pool, is_cloud = self._build_pool(new_config)
+        except Error as e:
+            logger.error(f"New database settings rejected, keeping current pool: {e}")
+            return False
+        
+        with self._swap_lock:
+            old_pool = self.pool
+            self.config = new_config
+            self.pool = pool
+            self.is_cloud_connected = is_cloud
+            self._reset_public_gate()
+        
+        logger.info(f"Swapped to {'CLOUD' if is_cloud else 'LOCAL'} database pool at "
+                    f"{new_config.cloud_host if is_cloud else new_config.local_host}")
+        if old_pool is not None:
+            threading.Thread(target=self._retire_pool, args=(old_pool, drain_timeout),
+                             name="trms-pool-retire", daemon=True).start()
+        return True
+    
+    def _retire_pool(self, pool, drain_timeout: float):
+        """Close a replaced pool once its checked-out connections are back."""
+        deadline = time.monotonic() + drain_timeout
+        while self._checkouts.get(id(pool)) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        
+        in_use = self._checkouts.get(id(pool), 0)
+        if in_use:
+            logger.warning(f"Old database pool still had {in_use} connections after {drain_timeout}s")
+        # The pool has no public close; _remove_connections is private to
+        # mysql-connector, so use it only where this version still has it
+        remove_connections = getattr(pool, '_remove_connections', None)
+        if callable(remove_connections):
+            try:
+                # Stragglers return to the unreferenced pool and close with it
+                remove_connections()
+            except Exception as e:
+                logger.warning(f"Could not close old database pool: {e}")
+        else:
+            logger.info("Old database pool connections will close when it is garbage collected")
+        logger.info("Old database pool retired")
+    
+    def direct_connection(self, database: Optional[str] = None):
+        """Open a connection outside the pool (slow query EXPLAINs, backups).
+        
+        Goes to the database the pool is connected to; the caller closes it.
+        """
+        settings = self._pool_config(self.config, self.is_cloud_connected)
+        for key in ('pool_name', 'pool_size', 'pool_reset_session'):
+            settings.pop(key)
+        settings['connection_timeout'] = 5
+        if database:
+            settings['database'] = database
+        return mysql.connector.connect(**settings)
+    
+    def _check_slow(self, query: str, params, started: float, rows: int = 1):
+        """Hand a query over the slow query threshold to the slow query log."""
+        seconds = time.perf_counter() - started
+        threshold = self.config.slow_query_ms
+        if threshold and seconds * 1000 >= threshold:
+            self.slow_queries.record(query, params, seconds, rows)
+    
+    def _track(self, pool, delta: int):
+        """Count connections checked out of a pool."""
+        with self._checkout_lock:
+            count = self._checkouts.get(id(pool), 0) + delta
+            if count:
+                self._checkouts[id(pool)] = count
+            else:
+                self._checkouts.pop(id(pool), None)
+    
     @contextmanager
     def get_connection(self):
         """Get database connection from pool."""
         connection = None
+        # A concurrent swap_pool may replace self.pool; this checkout stays with the pool it came from
+        pool = self.pool
+        if pool is None:
+            raise Error(msg="Database is offline")
+        self._track(pool, 1)
         try:
-            connection = self.pool.get_connection()
+            started = time.perf_counter()
+            connection = pool.get_connection()
+            metrics.observe('trds_db_pool_wait_seconds', time.perf_counter() - started)
             yield connection
         except Error as e:
             logger.error(f"Database connection error: {e}")
@@ -129,13 +287,83 @@ class DatabaseManager:
             if "Failed getting connection" in str(e):
                 time.sleep(1)
                 self._initialize_pool()
-                connection = self.pool.get_connection()
+                self._track(pool, -1)
+                pool = self.pool
+                self._track(pool, 1)
+                connection = pool.get_connection()
                 yield connection
             else:
                 raise
         finally:
             if connection and connection.is_connected():
                 connection.close()
+            self._track(pool, -1)
+    
+    @contextmanager
+    def public_reads(self, timeout: Optional[float] = None):
+        """Admit a public read request.
+        
+        Public reads share the pool with timing and registration writes, so
+        they may only hold pool_size - reserved_write_connections connections
+        at once. Raises PoolBusyError if no slot frees up within the timeout.
+        
+        The reserve is per process: it keeps this process's pool free for
+        its own writes, not the database server's connections. N TRWS workers
+        can hold N * (pool_size - reserved_write_connections) server
+        connections for reads, so size max_connections for that plus every
+        writer's pool.
+        """
+        gate = self._public_gate
+        if gate is None:
+            yield
+            return
+        
+        timeout = self.config.public_read_timeout if timeout is None else timeout
+        if not gate.acquire(timeout=timeout):
+            raise PoolBusyError("Database busy; public reads are being shed")
+        try:
+            yield
+        finally:
+            gate.release()
+    
+    def has_read_capacity(self) -> bool:
+        """Check whether a public read would be admitted right now."""
+        gate = self._public_gate
+        if gate is None:
+            return True
+        if not gate.acquire(blocking=False):
+            return False
+        gate.release()
+        return True
+    
+    @contextmanager
+    def transaction(self):
+        """Run several statements on one connection as a single transaction."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                yield cursor
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                cursor.close()
+    
+    def ping(self, timeout: float = 2.0) -> bool:
+        """Run SELECT 1 with a statement time limit; False if the database does not answer."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    # MySQL stops the statement at the limit; MariaDB reads the hint as a comment
+                    cursor.execute(f"SELECT /*+ MAX_EXECUTION_TIME({int(timeout * 1000)}) */ 1")
+                    return cursor.fetchone() is not None
+                finally:
+                    cursor.close()
+        except Exception as e:
+            logger.warning(f"Database ping failed: {e}")
+            return False
     
     def test_connection(self) -> bool:
         """Test database connectivity."""
@@ -150,26 +378,61 @@ class DatabaseManager:
             logger.error(f"Connection test failed: {e}")
             return False
     
+    @timed('trds_db_call_seconds')
     def execute_query(self, query: str, params: Optional[tuple] = None) -> List[Dict]:
         """Execute SELECT query."""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor(dictionary=True)
+                started = time.perf_counter()
                 cursor.execute(query, params or ())
                 results = cursor.fetchall()
+                self._check_slow(query, params, started)
                 cursor.close()
                 return results
         except Error as e:
             logger.error(f"Query failed: {e}")
             raise
     
+    def stream_query(self, query: str, params: Optional[tuple] = None,
+                     batch_size: int = 1000) -> Iterator[List[Dict]]:
+        """Execute SELECT query and yield rows in batches from a server-side cursor.
+        
+        The pooled connection is held until the generator is exhausted or closed.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor(dictionary=True, buffered=False)
+            try:
+                started = time.perf_counter()
+                cursor.execute(query, params or ())
+                self._check_slow(query, params, started)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield rows
+            except Error as e:
+                logger.error(f"Streaming query failed: {e}")
+                raise
+            finally:
+                # Unread rows must be drained before the connection returns to the pool
+                try:
+                    while cursor.fetchmany(batch_size):
+                        pass
+                except Error:
+                    pass
+                cursor.close()
+    
+    @timed('trds_db_call_seconds')
     def execute_update(self, query: str, params: Optional[tuple] = None) -> int:
         """Execute INSERT/UPDATE/DELETE query."""
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
+                started = time.perf_counter()
                 cursor.execute(query, params or ())
                 conn.commit()
+                self._check_slow(query, params, started)
                 affected = cursor.rowcount
                 cursor.close()
                 return affected
@@ -177,6 +440,43 @@ class DatabaseManager:
             logger.error(f"Update failed: {e}")
             raise
     
+    @timed('trds_db_call_seconds')
+    def execute_insert(self, query: str, params: Optional[tuple] = None) -> int:
+        """Execute INSERT query and return the new row ID."""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                started = time.perf_counter()
+                cursor.execute(query, params or ())
+                conn.commit()
+                self._check_slow(query, params, started)
+                row_id = cursor.lastrowid
+                cursor.close()
+                return row_id
+        except Error as e:
+            logger.error(f"Insert failed: {e}")
+            raise
+    
+    @timed('trds_db_call_seconds')
+    def execute_many(self, query: str, params_list: List[tuple]) -> int:
+        """Execute INSERT/UPDATE/DELETE query for many rows in one transaction."""
+        if not params_list:
+            return 0
+        
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                started = time.perf_counter()
+                cursor.executemany(query, params_list)
+                conn.commit()
+                self._check_slow(query, params_list[0], started, len(params_list))
+                affected = cursor.rowcount
+                cursor.close()
+                return affected
+        except Error as e:
+            logger.error(f"Bulk update failed: {e}")
+            raise
+    
     def get_status(self) -> Dict[str, Any]:
         """Get connection status information."""
         return {
@@ -184,7 +484,8 @@ class DatabaseManager:
             'is_cloud': self.is_cloud_connected,
             'host': self.config.cloud_host if self.is_cloud_connected else self.config.local_host,
             'database': self.config.database,
-            'pool_size': self.pool.pool_size if self.pool else 0
+            'pool_size': self.pool.pool_size if self.pool else 0,
+            'reserved_write_connections': self.config.reserved_write_connections
         }
 
 # Global database manager
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🗂️ TRDS Partitions and Season Archive
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    participants and race_times are partitioned by race_id range, one
+    partition per DEFAULT_SPAN races. Every TRDS query on them already
+    filters or joins on race_id, so MySQL prunes to the partition holding
+    the race without any change to the managers. Races get increasing IDs
+    as they are created, so old seasons end up in old partitions.
+
+    PartitionManager keeps empty partitions ahead of the newest race (split
+    from pmax, which is cheap while it is empty), converts tables created
+    before partitioning (after bringing their columns and keys up to date,
+    see schema.py) and drops partitions left empty by the archive.
+    The archive moves the participants and times of a completed season's
+    races into compressed, unpartitioned <table>_archive tables and marks
+    the races archived; the manager reads fall back to them for those races.
+
+        python3 -m libraries.database.partitions --status
+        python3 -m libraries.database.partitions --maintain
+        python3 -m libraries.database.partitions --archive 2023
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import logging
+import sys
+from datetime import date
+from typing import Optional, Dict, Any, List
+
+from .connection import db_manager
+from .schema import upgrade_schema
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Tables partitioned by race_id range
+PARTITIONED_TABLES = ('participants', 'race_times')
+
+# Race IDs per partition
+DEFAULT_SPAN = 250
+
+# Empty partitions kept ahead of the newest race
+HEADROOM = 2
+
+# Races moved per archive transaction
+ARCHIVE_BATCH = 10
+
+def archive_table(table: str) -> str:
+    """Name of a partitioned table's archive table."""
+    return f"{table}_archive"
+
+def is_archived(race_id: int) -> bool:
+    """Whether a race's participants and times live in the archive tables."""
+    rows = db_manager.execute_query(
+        "SELECT archived_at FROM races WHERE race_id = %s", (race_id,)
+    )
+    return bool(rows) and rows[0]['archived_at'] is not None
+
+def has_archive() -> bool:
+    """Whether the archive tables have been created yet."""
+    rows = db_manager.execute_query("""
+        SELECT COUNT(*) AS table_count FROM information_schema.TABLES
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN (%s, %s)
+    """, tuple(archive_table(table) for table in PARTITIONED_TABLES))
+    return bool(rows) and rows[0]['table_count'] == len(PARTITIONED_TABLES)
+
+class PartitionManager:
+    """Keeps race_id range partitions ahead of the races table."""
+
+    def __init__(self, span: int = DEFAULT_SPAN, headroom: int = HEADROOM):
+        """Initialize partition manager."""
+        self.span = span
+        self.headroom = headroom
+
+    def get_partitions(self, table: str) -> List[Dict[str, Any]]:
+        """Partitions of a table in order; empty if it is not partitioned."""
+        rows = db_manager.execute_query("""
+            SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS bound, TABLE_ROWS AS estimated_rows
+            FROM information_schema.PARTITIONS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+            ORDER BY PARTITION_ORDINAL_POSITION
+        """, (table,))
+        return rows
+
+    def _bounds(self, partitions: List[Dict[str, Any]]) -> List[int]:
+        """Upper bounds of the ranged partitions (everything but pmax)."""
+        return [int(p['bound']) for p in partitions if p['bound'] != 'MAXVALUE']
+
+    def _target_bound(self) -> int:
+        """Upper bound the last ranged partition should reach."""
+        rows = db_manager.execute_query("SELECT COALESCE(MAX(race_id), 0) AS max_id FROM races")
+        max_id = rows[0]['max_id'] if rows else 0
+        return (max_id // self.span + 1 + self.headroom) * self.span
+
+    def ensure_partitions(self, table: str) -> List[str]:
+        """Split new partitions out of pmax up to the headroom; returns their names."""
+        partitions = self.get_partitions(table)
+        if not partitions:
+            logger.warning(f"{table} is not partitioned; run --convert first")
+            return []
+
+        bounds = self._bounds(partitions)
+        last = bounds[-1] if bounds else 0
+        new_bounds = list(range(last + self.span, self._target_bound() + 1, self.span))
+        if not new_bounds:
+            return []
+
+        definitions = ", ".join(f"PARTITION p{bound} VALUES LESS THAN ({bound})" for bound in new_bounds)
+        db_manager.execute_update(
+            f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO "
+            f"({definitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+        )
+        names = [f"p{bound}" for bound in new_bounds]
+        logger.info(f"Added partitions to {table}: {', '.join(names)}")
+        return names
+
+    def drop_empty_partitions(self, table: str) -> List[str]:
+        """Drop ranged partitions below the oldest live race that hold no rows."""
+        rows = db_manager.execute_query(
+            "SELECT MIN(race_id) AS oldest FROM races WHERE archived_at IS NULL"
+        )
+        oldest = rows[0]['oldest'] if rows and rows[0]['oldest'] is not None else None
+
+        empty = []
+        for partition in self.get_partitions(table):
+            if partition['bound'] == 'MAXVALUE':
+                break
+            if oldest is None or int(partition['bound']) > oldest:
+                break
+            # TABLE_ROWS is an estimate; count before dropping anything
+            count = db_manager.execute_query(
+                f"SELECT COUNT(*) AS row_count FROM {table} PARTITION ({partition['name']})"
+            )
+            if count and count[0]['row_count'] == 0:
+                empty.append(partition['name'])
+
+        if empty:
+            db_manager.execute_update(f"ALTER TABLE {table} DROP PARTITION {', '.join(empty)}")
+            logger.info(f"Dropped empty partitions from {table}: {', '.join(empty)}")
+        return empty
+
+    def convert(self, table: str) -> bool:
+        """Partition a table created before partitioning, dropping the foreign keys MySQL refuses."""
+        if self.get_partitions(table):
+            return False
+
+        foreign_keys = db_manager.execute_query("""
+            SELECT DISTINCT TABLE_NAME AS table_name, CONSTRAINT_NAME AS name
+            FROM information_schema.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = DATABASE() AND REFERENCED_TABLE_NAME IS NOT NULL
+              AND (TABLE_NAME = %s OR REFERENCED_TABLE_NAME = %s)
+        """, (table, table))
+        for key in foreign_keys:
+            db_manager.execute_update(f"ALTER TABLE {key['table_name']} DROP FOREIGN KEY {key['name']}")
+            logger.info(f"Dropped foreign key {key['name']} on {key['table_name']}")
+
+        key_rows = db_manager.execute_query("""
+            SELECT COLUMN_NAME AS name FROM information_schema.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_NAME = 'PRIMARY'
+            ORDER BY ORDINAL_POSITION
+        """, (table,))
+        key = [row['name'] for row in key_rows]
+        if 'race_id' not in key:
+            key.append('race_id')
+
+        bound = self._target_bound()
+        definitions = ", ".join(f"PARTITION p{b} VALUES LESS THAN ({b})"
+                                for b in range(self.span, bound + 1, self.span))
+        db_manager.execute_update(
+            f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY ({', '.join(key)}) "
+            f"PARTITION BY RANGE (race_id) ({definitions}, PARTITION pmax VALUES LESS THAN MAXVALUE)"
+        )
+        logger.info(f"Partitioned {table} by race_id up to {bound}")
+        return True
+
+    def convert_all(self) -> Dict[str, Any]:
+        """Upgrade an existing database's columns and keys, then partition every table."""
+        schema = upgrade_schema()
+        return {'schema': schema,
+                'partitioned': [table for table in PARTITIONED_TABLES if self.convert(table)]}
+
+    def maintain(self) -> Dict[str, Dict[str, List[str]]]:
+        """Add partitions ahead and drop empty ones behind, for every table."""
+        return {table: {'added': self.ensure_partitions(table),
+                        'dropped': self.drop_empty_partitions(table)}
+                for table in PARTITIONED_TABLES}
+
+class SeasonArchiver:
+    """Moves completed seasons out of the live partitioned tables."""
+
+    def __init__(self, partitions: Optional[PartitionManager] = None, batch_races: int = ARCHIVE_BATCH):
+        """Initialize archiver."""
+        self.partitions = partitions or PartitionManager()
+        self.batch_races = batch_races
+
+    def ensure_archive_tables(self) -> List[str]:
+        """Create compressed, unpartitioned copies of the live tables if missing."""
+        created = []
+        for table in PARTITIONED_TABLES:
+            archive = archive_table(table)
+            existing = db_manager.execute_query("""
+                SELECT TABLE_NAME FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            """, (archive,))
+            if existing:
+                continue
+            db_manager.execute_update(f"CREATE TABLE {archive} LIKE {table}")
+            if self.partitions.get_partitions(archive):
+                db_manager.execute_update(f"ALTER TABLE {archive} REMOVE PARTITIONING")
+            db_manager.execute_update(f"ALTER TABLE {archive} ROW_FORMAT=COMPRESSED KEY_BLOCK_SIZE=8")
+            created.append(archive)
+            logger.info(f"Created archive table {archive}")
+        return created
+
+    def _columns(self, table: str) -> List[str]:
+        """Columns to copy; generated columns are recomputed by MySQL."""
+        rows = db_manager.execute_query("""
+            SELECT COLUMN_NAME AS name FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND EXTRA NOT LIKE '%%GENERATED%%'
+            ORDER BY ORDINAL_POSITION
+        """, (table,))
+        return [row['name'] for row in rows]
+
+    def completed_races(self, season: int) -> List[int]:
+        """Unarchived races held in or before a season that are already over."""
+        rows = db_manager.execute_query("""
+            SELECT race_id FROM races
+            WHERE race_date < %s AND race_date < CURDATE() AND archived_at IS NULL
+            ORDER BY race_id
+        """, (date(season + 1, 1, 1),))
+        return [row['race_id'] for row in rows]
+
+    def archive_races(self, race_ids: List[int]) -> Dict[str, int]:
+        """Move races' participants and times to the archive, one transaction per batch."""
+        self.ensure_archive_tables()
+        columns = {table: ", ".join(self._columns(table)) for table in PARTITIONED_TABLES}
+        moved = {table: 0 for table in PARTITIONED_TABLES}
+
+        for start in range(0, len(race_ids), self.batch_races):
+            batch = tuple(race_ids[start:start + self.batch_races])
+            placeholders = ", ".join(["%s"] * len(batch))
+            with db_manager.transaction() as cursor:
+                for table in PARTITIONED_TABLES:
+                    cursor.execute(
+                        f"INSERT INTO {archive_table(table)} ({columns[table]}) "
+                        f"SELECT {columns[table]} FROM {table} WHERE race_id IN ({placeholders})",
+                        batch
+                    )
+                    moved[table] += cursor.rowcount
+                    cursor.execute(f"DELETE FROM {table} WHERE race_id IN ({placeholders})", batch)
+                cursor.execute(
+                    f"UPDATE races SET archived_at = NOW() WHERE race_id IN ({placeholders})", batch
+                )
+            logger.info(f"Archived races {batch[0]}-{batch[-1]}")
+        return moved
+
+    def archive_season(self, season: int) -> Dict[str, Any]:
+        """Archive every completed race up to and including a past season."""
+        if season >= date.today().year:
+            raise ValueError(f"Season {season} is not over yet")
+
+        race_ids = self.completed_races(season)
+        moved = self.archive_races(race_ids) if race_ids else {table: 0 for table in PARTITIONED_TABLES}
+        dropped = {table: self.partitions.drop_empty_partitions(table) for table in PARTITIONED_TABLES}
+        return {'season': season, 'races': len(race_ids), 'rows': moved, 'dropped': dropped}
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="TRDS partition maintenance and season archive")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--status', action='store_true', help="Show partitions and estimated rows")
+    mode.add_argument('--maintain', action='store_true', help="Add partitions ahead, drop empty ones behind")
+    mode.add_argument('--convert', action='store_true', help="Partition tables created before partitioning")
+    mode.add_argument('--archive', type=int, metavar='SEASON', help="Archive completed races up to this year")
+    parser.add_argument('--span', type=int, default=DEFAULT_SPAN, help="Race IDs per partition")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    manager = PartitionManager(span=args.span)
+
+    try:
+        if args.status:
+            for table in PARTITIONED_TABLES + tuple(archive_table(t) for t in PARTITIONED_TABLES):
+                partitions = manager.get_partitions(table)
+                if not partitions:
+                    print(f"{table}: not partitioned")
+                    continue
+                print(f"{table}:")
+                for partition in partitions:
+                    print(f"  {partition['name']:<10} < {partition['bound']:<10} ~{partition['estimated_rows']} rows")
+        elif args.maintain:
+            for table, changes in manager.maintain().items():
+                print(f"{table}: added {len(changes['added'])}, dropped {len(changes['dropped'])}")
+        elif args.convert:
+            result = manager.convert_all()
+            schema, converted = result['schema'], result['partitioned']
+            print(f"Columns added: {', '.join(schema.columns) if schema.columns else 'none'}")
+            print(f"Indexes added: {', '.join(schema.indexes) if schema.indexes else 'none'}")
+            print(f"Partitioned: {', '.join(converted) if converted else 'nothing to do'}")
+            for key, groups in schema.duplicates.items():
+                print(f"⚠️  {key} not added; fix these duplicates and run --convert again:")
+                for group in groups:
+                    values = ", ".join(f"{name}={value}" for name, value in group.items() if name != 'row_count')
+                    print(f"  {values} ({group['row_count']} rows)")
+            if schema.duplicates:
+                return 1
+        else:
+            result = SeasonArchiver(manager).archive_season(args.archive)
+            rows = ", ".join(f"{count} {table}" for table, count in result['rows'].items())
+            print(f"🗄️  Season {result['season']}: {result['races']} races archived ({rows})")
+    except Exception as e:
+        logger.error(f"Partition maintenance failed: {e}")
+        return 1
+    return 0
+
+# Global partition manager
+partition_manager = PartitionManager()
+
+if __name__ == "__main__":
+    sys.exit(main())
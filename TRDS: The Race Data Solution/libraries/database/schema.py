@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧱 TRDS Schema Upgrade
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Brings a database created from an older sql/init/02_create_tables.sql
+    up to date. CREATE TABLE IF NOT EXISTS never changes a table that
+    already exists, so the columns and keys added since are applied here
+    with ALTER TABLE. A unique key is only added once no rows would break
+    it; until then its duplicates are reported and the key is added on a
+    later run. PartitionManager.convert_all runs the upgrade first:
+
+        python3 -m libraries.database.partitions --convert
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import logging
+from typing import Dict, Any, List, NamedTuple, Set, Tuple
+
+from .connection import db_manager
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Duplicate groups reported per unique key
+DUPLICATE_SAMPLE = 20
+
+class AddedIndex(NamedTuple):
+    """Index added to a table after its first release."""
+    name: str
+    columns: Tuple[str, ...]
+    unique: bool = False
+
+    @property
+    def definition(self) -> str:
+        """Index clause for ALTER TABLE ... ADD."""
+        kind = "UNIQUE KEY" if self.unique else "INDEX"
+        return f"{kind} {self.name} ({', '.join(self.columns)})"
+
+# Columns added since the first release, per table, in the order to add them
+ADDED_COLUMNS: Dict[str, List[Tuple[str, str]]] = {
+    'races': [
+        ('archived_at', "TIMESTAMP NULL AFTER chip_timing"),
+    ],
+    'participants': [
+        ('age_on_race_day', "TINYINT UNSIGNED AFTER gender"),
+        ('age_group', "VARCHAR(20) AFTER age_on_race_day"),
+        ('rfid_tag', "VARCHAR(50) AFTER bib_number"),
+        ('payment_reference', "VARCHAR(100) AFTER amount_paid"),
+    ],
+}
+
+# Indexes added since the first release, per table
+ADDED_INDEXES: Dict[str, List[AddedIndex]] = {
+    'participants': [
+        AddedIndex('uq_race_bib', ('race_id', 'bib_number'), unique=True),
+        AddedIndex('idx_race_rfid', ('race_id', 'rfid_tag')),
+        AddedIndex('idx_race_updated', ('race_id', 'updated_at')),
+        AddedIndex('idx_updated', ('updated_at',)),
+        AddedIndex('idx_race_age_group', ('race_id', 'gender', 'age_group')),
+        AddedIndex('idx_race_status', ('race_id', 'registration_status')),
+        AddedIndex('idx_payment_reference', ('payment_reference',)),
+    ],
+    'race_times': [
+        AddedIndex('uq_race_participant', ('race_id', 'participant_id'), unique=True),
+        AddedIndex('idx_race_times_updated', ('race_id', 'updated_at')),
+        AddedIndex('idx_updated', ('updated_at',)),
+    ],
+}
+
+class SchemaReport(NamedTuple):
+    """What upgrade_schema changed and what it could not."""
+    columns: List[str]
+    indexes: List[str]
+    duplicates: Dict[str, List[Dict[str, Any]]]
+
+def existing_columns(table: str) -> Set[str]:
+    """Columns a table has; empty if it does not exist."""
+    rows = db_manager.execute_query("""
+        SELECT COLUMN_NAME AS name FROM information_schema.COLUMNS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return {row['name'] for row in rows}
+
+def existing_indexes(table: str) -> Set[str]:
+    """Index names a table has."""
+    rows = db_manager.execute_query("""
+        SELECT DISTINCT INDEX_NAME AS name FROM information_schema.STATISTICS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    return {row['name'] for row in rows}
+
+def find_duplicates(table: str, columns: Tuple[str, ...], limit: int = DUPLICATE_SAMPLE) -> List[Dict[str, Any]]:
+    """Value groups that would break a unique key on ``columns``; NULLs never clash."""
+    names = ", ".join(columns)
+    not_null = " AND ".join(f"{column} IS NOT NULL" for column in columns)
+    return db_manager.execute_query(
+        f"SELECT {names}, COUNT(*) AS row_count FROM {table} WHERE {not_null} "
+        f"GROUP BY {names} HAVING COUNT(*) > 1 ORDER BY {names} LIMIT %s",
+        (limit,)
+    )
+
+def upgrade_schema() -> SchemaReport:
+    """Add missing columns and indexes; unique keys wait until their duplicates are fixed."""
+    report = SchemaReport([], [], {})
+
+    for table, columns in ADDED_COLUMNS.items():
+        present = existing_columns(table)
+        if not present:
+            continue
+        for column, definition in columns:
+            if column not in present:
+                db_manager.execute_update(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                report.columns.append(f"{table}.{column}")
+                logger.info(f"Added column {table}.{column}")
+
+    for table, indexes in ADDED_INDEXES.items():
+        if not existing_columns(table):
+            continue
+        present = existing_indexes(table)
+        missing = []
+        for index in indexes:
+            if index.name in present:
+                continue
+            if index.unique:
+                duplicates = find_duplicates(table, index.columns)
+                if duplicates:
+                    report.duplicates[f"{table}.{index.name}"] = duplicates
+                    logger.warning(f"Not adding {index.name} to {table}: "
+                                   f"{len(duplicates)}+ duplicate ({', '.join(index.columns)}) groups")
+                    continue
+            missing.append(index)
+
+        if missing:
+            # One ALTER rebuilds the table once for every index
+            db_manager.execute_update(
+                f"ALTER TABLE {table} " + ", ".join(f"ADD {index.definition}" for index in missing)
+            )
+            report.indexes.extend(f"{table}.{index.name}" for index in missing)
+            logger.info(f"Added indexes to {table}: {', '.join(index.name for index in missing)}")
+
+    return report
@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🐢 TRMS Slow Query Log
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Records queries through DatabaseManager that take longer than
+    database.slow_query_ms. The query thread only hands the SQL, a sample
+    of its parameters and the duration to a queue; a background thread
+    fingerprints the SQL (literals and placeholder lists folded to ?),
+    keeps the slowest fingerprints in memory, runs EXPLAIN on its own
+    connection (never one from the pool, which may be why the query was
+    slow) and appends one JSON line per slow query to
+    logs/trds/slow_queries.<pid>.log, rotated like the other TRMS logs.
+    Each process rotates only its own file; read_log() merges them all.
+    When a process opens its file it prunes those left by exited
+    processes that are more than a week old or beyond the newest 50.
+
+        for stats in db_manager.slow_queries.top(10):
+            print(stats.fingerprint, stats.count, stats.max_seconds, stats.sql)
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Callable, Sequence
+
+from ..utils.config import config
+from ..utils.paths import paths
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Distinct fingerprints kept in memory; the least costly is evicted first
+MAX_FINGERPRINTS = 500
+
+# Parameter samples kept per fingerprint
+PARAM_SAMPLES = 3
+
+# Slow queries waiting for the background thread; more are dropped
+QUEUE_SIZE = 1000
+
+# Seconds before the same fingerprint is explained again
+EXPLAIN_INTERVAL = 600.0
+
+# Days the log files of exited processes are kept
+DEAD_LOG_RETENTION_DAYS = 7
+
+# Log files of exited processes kept at most, newest first
+DEAD_LOG_MAX_FILES = 50
+
+# Statements MySQL can EXPLAIN without running them
+EXPLAINABLE = ('select', 'with', 'insert', 'replace', 'update', 'delete')
+
+_COMMENT = re.compile(r"/\*.*?\*/|--[^\n]*|#[^\n]*", re.S)
+_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.I)
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_ROW_LIST = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_SPACE = re.compile(r"\s+")
+
+def process_log_path(log_path: Path, pid: Optional[int] = None) -> Path:
+    """Per-process file for a slow query log path: slow_queries.log -> slow_queries.<pid>.log."""
+    pid = os.getpid() if pid is None else pid
+    return log_path.with_name(f"{log_path.stem}.{pid}{log_path.suffix}")
+
+def pid_alive(pid: int) -> bool:
+    """Whether a process with this ID is running on this host."""
+    if os.name == 'nt':
+        # os.kill cannot probe a process on Windows; age and count still prune
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def prune_process_logs(log_path: Path, max_age_days: float = DEAD_LOG_RETENTION_DAYS,
+                       max_files: int = DEAD_LOG_MAX_FILES, alive: Callable[[int], bool] = pid_alive) -> int:
+    """Delete old per-process logs of exited processes; returns the number removed."""
+    pattern = re.compile(rf"{re.escape(log_path.stem)}\.(\d+){re.escape(log_path.suffix)}(?:\.\d+)?")
+    dead = []
+    for path in log_path.parent.glob(f"{log_path.stem}.*{log_path.suffix}*"):
+        match = pattern.fullmatch(path.name)
+        if match and int(match.group(1)) != os.getpid() and not alive(int(match.group(1))):
+            try:
+                dead.append((path.stat().st_mtime, path))
+            except OSError:
+                continue
+
+    dead.sort(reverse=True)
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for index, (mtime, path) in enumerate(dead):
+        if index >= max_files or mtime < cutoff:
+            try:
+                path.unlink()
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+def normalize_sql(query: str) -> str:
+    """Reduce SQL to its shape: no comments or literals, one space between tokens."""
+    sql = _COMMENT.sub(" ", query)
+    sql = _STRING.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?+)", sql)
+    sql = _ROW_LIST.sub("(?+)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+def fingerprint(query: str) -> str:
+    """Short stable ID for every query with the same shape."""
+    return hashlib.sha1(normalize_sql(query).encode('utf-8')).hexdigest()[:16]
+
+def sample_params(params: Optional[Sequence], limit: int = 40) -> Optional[List[str]]:
+    """Short printable copy of query parameters."""
+    if params is None:
+        return None
+    if isinstance(params, dict):
+        params = list(params.values())
+
+    sample = []
+    for value in params:
+        if isinstance(value, (bytes, bytearray)):
+            text = f"<{len(value)} bytes>"
+        else:
+            text = repr(value)
+            if len(text) > limit:
+                text = text[:limit - 3] + "..."
+        sample.append(text)
+    return sample
+
+class SlowQueryStats:
+    """Running totals for one query fingerprint."""
+
+    __slots__ = ('fingerprint', 'sql', 'count', 'total_seconds', 'max_seconds',
+                 'last_seen', 'samples', 'plan', 'explained_at')
+
+    def __init__(self, fingerprint: str, sql: str):
+        """Initialize empty stats."""
+        self.fingerprint = fingerprint
+        self.sql = sql
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.last_seen: Optional[datetime] = None
+        self.samples: deque = deque(maxlen=PARAM_SAMPLES)
+        self.plan: Optional[List[Dict[str, Any]]] = None
+        self.explained_at = float('-inf')
+
+    @property
+    def mean_seconds(self) -> float:
+        """Average duration."""
+        return self.total_seconds / self.count if self.count else 0.0
+
+class SlowQueryLog:
+    """Slow query recorder with EXPLAIN capture and an in-memory top-N table."""
+
+    def __init__(self, connect: Callable[[], Any], log_path: Optional[Path] = None,
+                 explain_interval: float = EXPLAIN_INTERVAL):
+        """Initialize slow query log; ``connect`` opens a connection for EXPLAIN."""
+        self.connect = connect
+        self.log_path = log_path or paths.get_log_dir('trds') / 'slow_queries.log'
+        self.explain_interval = explain_interval
+
+        self._queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self._stats: Dict[str, SlowQueryStats] = {}
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+        self._explain_conn = None
+        self._writer: Optional[logging.Logger] = None
+        self.dropped = 0
+
+    def record(self, query: str, params: Optional[Sequence], seconds: float, rows: int = 1):
+        """Queue a slow query; never blocks the caller."""
+        if self._pid != os.getpid():
+            self._start()
+        try:
+            self._queue.put_nowait((query, params, seconds, rows, datetime.now()))
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        """Start the background thread, again after a fork."""
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Inherited from the parent process; its thread did not survive the fork
+                self._queue = queue.Queue(maxsize=QUEUE_SIZE)
+                self._stats = {}
+                self._explain_conn = None
+                self._writer = None
+            self._thread = threading.Thread(target=self._run, name="trms-slow-queries", daemon=True)
+            self._thread.start()
+            self._pid = os.getpid()
+
+    def _run(self):
+        """Process slow queries until the interpreter exits."""
+        while True:
+            item = self._queue.get()
+            try:
+                self._process(*item)
+            except Exception as e:
+                logger.error(f"Could not record slow query: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _process(self, query: str, params: Optional[Sequence], seconds: float, rows: int, seen: datetime):
+        """Update the fingerprint's stats, explain it if due and write the log line."""
+        sql = normalize_sql(query)
+        key = hashlib.sha1(sql.encode('utf-8')).hexdigest()[:16]
+        sample = sample_params(params)
+
+        with self._stats_lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                if len(self._stats) >= MAX_FINGERPRINTS:
+                    cheapest = min(self._stats.values(), key=lambda s: s.total_seconds)
+                    del self._stats[cheapest.fingerprint]
+                stats = self._stats[key] = SlowQueryStats(key, sql)
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.last_seen = seen
+            stats.samples.append(sample)
+
+        plan = None
+        if time.monotonic() - stats.explained_at >= self.explain_interval:
+            stats.explained_at = time.monotonic()
+            plan = self._explain(query, params)
+            if plan is not None:
+                stats.plan = plan
+            logger.warning(f"Slow query {seconds * 1000:.0f}ms [{key}]: {sql[:200]}")
+
+        entry = {
+            'time': seen.isoformat(timespec='milliseconds'),
+            'pid': os.getpid(),
+            'fingerprint': key,
+            'ms': round(seconds * 1000, 1),
+            'rows': rows,
+            'sql': sql,
+            'params': sample,
+        }
+        if plan is not None:
+            entry['plan'] = plan
+        self._write(entry)
+
+    def _explain(self, query: str, params: Optional[Sequence]) -> Optional[List[Dict[str, Any]]]:
+        """Run EXPLAIN on the dedicated connection; None if the statement cannot be explained."""
+        if query.lstrip().split(None, 1)[0].lower() not in EXPLAINABLE:
+            return None
+        try:
+            if self._explain_conn is None or not self._explain_conn.is_connected():
+                self._explain_conn = self.connect()
+            cursor = self._explain_conn.cursor(dictionary=True)
+            try:
+                cursor.execute(f"EXPLAIN {query}", params or ())
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception as e:
+            self._close_explain_conn()
+            return [{'error': str(e)}]
+
+    def _close_explain_conn(self):
+        """Drop the EXPLAIN connection so the next one reconnects."""
+        conn, self._explain_conn = self._explain_conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _write(self, entry: Dict[str, Any]):
+        """Append one JSON line to this process's rotating slow query log."""
+        if self._writer is None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                prune_process_logs(self.log_path)
+            except Exception as e:
+                logger.warning(f"Could not prune old slow query logs: {e}")
+            # One file per process: a RotatingFileHandler cannot share a file with another process
+            handler = RotatingFileHandler(process_log_path(self.log_path), maxBytes=config.logging.max_bytes,
+                                          backupCount=config.logging.backup_count, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            writer = logging.getLogger('trms.slow_queries')
+            writer.propagate = False
+            writer.setLevel(logging.INFO)
+            for old in list(writer.handlers):
+                writer.removeHandler(old)
+                old.close()
+            writer.addHandler(handler)
+            self._writer = writer
+        self._writer.info(json.dumps(entry, default=str))
+
+    def top(self, n: Optional[int] = None) -> List[SlowQueryStats]:
+        """Fingerprints that cost the most total time, slowest first."""
+        n = config.database.slow_query_top if n is None else n
+        with self._stats_lock:
+            ranked = sorted(self._stats.values(), key=lambda s: s.total_seconds, reverse=True)
+        return ranked[:n]
+
+    def wait_idle(self, timeout: float = 5.0) -> bool:
+        """Wait until queued slow queries are processed; returns False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def reset(self):
+        """Forget every recorded fingerprint."""
+        with self._stats_lock:
+            self._stats = {}
+
+def read_log(log_path: Optional[Path] = None, n: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Summarize the slow query log (and its rotated backups) across all processes."""
+    log_path = log_path or paths.get_log_dir('trds') / 'slow_queries.log'
+    n = config.database.slow_query_top if n is None else n
+    # Every process's file and rotated backups, plus a shared file from older versions
+    files = sorted(log_path.parent.glob(f"{log_path.stem}.*{log_path.suffix}*"))
+    files += sorted(log_path.parent.glob(f"{log_path.name}*"))
+
+    summary: Dict[str, Dict[str, Any]] = {}
+    for path in files:
+        if not path.is_file():
+            continue
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                row = summary.setdefault(entry['fingerprint'], {
+                    'fingerprint': entry['fingerprint'], 'sql': entry['sql'],
+                    'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_seen': None, 'plan': None,
+                })
+                row['count'] += 1
+                row['total_ms'] += entry['ms']
+                row['max_ms'] = max(row['max_ms'], entry['ms'])
+                # Files interleave in time, so keep the newest line's time and plan
+                if row['last_seen'] is None or entry['time'] >= row['last_seen']:
+                    row['last_seen'] = entry['time']
+                    if entry.get('plan'):
+                        row['plan'] = entry['plan']
+                elif row['plan'] is None and entry.get('plan'):
+                    row['plan'] = entry['plan']
+
+    return sorted(summary.values(), key=lambda row: row['total_ms'], reverse=True)[:n]
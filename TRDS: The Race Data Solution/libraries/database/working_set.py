@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧳 TRDS Race Working Set
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Snapshot of one race for a timing laptop: the race row, its
+    participants (bibs and RFID tags included) and its age group brackets,
+    written to a single file that is opened with mmap. Opening reads only
+    a small header and catalog, so a timing station starts in milliseconds
+    with no database reachable. Every row is a fixed-size record of
+    (offset, length) pairs into a shared string heap. Sorted key arrays
+    answer participant ID, bib and RFID lookups by binary search over the
+    mapped bytes, and a lookup decodes only the record it returns.
+
+    While a working set is active for a race, RaceManager.get_race_by_id,
+    the participant lookups and AgeGroupManager.get_brackets serve that
+    race from the file; everything else still goes to the database.
+
+        python3 -m libraries.database.working_set --build 12
+        TRMS_WORKING_SET=cache/working_set/race_12.trws python3 -m ...
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Iterator, Tuple
+
+from ..timing.announcer import normalize_rfid
+from ..utils.paths import paths
+from .connection import db_manager
+from .partitions import archive_table, is_archived
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+WORKING_SET_FORMAT = 1
+MAGIC = b'TRMSWSET'
+
+# Magic, format, catalog length
+HEADER = struct.Struct('<8sHI')
+
+# Key offset, key length, row number
+INDEX_ENTRY = struct.Struct('<III')
+
+# Heap offset marking a NULL value
+NULL = 0xFFFFFFFF
+
+DEFAULT_DIR = paths.get_cache_dir('working_set')
+
+# Tables in a working set: query by race_id and the columns to index
+TABLES = {
+    'races': ("SELECT * FROM races WHERE race_id = %s", ()),
+    'participants': ("SELECT * FROM {table} WHERE race_id = %s ORDER BY last_name, first_name",
+                     ('participant_id', 'bib_number', 'rfid_tag')),
+    'age_group_brackets': ("SELECT * FROM age_group_brackets WHERE race_id = %s ORDER BY min_age ASC", ()),
+}
+
+# Lookup keys are normalized the same way when written and when searched
+KEY_NORMALIZERS = {
+    'bib_number': lambda value: str(value).strip() or None,
+    'rfid_tag': normalize_rfid,
+}
+
+# Column type codes: how a value is written to the heap and read back
+DECODERS = {
+    's': lambda text: text,
+    'i': int,
+    'f': float,
+    'n': Decimal,
+    'b': lambda text: text == '1',
+    'd': date.fromisoformat,
+    't': datetime.fromisoformat,
+    'T': lambda text: timedelta(seconds=float(text)),
+}
+
+def _type_code(value: Any) -> str:
+    """Type code for a column from one of its non-NULL values."""
+    if isinstance(value, bool):
+        return 'b'
+    if isinstance(value, int):
+        return 'i'
+    if isinstance(value, float):
+        return 'f'
+    if isinstance(value, Decimal):
+        return 'n'
+    if isinstance(value, datetime):
+        return 't'
+    if isinstance(value, date):
+        return 'd'
+    if isinstance(value, timedelta):
+        return 'T'
+    return 's'
+
+def _encode(value: Any, code: str) -> str:
+    """Text form of a value for its column type."""
+    if code == 'b':
+        return '1' if value else '0'
+    if code in ('d', 't'):
+        return value.isoformat()
+    if code == 'T':
+        return repr(value.total_seconds())
+    return str(value)
+
+def _key(column: str, value: Any) -> Optional[bytes]:
+    """Index key bytes for a value, None if it is not indexed."""
+    if value is None:
+        return None
+    normalize = KEY_NORMALIZERS.get(column)
+    text = normalize(value) if normalize else str(value)
+    return text.encode('utf-8') if text else None
+
+def working_set_path(race_id: int) -> Path:
+    """Default working set file for a race."""
+    return DEFAULT_DIR / f"race_{race_id}.trws"
+
+def build_working_set(race_id: int, path: Optional[Path] = None) -> Path:
+    """Snapshot a race from the database into a working set file."""
+    path = path or working_set_path(race_id)
+    archived = is_archived(race_id)
+
+    heap = bytearray()
+    strings: Dict[bytes, int] = {}
+
+    def put(data: bytes) -> int:
+        # Repeated values (cities, genders, statuses) are stored once
+        offset = strings.get(data)
+        if offset is None:
+            offset = strings[data] = len(heap)
+            heap.extend(data)
+        return offset
+
+    tables = {}
+    sections: List[Tuple[str, bytes]] = []
+    for table, (query, indexed) in TABLES.items():
+        source = archive_table(table) if archived and table == 'participants' else table
+        rows = db_manager.execute_query(query.format(table=source), (race_id,))
+        if table == 'races' and not rows:
+            raise ValueError(f"Race {race_id} not found")
+
+        columns = list(rows[0].keys()) if rows else []
+        codes = ''.join(next((_type_code(row[c]) for row in rows if row[c] is not None), 's')
+                        for c in columns)
+        record = struct.Struct('<' + 'II' * len(columns))
+        records = bytearray(record.size * len(rows))
+        for number, row in enumerate(rows):
+            fields = []
+            for column, code in zip(columns, codes):
+                value = row[column]
+                if value is None:
+                    fields += (NULL, 0)
+                else:
+                    data = _encode(value, code).encode('utf-8')
+                    fields += (put(data), len(data))
+            record.pack_into(records, number * record.size, *fields)
+        sections.append((f"{table}.records", bytes(records)))
+
+        indexes = {}
+        for column in indexed:
+            entries = sorted((key, number) for number, row in enumerate(rows)
+                             if (key := _key(column, row[column])) is not None)
+            packed = bytearray(INDEX_ENTRY.size * len(entries))
+            for i, (key, number) in enumerate(entries):
+                INDEX_ENTRY.pack_into(packed, i * INDEX_ENTRY.size, put(key), len(key), number)
+            sections.append((f"{table}.{column}", bytes(packed)))
+            indexes[column] = len(entries)
+
+        tables[table] = {'columns': columns, 'types': codes, 'rows': len(rows), 'indexes': indexes}
+
+    catalog = {
+        'format': WORKING_SET_FORMAT,
+        'race_id': race_id,
+        'built_at': datetime.now().isoformat(timespec='seconds'),
+        'tables': tables,
+        'sections': {},
+    }
+    # Offsets count from the end of the catalog
+    offset = 0
+    for name, data in sections:
+        catalog['sections'][name] = offset
+        offset += len(data)
+    catalog['heap'] = offset
+    encoded = json.dumps(catalog).encode('utf-8')
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, WORKING_SET_FORMAT, len(encoded)))
+        f.write(encoded)
+        for _, data in sections:
+            f.write(data)
+        f.write(heap)
+    os.replace(temp_path, path)
+    logger.info(f"Working set for race {race_id} written to {path}: "
+                f"{tables['participants']['rows']} participants, {path.stat().st_size} bytes")
+    return path
+
+class WorkingSet:
+    """Read-only, memory-mapped working set for one race."""
+
+    def __init__(self, path: Path):
+        """Map a working set file; only the header and catalog are read."""
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, catalog_length = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != WORKING_SET_FORMAT:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a format {WORKING_SET_FORMAT} working set")
+
+        catalog = json.loads(self._map[HEADER.size:HEADER.size + catalog_length])
+        self.race_id: int = catalog['race_id']
+        self.built_at = datetime.fromisoformat(catalog['built_at'])
+        self._tables = catalog['tables']
+        base = HEADER.size + catalog_length
+        self._sections = {name: base + offset for name, offset in catalog['sections'].items()}
+        self._heap = base + catalog['heap']
+        self._records = {table: struct.Struct('<' + 'II' * len(meta['columns']))
+                         for table, meta in self._tables.items()}
+        self._decoders = {table: [DECODERS[code] for code in meta['types']]
+                          for table, meta in self._tables.items()}
+
+    def count(self, table: str) -> int:
+        """Rows in a table."""
+        return self._tables[table]['rows']
+
+    def row(self, table: str, number: int) -> Dict[str, Any]:
+        """Decode one row."""
+        record = self._records[table]
+        fields = record.unpack_from(self._map, self._sections[f"{table}.records"] + number * record.size)
+        heap, data = self._heap, self._map
+        row = {}
+        for i, (column, decode) in enumerate(zip(self._tables[table]['columns'], self._decoders[table])):
+            offset, length = fields[2 * i], fields[2 * i + 1]
+            if offset == NULL:
+                row[column] = None
+            else:
+                row[column] = decode(data[heap + offset:heap + offset + length].decode('utf-8'))
+        return row
+
+    def rows(self, table: str) -> Iterator[Dict[str, Any]]:
+        """Decode every row of a table, in snapshot order."""
+        for number in range(self.count(table)):
+            yield self.row(table, number)
+
+    def find(self, table: str, column: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Row whose indexed column equals value, by binary search over the key array."""
+        key = _key(column, value)
+        if key is None:
+            return None
+        start = self._sections[f"{table}.{column}"]
+        heap, data = self._heap, self._map
+        low, high = 0, self._tables[table]['indexes'][column]
+        while low < high:
+            middle = (low + high) // 2
+            offset, length, number = INDEX_ENTRY.unpack_from(data, start + middle * INDEX_ENTRY.size)
+            candidate = data[heap + offset:heap + offset + length]
+            if candidate < key:
+                low = middle + 1
+            elif candidate > key:
+                high = middle
+            else:
+                return self.row(table, number)
+        return None
+
+    def race(self) -> Dict[str, Any]:
+        """The race row."""
+        return self.row('races', 0)
+
+    def close(self):
+        """Unmap the file."""
+        self._map.close()
+
+class WorkingSetStore:
+    """Working sets the managers serve reads from, by race."""
+
+    def __init__(self):
+        """Initialize with no working sets active."""
+        self._sets: Dict[int, WorkingSet] = {}
+
+    def activate(self, path: Path) -> WorkingSet:
+        """Serve a race's reads from a working set file."""
+        working_set = WorkingSet(path)
+        previous = self._sets.get(working_set.race_id)
+        self._sets[working_set.race_id] = working_set
+        if previous is not None:
+            previous.close()
+        logger.info(f"Working set active for race {working_set.race_id} (built {working_set.built_at})")
+        return working_set
+
+    def deactivate(self, race_id: int):
+        """Go back to the database for a race."""
+        working_set = self._sets.pop(race_id, None)
+        if working_set is not None:
+            working_set.close()
+
+    def get(self, race_id: int) -> Optional[WorkingSet]:
+        """Active working set for a race, if any."""
+        return self._sets.get(race_id)
+
+    def activate_from_env(self):
+        """Activate TRMS_WORKING_SET: comma-separated files or race IDs."""
+        for entry in filter(None, os.environ.get('TRMS_WORKING_SET', '').split(',')):
+            entry = entry.strip()
+            path = working_set_path(int(entry)) if entry.isdigit() else Path(entry)
+            try:
+                self.activate(path)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Working set {path} not loaded: {e}")
+
+# Global working set store
+working_sets = WorkingSetStore()
+working_sets.activate_from_env()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Build or inspect a race working set")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--build', type=int, metavar='RACE_ID', help="Snapshot a race from the database")
+    mode.add_argument('--info', type=Path, metavar='FILE', help="Describe a working set file")
+    parser.add_argument('--path', type=Path, help=f"Output file (default {DEFAULT_DIR}/race_<id>.trws)")
+    parser.add_argument('--bib', help="With --info, look up a bib")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.build is not None:
+        try:
+            path = build_working_set(args.build, args.path)
+        except Exception as e:
+            logger.error(f"Working set build failed: {e}")
+            return 1
+        print(f"🧳 {path}")
+        return 0
+
+    started = time.perf_counter()
+    try:
+        working_set = WorkingSet(args.info)
+    except (OSError, ValueError) as e:
+        logger.error(f"Cannot open working set: {e}")
+        return 1
+    opened = (time.perf_counter() - started) * 1000
+
+    race = working_set.race()
+    print(f"🧳 Race {working_set.race_id} {race['race_name']} ({race['race_date']}), built {working_set.built_at}")
+    print(f"   {working_set.count('participants')} participants, "
+          f"{working_set.count('age_group_brackets')} age group brackets, opened in {opened:.2f} ms")
+    if args.bib:
+        started = time.perf_counter()
+        row = working_set.find('participants', 'bib_number', args.bib)
+        elapsed = (time.perf_counter() - started) * 1e6
+        name = f"{row['first_name']} {row['last_name']}" if row else "not found"
+        print(f"   Bib {args.bib}: {name} ({elapsed:.1f} µs)")
+    working_set.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
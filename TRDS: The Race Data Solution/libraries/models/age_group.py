@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🎂 Age Group Models for TRMS
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Per-race age group brackets and age-on-race-day calculation. Ages and
+    bracket labels are stored on participants at registration/import so
+    age-group leaderboards are plain index scans.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from typing import Optional, List, Tuple
+from datetime import date
+from pydantic import BaseModel, Field, validator
+from ..database.connection import db_manager
+from ..database.working_set import working_sets
+
+class AgeGroupBracket(BaseModel):
+    """Age group bracket for a race."""
+    bracket_id: Optional[int] = Field(None, description="Bracket ID")
+    race_id: Optional[int] = Field(None, description="Race ID")
+    label: str = Field(..., description="Bracket label")
+    min_age: int = Field(..., description="Minimum age (inclusive)")
+    max_age: int = Field(..., description="Maximum age (inclusive)")
+
+    @validator('max_age')
+    def validate_max_age(cls, v, values):
+        """Validate bracket bounds."""
+        if 'min_age' in values and v < values['min_age']:
+            raise ValueError("max_age must be greater than or equal to min_age")
+        return v
+
+# Standard road race brackets used when a race has none configured
+DEFAULT_BRACKETS = [
+    AgeGroupBracket(label="14 & Under", min_age=0, max_age=14),
+    AgeGroupBracket(label="15-19", min_age=15, max_age=19),
+    AgeGroupBracket(label="20-24", min_age=20, max_age=24),
+    AgeGroupBracket(label="25-29", min_age=25, max_age=29),
+    AgeGroupBracket(label="30-34", min_age=30, max_age=34),
+    AgeGroupBracket(label="35-39", min_age=35, max_age=39),
+    AgeGroupBracket(label="40-44", min_age=40, max_age=44),
+    AgeGroupBracket(label="45-49", min_age=45, max_age=49),
+    AgeGroupBracket(label="50-54", min_age=50, max_age=54),
+    AgeGroupBracket(label="55-59", min_age=55, max_age=59),
+    AgeGroupBracket(label="60-64", min_age=60, max_age=64),
+    AgeGroupBracket(label="65-69", min_age=65, max_age=69),
+    AgeGroupBracket(label="70 & Over", min_age=70, max_age=150),
+]
+
+def age_on_race_day(date_of_birth: Optional[date], race_date: date) -> Optional[int]:
+    """Calculate a runner's age on race day."""
+    if not date_of_birth:
+        return None
+    before_birthday = (race_date.month, race_date.day) < (date_of_birth.month, date_of_birth.day)
+    return race_date.year - date_of_birth.year - int(before_birthday)
+
+def assign_age_group(age: Optional[int], brackets: List[AgeGroupBracket]) -> Optional[str]:
+    """Find the bracket label for an age."""
+    if age is None:
+        return None
+    for bracket in brackets:
+        if bracket.min_age <= age <= bracket.max_age:
+            return bracket.label
+    return None
+
+class AgeGroupManager:
+    """Manager for age group bracket database operations."""
+
+    def __init__(self):
+        """Initialize age group manager."""
+        self.table_name = "age_group_brackets"
+
+    def get_brackets(self, race_id: int) -> List[AgeGroupBracket]:
+        """Get brackets for a race, falling back to the defaults."""
+        query = f"""
+            SELECT * FROM {self.table_name}
+            WHERE race_id = %s
+            ORDER BY min_age ASC
+        """
+
+        try:
+            working_set = working_sets.get(race_id)
+            if working_set is not None:
+                results = list(working_set.rows(self.table_name))
+            else:
+                results = db_manager.execute_query(query, (race_id,))
+            if results:
+                return [AgeGroupBracket(**row) for row in results]
+            return list(DEFAULT_BRACKETS)
+        except Exception as e:
+            print(f"Error fetching age group brackets: {e}")
+            return list(DEFAULT_BRACKETS)
+
+    def set_brackets(self, race_id: int, brackets: List[AgeGroupBracket]) -> bool:
+        """Replace a race's brackets and recompute its participants."""
+        self._check_overlaps(brackets)
+
+        try:
+            # One transaction, so a failure never leaves the race without
+            # brackets or its participants in the old groups
+            with db_manager.transaction() as cursor:
+                cursor.execute(f"DELETE FROM {self.table_name} WHERE race_id = %s", (race_id,))
+                if brackets:
+                    cursor.executemany(
+                        f"INSERT INTO {self.table_name} (race_id, label, min_age, max_age) VALUES (%s, %s, %s, %s)",
+                        [(race_id, b.label, b.min_age, b.max_age) for b in brackets]
+                    )
+                self._recompute(cursor, race_id, brackets or list(DEFAULT_BRACKETS))
+            return True
+        except Exception as e:
+            print(f"Error saving age group brackets: {e}")
+            return False
+
+    def recompute_race(self, race_id: int) -> int:
+        """Recompute age and age group for every participant in a race."""
+        try:
+            brackets = self.get_brackets(race_id)
+            with db_manager.transaction() as cursor:
+                return self._recompute(cursor, race_id, brackets)
+        except Exception as e:
+            print(f"Error recomputing age groups: {e}")
+            return -1
+
+    @staticmethod
+    def _recompute(cursor, race_id: int, brackets: List[AgeGroupBracket]) -> int:
+        """Update every participant's age and age group on an open transaction."""
+        cursor.execute("""
+            SELECT p.participant_id, p.date_of_birth, p.age_on_race_day, r.race_date
+            FROM participants p
+            JOIN races r ON r.race_id = p.race_id
+            WHERE p.race_id = %s
+        """, (race_id,))
+
+        updates = []
+        for row in cursor.fetchall():
+            # Rosters without a birth date (cross country) keep their stored age
+            age = age_on_race_day(row['date_of_birth'], row['race_date'])
+            if age is None:
+                age = row['age_on_race_day']
+            updates.append((age, assign_age_group(age, brackets), row['participant_id'], race_id))
+
+        if not updates:
+            return 0
+        cursor.executemany(
+            "UPDATE participants SET age_on_race_day = %s, age_group = %s "
+            "WHERE participant_id = %s AND race_id = %s",
+            updates
+        )
+        return cursor.rowcount
+
+    @staticmethod
+    def _check_overlaps(brackets: List[AgeGroupBracket]):
+        """Reject bracket sets where an age would fall in two groups."""
+        ordered: List[Tuple[int, int, str]] = sorted((b.min_age, b.max_age, b.label) for b in brackets)
+        for previous, current in zip(ordered, ordered[1:]):
+            if current[0] <= previous[1]:
+                raise ValueError(f"Age group {current[2]} overlaps {previous[2]}")
+
+# Global age group manager
+age_group_manager = AgeGroupManager()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+👥 Participant Models for TRMS
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Shared participant models used by TRRS registration and TRTS timing.
+    Age on race day and the age group label are computed when a runner is
+    registered or imported, never at results time.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import csv
+from pathlib import Path
+from typing import Optional, List, Dict
+from datetime import datetime, date
+from pydantic import BaseModel, Field
+from ..database.connection import db_manager
+from ..database.partitions import archive_table, is_archived
+from ..database.working_set import working_sets
+from ..timing.announcer import normalize_rfid
+from .age_group import AgeGroupBracket, age_group_manager, age_on_race_day, assign_age_group
+from .race import Race, race_manager
+
+class Participant(BaseModel):
+    """Participant model for TRMS ecosystem."""
+    participant_id: Optional[int] = Field(None, description="Participant ID")
+    race_id: int = Field(..., description="Race ID")
+
+    # Personal information
+    first_name: str = Field(..., description="First name")
+    last_name: str = Field(..., description="Last name")
+    email: Optional[str] = Field(None, description="Email")
+    phone: Optional[str] = Field(None, description="Phone")
+    date_of_birth: Optional[date] = Field(None, description="Date of birth")
+    gender: Optional[str] = Field(None, description="Gender")
+
+    # Age on race day
+    age_on_race_day: Optional[int] = Field(None, description="Age on race day")
+    age_group: Optional[str] = Field(None, description="Age group label")
+
+    # Address
+    city: Optional[str] = Field(None, description="City")
+    state: Optional[str] = Field(None, description="State")
+
+    # Race specific
+    distance: Optional[str] = Field(None, description="Distance")
+    bib_number: Optional[str] = Field(None, description="Bib number")
+    rfid_tag: Optional[str] = Field(None, description="RFID tag")
+
+    # Registration
+    registration_status: str = Field(default="pending", description="Registration status")
+    payment_status: str = Field(default="pending", description="Payment status")
+    amount_paid: Optional[float] = Field(None, description="Amount paid")
+    payment_reference: Optional[str] = Field(None, description="Payment processor reference")
+
+    created_at: Optional[datetime] = Field(None, description="Created timestamp")
+    updated_at: Optional[datetime] = Field(None, description="Updated timestamp")
+
+class ParticipantManager:
+    """Manager for participant database operations."""
+
+    INSERT_COLUMNS = (
+        'race_id', 'first_name', 'last_name', 'email', 'phone', 'date_of_birth',
+        'gender', 'age_on_race_day', 'age_group', 'city', 'state', 'distance',
+        'bib_number', 'rfid_tag', 'registration_status', 'payment_status', 'amount_paid',
+        'payment_reference'
+    )
+
+    def __init__(self):
+        """Initialize participant manager."""
+        self.table_name = "participants"
+
+    def _insert_query(self) -> str:
+        """Build the participant INSERT statement."""
+        columns = ", ".join(self.INSERT_COLUMNS)
+        placeholders = ", ".join(["%s"] * len(self.INSERT_COLUMNS))
+        return f"INSERT INTO {self.table_name} ({columns}) VALUES ({placeholders})"
+
+    def _insert_params(self, participant: Participant) -> tuple:
+        """Flatten a participant into INSERT parameters."""
+        return tuple(getattr(participant, column) for column in self.INSERT_COLUMNS)
+
+    def apply_age_group(self, participant: Participant, race_date: date, brackets) -> Participant:
+        """Fill in age on race day and the age group label."""
+        age = age_on_race_day(participant.date_of_birth, race_date)
+        if age is not None:
+            participant.age_on_race_day = age
+        participant.age_group = assign_age_group(participant.age_on_race_day, brackets)
+        return participant
+
+    def create_participant(self, participant: Participant, race: Optional[Race] = None,
+                           brackets: Optional[List[AgeGroupBracket]] = None) -> Optional[int]:
+        """Register a participant.
+
+        High-volume callers pass the already loaded ``race`` and ``brackets``
+        to skip the per-registration lookups.
+        """
+        race = race or race_manager.get_race_by_id(participant.race_id)
+        if not race:
+            print(f"Error creating participant: race {participant.race_id} not found")
+            return None
+
+        if brackets is None:
+            brackets = age_group_manager.get_brackets(participant.race_id)
+        self.apply_age_group(participant, race.race_date, brackets)
+
+        try:
+            return db_manager.execute_insert(self._insert_query(), self._insert_params(participant))
+        except Exception as e:
+            print(f"Error creating participant: {e}")
+            return None
+
+    def import_participants(self, race_id: int, participants: List[Participant]) -> int:
+        """Bulk import participants for a race."""
+        race = race_manager.get_race_by_id(race_id)
+        if not race:
+            print(f"Error importing participants: race {race_id} not found")
+            return 0
+
+        brackets = age_group_manager.get_brackets(race_id)
+        rows = []
+        for participant in participants:
+            participant.race_id = race_id
+            self.apply_age_group(participant, race.race_date, brackets)
+            rows.append(self._insert_params(participant))
+
+        try:
+            return db_manager.execute_many(self._insert_query(), rows)
+        except Exception as e:
+            print(f"Error importing participants: {e}")
+            return 0
+
+    def read_roster_csv(self, race_id: int, csv_path: Path, distance: Optional[str] = None) -> List[Participant]:
+        """Read a roster in the TRDS databases/imports CSV layouts."""
+        participants = []
+
+        with open(csv_path, newline='') as f:
+            for row in csv.DictReader(f):
+                first_name, _, last_name = row['name'].strip().partition(' ')
+                participant = Participant(
+                    race_id=race_id,
+                    first_name=first_name,
+                    last_name=last_name,
+                    distance=distance,
+                    bib_number=row.get('bib') or None,
+                    rfid_tag=row.get('rfid') or None,
+                    registration_status='confirmed'
+                )
+
+                # Road race rosters carry a birth date, cross country rosters an age
+                if row.get('dob'):
+                    participant.date_of_birth = datetime.strptime(row['dob'], '%Y-%m-%d').date()
+                elif row.get('age'):
+                    participant.age_on_race_day = int(row['age'])
+
+                participants.append(participant)
+
+        return participants
+
+    def import_roster_csv(self, race_id: int, csv_path: Path, distance: Optional[str] = None) -> int:
+        """Import a roster CSV into a race."""
+        try:
+            participants = self.read_roster_csv(race_id, csv_path, distance)
+        except Exception as e:
+            print(f"Error reading roster {csv_path}: {e}")
+            return 0
+        return self.import_participants(race_id, participants)
+
+    def get_participants_by_race(self, race_id: int) -> List[Participant]:
+        """Get all participants in a race, from the archive once the race is archived."""
+        working_set = working_sets.get(race_id)
+        if working_set is not None:
+            return [Participant(**row) for row in working_set.rows(self.table_name)]
+
+        query = f"""
+            SELECT * FROM {self.table_name}
+            WHERE race_id = %s
+            ORDER BY last_name, first_name
+        """
+
+        try:
+            results = db_manager.execute_query(query, (race_id,))
+            if not results and is_archived(race_id):
+                archive = archive_table(self.table_name)
+                results = db_manager.execute_query(query.replace(self.table_name, archive, 1), (race_id,))
+            return [Participant(**row) for row in results]
+        except Exception as e:
+            print(f"Error fetching participants: {e}")
+            return []
+
+    def get_participant_by_bib(self, race_id: int, bib_number: str) -> Optional[Participant]:
+        """Look up a participant by bib, from the race's working set when one is active."""
+        return self._lookup(race_id, 'bib_number', str(bib_number).strip())
+
+    def get_participant_by_rfid(self, race_id: int, rfid_tag: str) -> Optional[Participant]:
+        """Look up a participant by RFID tag, from the race's working set when one is active."""
+        return self._lookup(race_id, 'rfid_tag', normalize_rfid(rfid_tag))
+
+    def _lookup(self, race_id: int, column: str, value: Optional[str]) -> Optional[Participant]:
+        """Find one participant in a race by an indexed column."""
+        if not value:
+            return None
+        working_set = working_sets.get(race_id)
+        if working_set is not None:
+            row = working_set.find(self.table_name, column, value)
+            return Participant(**row) if row else None
+
+        query = f"SELECT * FROM {self.table_name} WHERE race_id = %s AND {column} = %s LIMIT 1"
+        try:
+            results = db_manager.execute_query(query, (race_id, value))
+            return Participant(**results[0]) if results else None
+        except Exception as e:
+            print(f"Error looking up participant: {e}")
+            return None
+
+    def get_age_group_leaderboard(self, race_id: int, gender: str, age_group: str) -> List[Dict]:
+        """Get finishers in one age group, fastest first."""
+        query = f"""
+            SELECT p.participant_id, p.first_name, p.last_name, p.city, p.state,
+                   p.bib_number, p.age_on_race_day, p.age_group,
+                   rt.net_time, rt.overall_place, rt.gender_place, rt.age_group_place
+            FROM {self.table_name} p
+            JOIN race_times rt ON rt.participant_id = p.participant_id AND rt.race_id = p.race_id
+            WHERE p.race_id = %s AND p.gender = %s AND p.age_group = %s
+              AND rt.timing_status = 'finished'
+            ORDER BY rt.net_time ASC
+        """
+
+        try:
+            return db_manager.execute_query(query, (race_id, gender, age_group))
+        except Exception as e:
+            print(f"Error fetching age group leaderboard: {e}")
+            return []
+
+# Global participant manager
+participant_manager = ParticipantManager()
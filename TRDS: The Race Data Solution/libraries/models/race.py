@@ -15,10 +15,13 @@
 ═══════════════════════════════════════════════════════════════════════════════
 """
 
-from typing import Optional, List
+from typing import Optional, List, Callable
 from datetime import datetime, date, time
 from pydantic import BaseModel, Field, validator
 from ..database.connection import db_manager
+from ..database.partitions import PARTITIONED_TABLES, archive_table, partition_manager
+from ..database.working_set import working_sets
+from ..utils.metrics import timed
 
 class Race(BaseModel):
     """Race model for TRMS ecosystem."""
@@ -44,6 +47,9 @@ class Race(BaseModel):
     timing_method: Optional[str] = Field(None, description="Timing method")
     chip_timing: bool = Field(default=False, description="Use chip timing")
     
+    # Set once participants and times are moved to the archive tables
+    archived_at: Optional[datetime] = Field(None, description="Archived timestamp")
+    
     @validator('race_type')
     def validate_race_type(cls, v):
         """Validate race type."""
@@ -58,7 +64,21 @@ class RaceManager:
     def __init__(self):
         """Initialize race manager."""
         self.table_name = "races"
+        self._change_listeners: List[Callable[[Optional[int]], None]] = []
+    
+    def add_change_listener(self, callback: Callable[[Optional[int]], None]):
+        """Register a callback run after a race is created, updated or deleted."""
+        self._change_listeners.append(callback)
     
+    def notify_change(self, race_id: Optional[int]):
+        """Tell listeners (such as API response caches) that a race changed."""
+        for callback in self._change_listeners:
+            try:
+                callback(race_id)
+            except Exception as e:
+                print(f"Error in race change listener: {e}")
+    
+    @timed('trds_race_manager_seconds')
     def create_race(self, race: Race) -> Optional[int]:
         """Create new race."""
         query = f"""
@@ -79,12 +99,21 @@ class RaceManager:
         )
         
         try:
-            result = db_manager.execute_update(query, params)
-            return result
+            race_id = db_manager.execute_insert(query, params)
+            self.notify_change(race_id)
         except Exception as e:
             print(f"Error creating race: {e}")
             return None
+        
+        # Keep empty partitions ahead of the new race; only every DEFAULT_SPAN races adds any
+        for table in PARTITIONED_TABLES:
+            try:
+                partition_manager.ensure_partitions(table)
+            except Exception as e:
+                print(f"Error adding partitions to {table}: {e}")
+        return race_id
     
+    @timed('trds_race_manager_seconds')
     def get_all_races(self) -> List[Race]:
         """Get all races."""
         query = f"SELECT * FROM {self.table_name} ORDER BY race_date DESC"
@@ -96,8 +125,13 @@ class RaceManager:
             print(f"Error fetching races: {e}")
             return []
     
+    @timed('trds_race_manager_seconds')
     def get_race_by_id(self, race_id: int) -> Optional[Race]:
-        """Get race by ID."""
+        """Get race by ID, from its working set when one is active."""
+        working_set = working_sets.get(race_id)
+        if working_set is not None:
+            return Race(**working_set.race())
+        
         query = f"SELECT * FROM {self.table_name} WHERE race_id = %s"
         
         try:
@@ -109,6 +143,7 @@ class RaceManager:
             print(f"Error fetching race: {e}")
             return None
     
+    @timed('trds_race_manager_seconds')
     def update_race(self, race_id: int, race: Race) -> bool:
         """Update existing race."""
         query = f"""
@@ -133,22 +168,44 @@ class RaceManager:
         
         try:
             result = db_manager.execute_update(query, params)
+            self.notify_change(race_id)
             return result > 0
         except Exception as e:
             print(f"Error updating race: {e}")
             return False
     
+    @timed('trds_race_manager_seconds')
     def delete_race(self, race_id: int) -> bool:
-        """Delete race."""
-        query = f"DELETE FROM {self.table_name} WHERE race_id = %s"
+        """Delete race with its participants and times.
         
+        The partitioned tables have no foreign keys to cascade, so their
+        rows (live or archived) are deleted here in the same transaction.
+        """
         try:
-            result = db_manager.execute_update(query, (race_id,))
+            with db_manager.transaction() as cursor:
+                cursor.execute(f"SELECT archived_at FROM {self.table_name} WHERE race_id = %s", (race_id,))
+                race = cursor.fetchone()
+                if race is None:
+                    return False
+                
+                tables = list(PARTITIONED_TABLES)
+                if race['archived_at'] is not None:
+                    tables += [archive_table(table) for table in PARTITIONED_TABLES]
+                cursor.execute(
+                    "UPDATE email_outbox SET participant_id = NULL WHERE race_id = %s",
+                    (race_id,)
+                )
+                for table in tables:
+                    cursor.execute(f"DELETE FROM {table} WHERE race_id = %s", (race_id,))
+                cursor.execute(f"DELETE FROM {self.table_name} WHERE race_id = %s", (race_id,))
+                result = cursor.rowcount
+            self.notify_change(race_id)
             return result > 0
         except Exception as e:
             print(f"Error deleting race: {e}")
             return False
     
+    @timed('trds_race_manager_seconds')
     def get_upcoming_races(self) -> List[Race]:
         """Get upcoming races."""
         query = f"""
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+⏱️ Race Time Models for TRMS
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Timing write path for race_times. Start and finish crossings are written
+    as batched upserts keyed on (race_id, participant_id) so a burst of
+    finishers costs one round trip per batch rather than one per runner.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from typing import Optional, List, Dict, Tuple
+from datetime import datetime, timedelta
+from pydantic import BaseModel, Field
+from ..database.connection import db_manager
+from ..database.partitions import archive_table, is_archived
+
+class RaceTime(BaseModel):
+    """Race time model for TRMS ecosystem."""
+    time_id: Optional[int] = Field(None, description="Time ID")
+    race_id: int = Field(..., description="Race ID")
+    participant_id: Optional[int] = Field(None, description="Participant ID")
+    bib_number: Optional[str] = Field(None, description="Bib number")
+
+    # Timing data
+    start_time: Optional[datetime] = Field(None, description="Start time")
+    finish_time: Optional[datetime] = Field(None, description="Finish time")
+    net_time: Optional[timedelta] = Field(None, description="Net time")
+
+    # Placement
+    overall_place: Optional[int] = Field(None, description="Overall place")
+    gender_place: Optional[int] = Field(None, description="Gender place")
+    age_group_place: Optional[int] = Field(None, description="Age group place")
+
+    timing_status: str = Field(default="started", description="Timing status")
+    created_at: Optional[datetime] = Field(None, description="Created timestamp")
+    updated_at: Optional[datetime] = Field(None, description="Updated timestamp")
+
+# (participant_id, bib_number, crossing time)
+Crossing = Tuple[Optional[int], Optional[str], datetime]
+
+# (participant_id, bib_number, finish time, overall, gender, age group place)
+Finish = Tuple[Optional[int], Optional[str], datetime, Optional[int], Optional[int], Optional[int]]
+
+class RaceTimeManager:
+    """Manager for race time database operations."""
+
+    def __init__(self):
+        """Initialize race time manager."""
+        self.table_name = "race_times"
+
+    def record_starts(self, race_id: int, starts: List[Crossing]) -> int:
+        """Record start mat crossings in one batch."""
+        query = f"""
+            INSERT INTO {self.table_name}
+            (race_id, participant_id, bib_number, start_time, timing_status)
+            VALUES (%s, %s, %s, %s, 'started')
+            ON DUPLICATE KEY UPDATE start_time = VALUES(start_time)
+        """
+
+        params = [(race_id, participant_id, bib, when) for participant_id, bib, when in starts]
+        return db_manager.execute_many(query, params)
+
+    def record_finishes(self, race_id: int, finishes: List[Finish]) -> int:
+        """Record finish crossings and live places in one batch."""
+        query = f"""
+            INSERT INTO {self.table_name}
+            (race_id, participant_id, bib_number, finish_time,
+             overall_place, gender_place, age_group_place, timing_status)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, 'finished')
+            ON DUPLICATE KEY UPDATE
+                finish_time = VALUES(finish_time),
+                overall_place = VALUES(overall_place),
+                gender_place = VALUES(gender_place),
+                age_group_place = VALUES(age_group_place),
+                timing_status = 'finished'
+        """
+
+        params = [(race_id, *finish) for finish in finishes]
+        return db_manager.execute_many(query, params)
+
+    def get_ranking_rows(self, race_id: int, distance: Optional[str] = None) -> List[Dict]:
+        """Get the columns results ranking needs for a race or one distance."""
+        query = f"""
+            SELECT rt.time_id, rt.net_time, rt.finish_time, rt.timing_status,
+                   p.distance, p.gender, p.age_group
+            FROM {self.table_name} rt
+            LEFT JOIN participants p ON p.participant_id = rt.participant_id AND p.race_id = rt.race_id
+            WHERE rt.race_id = %s
+        """
+        params = [race_id]
+        if distance is not None:
+            query += " AND p.distance = %s"
+            params.append(distance)
+
+        return db_manager.execute_query(query, tuple(params))
+
+    def write_placements(self, race_id: int, placements: List[tuple]) -> int:
+        """Bulk write (time_id, overall, gender, age group) places.
+
+        Written as a multi-row INSERT ... ON DUPLICATE KEY UPDATE on the
+        primary key, which the connector batches into a single statement
+        instead of one UPDATE per row.
+        """
+        query = f"""
+            INSERT INTO {self.table_name}
+            (time_id, race_id, overall_place, gender_place, age_group_place)
+            VALUES (%s, %s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE
+                overall_place = VALUES(overall_place),
+                gender_place = VALUES(gender_place),
+                age_group_place = VALUES(age_group_place)
+        """
+
+        params = [(time_id, race_id, overall, gender, age_group)
+                  for time_id, overall, gender, age_group in placements]
+        return db_manager.execute_many(query, params)
+
+    def shift_start_times(self, race_id: int, seconds: int, distance: Optional[str] = None) -> int:
+        """Correct start times (gun time or wave offset) for a race or one distance."""
+        query = f"""
+            UPDATE {self.table_name} rt
+            LEFT JOIN participants p ON p.participant_id = rt.participant_id AND p.race_id = rt.race_id
+            SET rt.start_time = rt.start_time + INTERVAL %s SECOND
+            WHERE rt.race_id = %s AND rt.start_time IS NOT NULL
+        """
+        params = [seconds, race_id]
+        if distance is not None:
+            query += " AND p.distance = %s"
+            params.append(distance)
+
+        return db_manager.execute_update(query, tuple(params))
+
+    def get_times_by_race(self, race_id: int) -> List[RaceTime]:
+        """Get all times for a race, from the archive once the race is archived."""
+        query = f"""
+            SELECT * FROM {self.table_name}
+            WHERE race_id = %s
+            ORDER BY finish_time IS NULL, finish_time ASC
+        """
+
+        try:
+            results = db_manager.execute_query(query, (race_id,))
+            if not results and is_archived(race_id):
+                archive = archive_table(self.table_name)
+                results = db_manager.execute_query(query.replace(self.table_name, archive, 1), (race_id,))
+            return [RaceTime(**row) for row in results]
+        except Exception as e:
+            print(f"Error fetching race times: {e}")
+            return []
+
+    def delete_times_by_race(self, race_id: int) -> int:
+        """Delete all times for a race."""
+        query = f"DELETE FROM {self.table_name} WHERE race_id = %s"
+
+        try:
+            return db_manager.execute_update(query, (race_id,))
+        except Exception as e:
+            print(f"Error deleting race times: {e}")
+            return 0
+
+# Global race time manager
+race_time_manager = RaceTimeManager()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🎛️ System Settings for TRMS
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    In-process cache of the system_settings table. Every setting is held in
+    memory and lookups are dictionary reads; at most once per refresh
+    interval one caller runs a single-row version probe (row count and
+    latest updated_at) and the table is only reloaded when that changes.
+    Other threads keep reading the cached values while a probe runs; only
+    the first load makes concurrent callers wait.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import logging
+import threading
+import time
+from typing import Optional, Dict
+
+from ..database.connection import db_manager, settled_version
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_REFRESH_SECONDS = 5.0
+
+TRUE_VALUES = ('true', '1', 'yes', 'on')
+
+class SettingsManager:
+    """Cached, typed access to system_settings."""
+
+    def __init__(self, refresh_interval: float = DEFAULT_REFRESH_SECONDS):
+        """Initialize settings manager; settings load on first use."""
+        self.table_name = "system_settings"
+        self.refresh_interval = refresh_interval
+
+        self._values: Dict[str, str] = {}
+        self._loaded = False
+        self._version: Optional[tuple] = None
+        self._checked_at = float('-inf')
+        self._refresh_lock = threading.Lock()
+        self.probes = 0
+        self.reloads = 0
+
+    def _probe(self) -> tuple:
+        """Fetch the table's version: row count and latest change."""
+        rows = db_manager.execute_query(
+            f"SELECT COUNT(*) AS n, MAX(updated_at) AS latest, NOW() AS now FROM {self.table_name}"
+        )
+        row = rows[0]
+        self.probes += 1
+        return row['n'], row['latest'], row['now']
+
+    def refresh(self, force: bool = False) -> bool:
+        """Probe the version and reload if it changed; returns True if reloaded."""
+        count, latest, now = self._probe()
+        self._checked_at = time.monotonic()
+        version = (count, latest)
+        if not force and version == self._version:
+            return False
+
+        rows = db_manager.execute_query(f"SELECT setting_key, setting_value FROM {self.table_name}")
+        # Swap in a new dict so readers never see a half-loaded table
+        self._values = {row['setting_key']: row['setting_value'] for row in rows}
+        self._loaded = True
+        self.reloads += 1
+        self._version = settled_version(version, latest, now)
+        return True
+
+    def maybe_refresh(self):
+        """Refresh if the interval has passed and no other thread is already refreshing.
+
+        Until the first load, callers wait for it instead of reading defaults.
+        """
+        if time.monotonic() - self._checked_at < self.refresh_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=not self._loaded):
+            return
+        try:
+            # The caller this one waited for has just loaded (or failed to)
+            if time.monotonic() - self._checked_at < self.refresh_interval:
+                return
+            self.refresh()
+        except Exception as e:
+            # Keep serving the cached values; try again next interval
+            self._checked_at = time.monotonic()
+            logger.warning(f"Could not refresh system settings: {e}")
+        finally:
+            self._refresh_lock.release()
+
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        """Get a setting's raw value."""
+        self.maybe_refresh()
+        value = self._values.get(key)
+        return default if value is None else value
+
+    def get_bool(self, key: str, default: bool = False) -> bool:
+        """Get a true/false setting."""
+        value = self.get(key)
+        return default if value is None else value.strip().lower() in TRUE_VALUES
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        """Get an integer setting."""
+        value = self.get(key)
+        try:
+            return default if value is None else int(value)
+        except ValueError:
+            logger.warning(f"Setting {key}={value!r} is not an integer")
+            return default
+
+    def get_float(self, key: str, default: float = 0.0) -> float:
+        """Get a numeric setting."""
+        value = self.get(key)
+        try:
+            return default if value is None else float(value)
+        except ValueError:
+            logger.warning(f"Setting {key}={value!r} is not a number")
+            return default
+
+    def get_prefixed(self, prefix: str) -> Dict[str, str]:
+        """Get every setting under a prefix, keyed without it."""
+        self.maybe_refresh()
+        return {key[len(prefix):]: value for key, value in self._values.items() if key.startswith(prefix)}
+
+    def get_all(self) -> Dict[str, str]:
+        """Get every setting."""
+        self.maybe_refresh()
+        return dict(self._values)
+
+    def set(self, key: str, value, description: Optional[str] = None, component: str = 'TRMS') -> bool:
+        """Create or update a setting; the local cache sees it immediately."""
+        if isinstance(value, bool):
+            value = 'true' if value else 'false'
+        query = f"""
+            INSERT INTO {self.table_name} (setting_key, setting_value, description, component)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE setting_value = VALUES(setting_value),
+                description = COALESCE(VALUES(description), description)
+        """
+
+        try:
+            db_manager.execute_update(query, (key, str(value), description, component))
+            self._values = {**self._values, key: str(value)}
+            # Other rows may have changed too; reload on the next lookup
+            self._version = None
+            self._checked_at = float('-inf')
+            return True
+        except Exception as e:
+            print(f"Error saving setting: {e}")
+            return False
+
+# Global settings manager
+settings_manager = SettingsManager()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🔢 TRRS Bib Number Allocator
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Concurrent bib number allocation per race and distance. Each allocator
+    leases a block of numbers from the bib_ranges sequence row with a single
+    atomic UPDATE and hands them out from memory, so the database is only
+    touched once per block. Unused numbers are handed back to bib_returns
+    and reused before the sequence advances. The unique (race_id,
+    bib_number) key on participants is the final guarantee against
+    duplicates; a database created before that key gets it from
+    `partitions --convert`, which first lists any duplicate bibs.
+
+    Distances without a configured range share the race-wide range, which
+    starts after every configured range and every bib already assigned.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import logging
+import threading
+from typing import Optional, Dict, List, Set, Tuple
+
+from ..database.connection import db_manager
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+DEFAULT_RANGE_SIZE = 99999
+NUMERIC_BIB = "bib_number REGEXP '^[0-9]+$'"
+
+def _max_assigned_bib(race_id: int, first: int = 1, last: Optional[int] = None) -> int:
+    """Highest numeric bib already assigned in a race, optionally within a range."""
+    query = f"""
+        SELECT MAX(CAST(bib_number AS UNSIGNED)) AS max_bib FROM participants
+        WHERE race_id = %s AND {NUMERIC_BIB}
+          AND CAST(bib_number AS UNSIGNED) >= %s
+    """
+    params = [race_id, first]
+    if last is not None:
+        query += " AND CAST(bib_number AS UNSIGNED) <= %s"
+        params.append(last)
+
+    rows = db_manager.execute_query(query, tuple(params))
+    return (rows[0]['max_bib'] or 0) if rows else 0
+
+def set_bib_range(race_id: int, distance: Optional[str], first_bib: int, last_bib: int) -> bool:
+    """Configure the bib range for one distance of a race.
+
+    Call before registration opens; numbers already assigned inside the
+    range are skipped.
+    """
+    if first_bib < 1 or last_bib < first_bib:
+        print(f"Error setting bib range: invalid range {first_bib}-{last_bib}")
+        return False
+
+    query = """
+        INSERT INTO bib_ranges (race_id, distance, first_bib, last_bib, next_bib)
+        VALUES (%s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE first_bib = VALUES(first_bib),
+                                last_bib = VALUES(last_bib),
+                                next_bib = VALUES(next_bib)
+    """
+
+    try:
+        next_bib = max(first_bib, _max_assigned_bib(race_id, first_bib, last_bib) + 1)
+        db_manager.execute_update(query, (race_id, distance or '', first_bib, last_bib, next_bib))
+        db_manager.execute_update("DELETE FROM bib_returns WHERE race_id = %s AND distance = %s",
+                                  (race_id, distance or ''))
+        return True
+    except Exception as e:
+        print(f"Error setting bib range: {e}")
+        return False
+
+def get_bib_ranges(race_id: int) -> List[Dict]:
+    """Get the configured bib ranges of a race."""
+    query = """
+        SELECT distance, first_bib, last_bib, next_bib FROM bib_ranges
+        WHERE race_id = %s
+        ORDER BY first_bib
+    """
+
+    try:
+        return db_manager.execute_query(query, (race_id,))
+    except Exception as e:
+        print(f"Error fetching bib ranges: {e}")
+        return []
+
+class BibAllocator:
+    """Hands out unique bib numbers for one race from leased blocks."""
+
+    def __init__(self, race_id: int, block_size: int = 50):
+        """Initialize bib allocator."""
+        self.race_id = race_id
+        self.block_size = block_size
+
+        self._lock = threading.Lock()
+        self._blocks: Dict[str, List[List[int]]] = {}
+        self._exhausted: Set[str] = set()
+        self._ranges: Set[str] = {row['distance'] for row in get_bib_ranges(race_id)}
+
+    def _range_key(self, distance: Optional[str]) -> str:
+        """Distances without their own range use the race-wide range."""
+        if distance and distance in self._ranges:
+            return distance
+        return ''
+
+    def _ensure_default_range(self):
+        """Create the race-wide range after every configured range and assigned bib."""
+        if '' in self._ranges:
+            return
+
+        ranges = get_bib_ranges(self.race_id)
+        start = max([row['last_bib'] for row in ranges] + [_max_assigned_bib(self.race_id)]) + 1
+        db_manager.execute_update(
+            "INSERT IGNORE INTO bib_ranges (race_id, distance, first_bib, last_bib, next_bib) "
+            "VALUES (%s, '', %s, %s, %s)",
+            (self.race_id, start, start + DEFAULT_RANGE_SIZE - 1, start)
+        )
+        self._ranges.add('')
+
+    def _lease_block(self, key: str) -> Optional[Tuple[int, int]]:
+        """Lease a block, preferring numbers handed back by other allocators."""
+        if key == '':
+            self._ensure_default_range()
+
+        with db_manager.transaction() as cursor:
+            cursor.execute(
+                "SELECT return_id, first_bib, last_bib FROM bib_returns "
+                "WHERE race_id = %s AND distance = %s ORDER BY first_bib LIMIT 1 "
+                "FOR UPDATE SKIP LOCKED",
+                (self.race_id, key)
+            )
+            returned = cursor.fetchone()
+            if returned:
+                cursor.execute("DELETE FROM bib_returns WHERE return_id = %s", (returned['return_id'],))
+                return returned['first_bib'], returned['last_bib']
+
+            # Advancing the sequence is one atomic statement; LAST_INSERT_ID
+            # carries the new value back on this connection without a lock read
+            cursor.execute(
+                "UPDATE bib_ranges SET next_bib = LAST_INSERT_ID(next_bib + %s) "
+                "WHERE race_id = %s AND distance = %s AND next_bib <= last_bib",
+                (self.block_size, self.race_id, key)
+            )
+            if not cursor.rowcount:
+                return None
+
+            cursor.execute(
+                "SELECT LAST_INSERT_ID() AS block_end, last_bib FROM bib_ranges "
+                "WHERE race_id = %s AND distance = %s",
+                (self.race_id, key)
+            )
+            row = cursor.fetchone()
+            return row['block_end'] - self.block_size, min(row['block_end'] - 1, row['last_bib'])
+
+    def next_bib(self, distance: Optional[str] = None) -> Optional[str]:
+        """Get the next bib number, or None when the range is used up."""
+        key = self._range_key(distance)
+
+        with self._lock:
+            blocks = self._blocks.setdefault(key, [])
+            if not blocks:
+                if key in self._exhausted:
+                    return None
+                try:
+                    block = self._lease_block(key)
+                except Exception as e:
+                    print(f"Error leasing bib block: {e}")
+                    return None
+                if block is None:
+                    self._exhausted.add(key)
+                    logger.warning(f"Bib range '{key or 'race'}' for race {self.race_id} is used up")
+                    return None
+                blocks.append(list(block))
+
+            block = blocks[0]
+            bib = block[0]
+            block[0] += 1
+            if block[0] > block[1]:
+                blocks.pop(0)
+            return str(bib)
+
+    def assign_missing(self) -> int:
+        """Give every active participant without a bib one from their distance's range."""
+        query = """
+            SELECT participant_id, distance FROM participants
+            WHERE race_id = %s AND bib_number IS NULL AND registration_status != 'cancelled'
+            ORDER BY last_name, first_name
+        """
+
+        try:
+            rows = db_manager.execute_query(query, (self.race_id,))
+        except Exception as e:
+            print(f"Error fetching participants without bibs: {e}")
+            return 0
+
+        updates = []
+        for row in rows:
+            bib = self.next_bib(row['distance'])
+            if bib is None:
+                break
+            updates.append((bib, row['participant_id'], self.race_id))
+
+        try:
+            return db_manager.execute_many(
+                "UPDATE participants SET bib_number = %s WHERE participant_id = %s AND race_id = %s AND bib_number IS NULL",
+                updates
+            )
+        except Exception as e:
+            print(f"Error assigning bibs: {e}")
+            return 0
+
+    def release(self):
+        """Hand unused numbers back so other allocators reuse them."""
+        with self._lock:
+            returned = [(self.race_id, key, first, last)
+                        for key, blocks in self._blocks.items()
+                        for first, last in blocks]
+            self._blocks.clear()
+
+        if not returned:
+            return
+        try:
+            db_manager.execute_many(
+                "INSERT INTO bib_returns (race_id, distance, first_bib, last_bib) VALUES (%s, %s, %s, %s)",
+                returned
+            )
+            logger.info(f"Returned {len(returned)} unused bib blocks for race {self.race_id}")
+        except Exception as e:
+            print(f"Error returning bib blocks: {e}")
+
+    def __enter__(self):
+        """Use the allocator as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Return unused numbers on exit."""
+        self.release()
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🎟️ TRRS Registration Intake
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    High-concurrency registration intake that enforces
+    races.registration_limit without overselling. Capacity lives in a
+    per-race counter row (race_capacity); each intake process leases blocks
+    of slots from it in one short transaction and hands them out from
+    memory, so the hot row is touched once per block rather than once per
+    sign-up. Each process's unused slots are recorded in
+    race_capacity_leases and renewed by a heartbeat; a lease that is not
+    renewed within LEASE_TTL (a crashed or killed worker) is dropped and
+    reserved is recounted from registrations plus live leases.
+    Registration is closed automatically when the last slot is leased and
+    reopened once slots are free again; the heartbeat also picks up an
+    admin closing or reopening the race. Confirmation emails are queued to
+    the email outbox rather than sent inline.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Optional, Dict, NamedTuple
+
+from ..database.connection import db_manager
+from ..models.age_group import age_group_manager
+from ..models.participant import Participant, participant_manager
+from ..models.race import race_manager
+from .bibs import BibAllocator
+from .mailer import confirmation_emails_enabled, enqueue_confirmation
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+REGISTERED = "registered"
+FULL = "full"
+BUSY = "busy"
+CLOSED = "closed"
+ERROR = "error"
+
+# Seconds a slot lease survives without a heartbeat; a crashed process's slots come back after this
+LEASE_TTL = 120
+
+# Seconds between heartbeats, which also pick up an admin closing or reopening registration
+HEARTBEAT_INTERVAL = 10
+
+class IntakeResult(NamedTuple):
+    """Outcome of a registration attempt."""
+    status: str
+    participant_id: Optional[int] = None
+
+class LeaseState(NamedTuple):
+    """What a heartbeat learned about the race and this holder's lease."""
+    accepting: bool
+    lease_alive: bool
+
+class CapacityCounter:
+    """Atomic operations on a race's race_capacity row and its slot leases."""
+
+    def __init__(self, race_id: int, holder: Optional[str] = None):
+        """Initialize capacity counter; ``holder`` names this process's lease."""
+        self.race_id = race_id
+        self.holder = holder or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def sync(self) -> Optional[int]:
+        """Create or refresh the counter row from races.registration_limit.
+
+        A new row starts at the number of registrations already taken. An
+        existing row is recounted, which drops expired leases and reopens
+        registration closed by a lease nobody will hand back.
+        Returns the capacity, or None when the race is unlimited.
+        """
+        query = """
+            INSERT INTO race_capacity (race_id, capacity, reserved)
+            SELECT r.race_id, NULLIF(r.registration_limit, 0),
+                   (SELECT COUNT(*) FROM participants p
+                    WHERE p.race_id = r.race_id AND p.registration_status != 'cancelled')
+            FROM races r
+            WHERE r.race_id = %s
+            ON DUPLICATE KEY UPDATE capacity = VALUES(capacity)
+        """
+        db_manager.execute_update(query, (self.race_id,))
+
+        with db_manager.transaction() as cursor:
+            row = self._recount(cursor)
+            if row:
+                self._reopen_if_free(cursor, row)
+        if row and row['reopened']:
+            race_manager.notify_change(self.race_id)
+        return row['capacity'] if row else None
+
+    def _recount(self, cursor) -> Optional[Dict]:
+        """Lock the counter row and recompute reserved from registrations plus live leases.
+
+        Leases that were not renewed within LEASE_TTL belong to processes
+        that died; dropping them frees their unused slots. A live lease may
+        count slots that were already registered since its last renewal,
+        which only errs towards underselling until the next heartbeat.
+        """
+        cursor.execute("""
+            SELECT c.capacity, c.reserved, c.auto_closed, r.registration_open
+            FROM race_capacity c
+            JOIN races r ON r.race_id = c.race_id
+            WHERE c.race_id = %s
+            FOR UPDATE
+        """, (self.race_id,))
+        row = cursor.fetchone()
+        if not row or row['capacity'] is None:
+            return row
+
+        cursor.execute("DELETE FROM race_capacity_leases WHERE race_id = %s AND expires_at < NOW()",
+                       (self.race_id,))
+        if cursor.rowcount:
+            logger.warning(f"Dropped {cursor.rowcount} expired capacity leases for race {self.race_id}")
+        cursor.execute("""
+            SELECT (SELECT COUNT(*) FROM participants
+                    WHERE race_id = %s AND registration_status != 'cancelled')
+                 + (SELECT COALESCE(SUM(slots), 0) FROM race_capacity_leases
+                    WHERE race_id = %s) AS reserved
+        """, (self.race_id, self.race_id))
+        reserved = int(cursor.fetchone()['reserved'])
+        if reserved != row['reserved']:
+            cursor.execute("UPDATE race_capacity SET reserved = %s WHERE race_id = %s",
+                           (reserved, self.race_id))
+            row['reserved'] = reserved
+        return row
+
+    def _reopen_if_free(self, cursor, row: Dict):
+        """Reopen registration intake closed, if there is capacity again."""
+        row['reopened'] = False
+        if row['capacity'] is None or not row['auto_closed'] or row['reserved'] >= row['capacity']:
+            return
+        cursor.execute("UPDATE races SET registration_open = TRUE WHERE race_id = %s", (self.race_id,))
+        cursor.execute("UPDATE race_capacity SET auto_closed = FALSE WHERE race_id = %s", (self.race_id,))
+        row['reopened'] = row['registration_open'] = True
+        logger.info(f"Race {self.race_id} has capacity again; registration reopened")
+
+    def lease(self, wanted: int, held: int = 0) -> int:
+        """Reserve up to ``wanted`` more slots for a holder already holding ``held``; returns how many were granted."""
+        granted, changed = self._lease(wanted, held)
+        if changed:
+            race_manager.notify_change(self.race_id)
+        return granted
+
+    def _lease(self, wanted: int, held: int):
+        """Lease slots in one transaction; returns (granted, registration opened or closed)."""
+        with db_manager.transaction() as cursor:
+            row = self._recount(cursor)
+            if not row:
+                return 0, False
+            if row['capacity'] is None:
+                return wanted, False
+            self._reopen_if_free(cursor, row)
+            closed = False
+            if not row['registration_open']:
+                return 0, row['reopened']
+
+            granted = max(0, min(wanted, row['capacity'] - row['reserved']))
+            if granted:
+                cursor.execute(
+                    "UPDATE race_capacity SET reserved = reserved + %s WHERE race_id = %s",
+                    (granted, self.race_id)
+                )
+                cursor.execute("""
+                    INSERT INTO race_capacity_leases (race_id, holder, slots, expires_at)
+                    VALUES (%s, %s, %s, NOW() + INTERVAL %s SECOND)
+                    ON DUPLICATE KEY UPDATE slots = VALUES(slots), expires_at = VALUES(expires_at)
+                """, (self.race_id, self.holder, held + granted, LEASE_TTL))
+
+            # Last slot gone: close registration in the same transaction
+            if row['reserved'] + granted >= row['capacity']:
+                cursor.execute(
+                    "UPDATE races SET registration_open = FALSE WHERE race_id = %s AND registration_open = TRUE",
+                    (self.race_id,)
+                )
+                if cursor.rowcount:
+                    cursor.execute("UPDATE race_capacity SET auto_closed = TRUE WHERE race_id = %s",
+                                   (self.race_id,))
+                    logger.info(f"Race {self.race_id} is full; registration closed")
+                    closed = True
+            return granted, closed or row['reopened']
+
+    def heartbeat(self, held: int) -> LeaseState:
+        """Renew this holder's lease at ``held`` unused slots and read whether the race takes sign-ups.
+
+        Closed by an admin means no more sign-ups; closed because intake
+        leased the last slot still lets holders use the slots they hold.
+        """
+        if held:
+            db_manager.execute_update("""
+                UPDATE race_capacity_leases SET slots = %s, expires_at = NOW() + INTERVAL %s SECOND
+                WHERE race_id = %s AND holder = %s
+            """, (held, LEASE_TTL, self.race_id, self.holder))
+        rows = db_manager.execute_query("""
+            SELECT r.registration_open, COALESCE(c.auto_closed, FALSE) AS auto_closed,
+                   l.holder IS NOT NULL AS has_lease
+            FROM races r
+            LEFT JOIN race_capacity c ON c.race_id = r.race_id
+            LEFT JOIN race_capacity_leases l ON l.race_id = r.race_id AND l.holder = %s
+            WHERE r.race_id = %s
+        """, (self.holder, self.race_id))
+        if not rows:
+            return LeaseState(False, False)
+        row = rows[0]
+        return LeaseState(bool(row['registration_open'] or row['auto_closed']), bool(row['has_lease']))
+
+    def release(self, held: int = 0):
+        """Give back this holder's unused slots beyond ``held`` and recount.
+
+        Reopens registration if intake had closed it and slots are free
+        again, e.g. after a cancellation.
+        """
+        with db_manager.transaction() as cursor:
+            if held:
+                cursor.execute("UPDATE race_capacity_leases SET slots = %s WHERE race_id = %s AND holder = %s",
+                               (held, self.race_id, self.holder))
+            else:
+                cursor.execute("DELETE FROM race_capacity_leases WHERE race_id = %s AND holder = %s",
+                               (self.race_id, self.holder))
+            row = self._recount(cursor)
+            if row:
+                self._reopen_if_free(cursor, row)
+
+        race_manager.notify_change(self.race_id)
+
+class RegistrationIntake:
+    """Admission-controlled registration front door for one race."""
+
+    def __init__(self, race_id: int, block_size: int = 20, max_pending: int = 64,
+                 admission_timeout: float = 0.5, assign_bibs: bool = False):
+        """Initialize registration intake.
+
+        ``block_size`` is how many slots are leased from the counter row at
+        a time. At most ``max_pending`` registrations are processed at once;
+        callers beyond that wait up to ``admission_timeout`` seconds and are
+        then turned away as busy. With ``assign_bibs`` each participant
+        without a bib gets one from the race's bib ranges.
+        """
+        self.race_id = race_id
+        self.block_size = block_size
+        self.admission_timeout = admission_timeout
+        self.counter = CapacityCounter(race_id)
+
+        self._admission = threading.BoundedSemaphore(max_pending)
+        self._slot_lock = threading.Lock()
+        self._local_slots = 0
+        self._in_flight = 0
+        self._sold_out = False
+        self._accepting = True
+        self._next_heartbeat = 0.0
+
+        self.race = race_manager.get_race_by_id(race_id)
+        if not self.race:
+            raise ValueError(f"Race {race_id} not found")
+        self.brackets = age_group_manager.get_brackets(race_id)
+        self.capacity = self.counter.sync()
+        self.bibs = BibAllocator(race_id) if assign_bibs else None
+
+    def _accepting_now(self) -> bool:
+        """Whether the race takes sign-ups, heartbeating the lease when one is due."""
+        if time.monotonic() < self._next_heartbeat:
+            return self._accepting
+
+        with self._slot_lock:
+            if time.monotonic() < self._next_heartbeat:
+                return self._accepting
+            state = self.counter.heartbeat(self._local_slots + self._in_flight)
+            self._next_heartbeat = time.monotonic() + HEARTBEAT_INTERVAL
+            self._accepting = state.accepting
+            # Slots may have come back from cancellations or expired leases
+            self._sold_out = False
+            if self._local_slots and not state.lease_alive:
+                # Our lease expired and was recounted away; these slots are no longer ours
+                logger.warning(f"Capacity lease for race {self.race_id} expired; "
+                               f"dropping {self._local_slots} local slots")
+                self._local_slots = 0
+            unused = 0
+            if not state.accepting and self._local_slots:
+                unused, self._local_slots = self._local_slots, 0
+
+        if unused:
+            self.counter.release(self._in_flight)
+            logger.info(f"Registration closed for race {self.race_id}; returned {unused} slots")
+        return self._accepting
+
+    def _take_slot(self) -> bool:
+        """Take one slot from the local lease, leasing a new block if needed."""
+        if self.capacity is None:
+            return True
+
+        with self._slot_lock:
+            if self._local_slots == 0:
+                if self._sold_out:
+                    return False
+                granted = self.counter.lease(self.block_size, self._in_flight)
+                if granted == 0:
+                    self._sold_out = True
+                    return False
+                self._local_slots = granted
+            self._local_slots -= 1
+            self._in_flight += 1
+            return True
+
+    def _finish_slot(self, used: bool):
+        """Settle a slot taken for a registration; an unused one goes back to the local lease."""
+        if self.capacity is None:
+            return
+        with self._slot_lock:
+            self._in_flight -= 1
+            if not used:
+                self._local_slots += 1
+
+    def register(self, participant: Participant) -> IntakeResult:
+        """Register a participant if there is capacity."""
+        if not self._accepting_now():
+            return IntakeResult(CLOSED)
+        if not self._admission.acquire(timeout=self.admission_timeout):
+            return IntakeResult(BUSY)
+
+        try:
+            if not self._take_slot():
+                return IntakeResult(FULL)
+
+            participant.race_id = self.race_id
+            if self.bibs and not participant.bib_number:
+                participant.bib_number = self.bibs.next_bib(participant.distance)
+            participant_id = participant_manager.create_participant(participant, self.race, self.brackets)
+            self._finish_slot(participant_id is not None)
+            if participant_id is None:
+                return IntakeResult(ERROR)
+            if participant.email and confirmation_emails_enabled():
+                participant.participant_id = participant_id
+                enqueue_confirmation(participant, self.race)
+            return IntakeResult(REGISTERED, participant_id)
+        finally:
+            self._admission.release()
+
+    def close(self):
+        """Return unused leased slots and bib numbers."""
+        if self.bibs:
+            self.bibs.release()
+        if self.capacity is None:
+            return
+        with self._slot_lock:
+            unused = self._local_slots
+            self._local_slots = 0
+        self.counter.release()
+        if unused:
+            logger.info(f"Returned {unused} unused slots for race {self.race_id}")
+
+    def __enter__(self):
+        """Use the intake as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Return unused slots on exit."""
+        self.close()
+
+def cancel_registration(participant_id: int) -> bool:
+    """Cancel a registration and give its slot back."""
+    rows = db_manager.execute_query(
+        "SELECT race_id, registration_status FROM participants WHERE participant_id = %s",
+        (participant_id,)
+    )
+    if not rows or rows[0]['registration_status'] == 'cancelled':
+        return False
+
+    cancelled = db_manager.execute_update(
+        "UPDATE participants SET registration_status = 'cancelled' "
+        "WHERE participant_id = %s AND race_id = %s AND registration_status != 'cancelled'",
+        (participant_id, rows[0]['race_id'])
+    )
+    if not cancelled:
+        return False
+    CapacityCounter(rows[0]['race_id']).release()
+    return True
@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+📧 TRRS Email Dispatcher
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Durable outbound email for registration confirmations. Registration only
+    inserts a row into email_outbox; dispatcher worker threads claim due
+    rows in batches, send them over one reused SMTP connection per worker
+    and mark them sent in bulk. Transient failures are retried with
+    exponential backoff, and rows left claimed by a crashed worker are
+    requeued.
+
+        python3 -m libraries.registration.mailer --run
+        python3 -m libraries.registration.mailer --drain
+        python3 -m libraries.registration.mailer --status
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import logging
+import smtplib
+import sys
+import threading
+import time
+import uuid
+from email.message import EmailMessage
+from typing import Optional, Dict, List
+
+from ..database.config_watcher import ConfigWatcher
+from ..database.connection import db_manager
+from ..models.participant import Participant
+from ..models.race import Race
+from ..models.settings import settings_manager
+from ..utils.config import config
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Claims older than this are assumed abandoned; workers also sweep for them this often
+STALE_CLAIM_MINUTES = 10
+
+CONFIRMATION_SUBJECT = "You're registered for {race_name}"
+CONFIRMATION_BODY = """Hi {first_name},
+
+Thanks for registering for {race_name} on {race_date}.
+
+Distance: {distance}
+Bib: {bib_number}
+Venue: {race_venue}
+
+See you at the start line!
+"""
+
+def confirmation_emails_enabled() -> bool:
+    """Check the registration_email_enabled system setting."""
+    return settings_manager.get_bool('registration_email_enabled')
+
+def enqueue_email(to_address: str, subject: str, body_text: str, race_id: Optional[int] = None,
+                  participant_id: Optional[int] = None) -> Optional[int]:
+    """Queue an email; returns its outbox ID."""
+    query = """
+        INSERT INTO email_outbox (race_id, participant_id, to_address, subject, body_text)
+        VALUES (%s, %s, %s, %s, %s)
+    """
+
+    try:
+        return db_manager.execute_insert(query, (race_id, participant_id, to_address, subject, body_text))
+    except Exception as e:
+        print(f"Error queuing email: {e}")
+        return None
+
+def enqueue_confirmation(participant: Participant, race: Race) -> Optional[int]:
+    """Queue a registration confirmation."""
+    if not participant.email:
+        return None
+
+    fields = {
+        'first_name': participant.first_name,
+        'race_name': race.race_name,
+        'race_date': race.race_date,
+        'race_venue': race.race_venue or 'TBD',
+        'distance': participant.distance or '-',
+        'bib_number': participant.bib_number or 'assigned at packet pickup',
+    }
+    return enqueue_email(participant.email, CONFIRMATION_SUBJECT.format(**fields),
+                         CONFIRMATION_BODY.format(**fields), race.race_id, participant.participant_id)
+
+def get_outbox_status() -> Dict[str, int]:
+    """Count outbox rows by status."""
+    counts = {'queued': 0, 'sending': 0, 'sent': 0, 'failed': 0}
+    try:
+        for row in db_manager.execute_query("SELECT status, COUNT(*) AS n FROM email_outbox GROUP BY status"):
+            counts[row['status']] = row['n']
+    except Exception as e:
+        print(f"Error reading outbox: {e}")
+    return counts
+
+def retry_failed() -> int:
+    """Requeue every failed email."""
+    try:
+        return db_manager.execute_update(
+            "UPDATE email_outbox SET status = 'queued', attempts = 0, next_attempt_at = NOW() "
+            "WHERE status = 'failed'"
+        )
+    except Exception as e:
+        print(f"Error requeuing failed emails: {e}")
+        return 0
+
+class DispatcherStats:
+    """Thread-safe delivery counters."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.batches = 0
+        self.connections = 0
+
+    def add(self, **counts):
+        """Add to counters."""
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> Dict:
+        """Current counters and throughput."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            'sent': self.sent,
+            'retried': self.retried,
+            'failed': self.failed,
+            'batches': self.batches,
+            'connections': self.connections,
+            'seconds': elapsed,
+            'per_second': self.sent / elapsed,
+        }
+
+class EmailDispatcher:
+    """Worker threads that drain email_outbox over SMTP."""
+
+    def __init__(self, workers: Optional[int] = None, batch_size: Optional[int] = None):
+        """Initialize email dispatcher."""
+        self.workers = workers or self.settings.workers
+        self._batch_size = batch_size
+        self.stats = DispatcherStats()
+
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._requeue_lock = threading.Lock()
+        self._next_requeue = 0.0
+
+    @property
+    def settings(self):
+        """Current email settings; ConfigWatcher replaces config.email on reload."""
+        return config.email
+
+    @property
+    def batch_size(self) -> int:
+        """Batch size override, else the current email.batch_size."""
+        return self._batch_size or self.settings.batch_size
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open an SMTP connection."""
+        smtp = smtplib.SMTP(self.settings.smtp_host, self.settings.smtp_port, timeout=30)
+        if self.settings.use_tls:
+            smtp.starttls()
+        if self.settings.smtp_user:
+            smtp.login(self.settings.smtp_user, self.settings.smtp_password)
+        self.stats.add(connections=1)
+        return smtp
+
+    def requeue_stale(self) -> int:
+        """Requeue rows claimed by a worker that never finished them."""
+        return db_manager.execute_update(
+            "UPDATE email_outbox SET status = 'queued', claimed_by = NULL "
+            "WHERE status = 'sending' AND claimed_at < NOW() - INTERVAL %s MINUTE",
+            (STALE_CLAIM_MINUTES,)
+        )
+
+    def _requeue_stale_if_due(self):
+        """Requeue stale claims once every STALE_CLAIM_MINUTES across all workers."""
+        with self._requeue_lock:
+            now = time.monotonic()
+            if now < self._next_requeue:
+                return
+            self._next_requeue = now + STALE_CLAIM_MINUTES * 60
+
+        try:
+            requeued = self.requeue_stale()
+            if requeued:
+                logger.info(f"Requeued {requeued} emails left claimed by a stopped worker")
+        except Exception as e:
+            logger.error(f"Could not requeue stale emails: {e}")
+
+    def claim_batch(self) -> List[Dict]:
+        """Claim due emails for this worker in one statement."""
+        token = uuid.uuid4().hex
+        claimed = db_manager.execute_update(
+            "UPDATE email_outbox SET status = 'sending', claimed_by = %s, claimed_at = NOW() "
+            "WHERE status = 'queued' AND next_attempt_at <= NOW() "
+            "ORDER BY next_attempt_at, email_id LIMIT %s",
+            (token, self.batch_size)
+        )
+        if not claimed:
+            return []
+        return db_manager.execute_query(
+            "SELECT email_id, to_address, subject, body_text, attempts FROM email_outbox "
+            "WHERE claimed_by = %s AND status = 'sending'",
+            (token,)
+        )
+
+    def _message(self, row: Dict) -> EmailMessage:
+        """Build a message from an outbox row."""
+        message = EmailMessage()
+        message['From'] = self.settings.from_address
+        message['To'] = row['to_address']
+        message['Subject'] = row['subject']
+        message.set_content(row['body_text'])
+        return message
+
+    def _record(self, sent: List[int], retry: List[tuple], failed: List[tuple]):
+        """Write a batch's outcomes back in bulk."""
+        if sent:
+            placeholders = ", ".join(["%s"] * len(sent))
+            db_manager.execute_update(
+                f"UPDATE email_outbox SET status = 'sent', sent_at = NOW(), attempts = attempts + 1, "
+                f"claimed_by = NULL WHERE email_id IN ({placeholders})",
+                tuple(sent)
+            )
+        if retry:
+            db_manager.execute_many(
+                "UPDATE email_outbox SET status = 'queued', attempts = attempts + 1, claimed_by = NULL, "
+                "next_attempt_at = NOW() + INTERVAL %s SECOND, last_error = %s WHERE email_id = %s",
+                retry
+            )
+        if failed:
+            db_manager.execute_many(
+                "UPDATE email_outbox SET status = 'failed', attempts = attempts + 1, claimed_by = NULL, "
+                "last_error = %s WHERE email_id = %s",
+                failed
+            )
+        self.stats.add(sent=len(sent), retried=len(retry), failed=len(failed), batches=1)
+
+    def send_batch(self, smtp: Optional[smtplib.SMTP], rows: List[Dict]) -> Optional[smtplib.SMTP]:
+        """Send claimed rows; returns the (possibly reopened) connection."""
+        sent, retry, failed = [], [], []
+
+        # A reused connection may have been idled out by the server
+        if smtp is not None:
+            try:
+                smtp.noop()
+            except (smtplib.SMTPException, OSError):
+                smtp = None
+
+        for row in rows:
+            try:
+                if smtp is None:
+                    smtp = self._connect()
+                smtp.send_message(self._message(row))
+                sent.append(row['email_id'])
+            except smtplib.SMTPRecipientsRefused as e:
+                # The address itself was rejected; retrying will not help
+                failed.append((str(e)[:500], row['email_id']))
+            except (smtplib.SMTPException, OSError) as e:
+                attempts = row['attempts'] + 1
+                if attempts >= self.settings.max_attempts:
+                    failed.append((str(e)[:500], row['email_id']))
+                else:
+                    delay = int(self.settings.retry_base_seconds * 2 ** (attempts - 1))
+                    retry.append((delay, str(e)[:500], row['email_id']))
+                # Drop the connection; the next message reconnects
+                if smtp is not None:
+                    try:
+                        smtp.close()
+                    except Exception:
+                        pass
+                smtp = None
+
+        self._record(sent, retry, failed)
+        return smtp
+
+    def _worker(self, worker_id: int, drain: bool):
+        """Claim and send until stopped (or the queue is empty when draining)."""
+        smtp: Optional[smtplib.SMTP] = None
+        connected_with = self.settings
+        try:
+            while not self._stop.is_set():
+                # Recover rows from peers that crashed while this dispatcher runs
+                self._requeue_stale_if_due()
+                try:
+                    rows = self.claim_batch()
+                except Exception as e:
+                    logger.error(f"Email worker {worker_id} could not claim a batch: {e}")
+                    rows = []
+
+                if not rows:
+                    if drain:
+                        break
+                    self._stop.wait(self.settings.poll_interval)
+                    continue
+
+                # Reconnect after a reload so new SMTP settings take effect
+                if self.settings is not connected_with:
+                    connected_with = self.settings
+                    if smtp is not None:
+                        try:
+                            smtp.quit()
+                        except Exception:
+                            pass
+                        smtp = None
+
+                smtp = self.send_batch(smtp, rows)
+        finally:
+            if smtp is not None:
+                try:
+                    smtp.quit()
+                except Exception:
+                    pass
+
+    def start(self, drain: bool = False):
+        """Start worker threads."""
+        self._next_requeue = 0.0
+        self._requeue_stale_if_due()
+
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._worker, args=(worker_id, drain),
+                             name=f"trrs-email-{worker_id}", daemon=True)
+            for worker_id in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Email dispatcher started with {self.workers} workers")
+
+    def stop(self, timeout: float = 30.0):
+        """Stop workers after their current batch."""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        logger.info(f"Email dispatcher stopped: {self.stats.snapshot()}")
+
+    def drain(self) -> Dict:
+        """Send everything that is due, then return the stats."""
+        self.start(drain=True)
+        for thread in self._threads:
+            thread.join()
+        return self.stats.snapshot()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="TRRS outbound email dispatcher")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument('--run', action='store_true', help="Run until interrupted")
+    mode.add_argument('--drain', action='store_true', help="Send what is due, then exit")
+    mode.add_argument('--status', action='store_true', help="Show outbox counts")
+    mode.add_argument('--retry-failed', action='store_true', help="Requeue failed emails")
+    parser.add_argument('--workers', type=int, help=f"Worker threads (default {config.email.workers})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.status:
+        print(f"📧 Outbox: {get_outbox_status()}")
+        return 0
+    if args.retry_failed:
+        print(f"🔁 Requeued {retry_failed()} failed emails")
+        return 0
+
+    dispatcher = EmailDispatcher(workers=args.workers)
+    if args.drain:
+        stats = dispatcher.drain()
+    else:
+        watcher = ConfigWatcher().start()
+        dispatcher.start()
+        try:
+            while True:
+                time.sleep(10)
+                logger.info(f"Email dispatcher: {dispatcher.stats.snapshot()}")
+        except KeyboardInterrupt:
+            pass
+        dispatcher.stop()
+        watcher.stop()
+        stats = dispatcher.stats.snapshot()
+
+    print(f"📧 Sent {stats['sent']}, retried {stats['retried']}, failed {stats['failed']} "
+          f"({stats['per_second']:.1f}/s over {stats['connections']} SMTP connections)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+💳 TRRS Payment Reconciliation
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Reconcile a payment processor settlement export against participants.
+    The CSV is streamed row by row and matched through an in-memory index
+    of participants by payment reference and email, loaded once with a
+    streaming query. Status changes are collected per chunk and applied as
+    one bulk UPDATE in one transaction per chunk, so tens of thousands of
+    payments take a handful of round trips.
+
+        python3 -m libraries.registration.payments settlement.csv --race 12
+        python3 -m libraries.registration.payments settlement.csv --dry-run --unmatched unmatched.csv
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import csv
+import logging
+import sys
+import time
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+from typing import Optional, Dict, List, NamedTuple, Iterable
+
+from ..database.connection import db_manager
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Header names processors use for each field, matched ignoring case and spacing
+COLUMN_ALIASES = {
+    'reference': ('reference', 'payment_reference', 'transaction_id', 'charge_id', 'id'),
+    'email': ('email', 'customer_email', 'receipt_email', 'payer_email'),
+    'amount': ('amount', 'gross', 'amount_paid', 'total'),
+    'status': ('status', 'type', 'transaction_type'),
+}
+
+STATUS_MAP = {
+    'paid': 'paid', 'succeeded': 'paid', 'success': 'paid', 'settled': 'paid',
+    'captured': 'paid', 'completed': 'paid', 'charge': 'paid', 'payment': 'paid',
+    'refunded': 'refunded', 'refund': 'refunded', 'reversed': 'refunded',
+    'chargeback': 'refunded',
+}
+
+class PaymentUpdate(NamedTuple):
+    """A status change for one participant."""
+    participant_id: int
+    race_id: int
+    payment_status: str
+    amount_paid: Optional[Decimal]
+    payment_reference: Optional[str]
+
+class _Payer:
+    """Index entry for one participant."""
+    __slots__ = ('participant_id', 'race_id', 'payment_status', 'amount_paid', 'payment_reference')
+
+    def __init__(self, row: Dict):
+        self.participant_id = row['participant_id']
+        self.race_id = row['race_id']
+        self.payment_status = row['payment_status']
+        self.amount_paid = row['amount_paid']
+        self.payment_reference = row['payment_reference']
+
+class PaymentIndex:
+    """Participants keyed by payment reference and lower-cased email."""
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self.by_reference: Dict[str, _Payer] = {}
+        self.by_email: Dict[str, List[_Payer]] = {}
+
+    def add(self, row: Dict):
+        """Index one participant row."""
+        payer = _Payer(row)
+        if payer.payment_reference:
+            self.by_reference[payer.payment_reference] = payer
+        if row['email']:
+            self.by_email.setdefault(row['email'].strip().lower(), []).append(payer)
+
+    @classmethod
+    def load(cls, race_id: Optional[int] = None) -> 'PaymentIndex':
+        """Stream participants (of one race, or every race) into an index."""
+        index = cls()
+        query = ("SELECT participant_id, race_id, email, payment_status, amount_paid, payment_reference "
+                 "FROM participants WHERE registration_status <> 'cancelled'")
+        params: tuple = ()
+        if race_id is not None:
+            query += " AND race_id = %s"
+            params = (race_id,)
+        query += " ORDER BY participant_id"
+
+        for rows in db_manager.stream_query(query, params, batch_size=5000):
+            for row in rows:
+                index.add(row)
+        return index
+
+    def match(self, reference: Optional[str], email: Optional[str], status: str) -> Optional[_Payer]:
+        """Find the participant a settlement line belongs to."""
+        if reference and reference in self.by_reference:
+            return self.by_reference[reference]
+        if not email:
+            return None
+
+        candidates = self.by_email.get(email.strip().lower())
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+
+        # Several registrations share the email: a payment settles the first
+        # one still pending, a refund the first one that was paid
+        wanted = 'pending' if status == 'paid' else 'paid'
+        for payer in candidates:
+            if payer.payment_status == wanted and not payer.payment_reference:
+                return payer
+        return None
+
+class ReconcileReport:
+    """Outcome counts of one reconciliation run."""
+
+    def __init__(self):
+        """Initialize counters."""
+        self.rows = 0
+        self.updated = 0
+        self.would_update = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.unmatched: List[Dict] = []
+        self.chunks = 0
+        self.seconds = 0.0
+
+    def summary(self) -> Dict:
+        """Counters as a dict."""
+        return {
+            'rows': self.rows,
+            'updated': self.updated,
+            'would_update': self.would_update,
+            'unchanged': self.unchanged,
+            'skipped': self.skipped,
+            'unmatched': len(self.unmatched),
+            'chunks': self.chunks,
+            'seconds': round(self.seconds, 3),
+        }
+
+def _resolve_columns(fieldnames: Iterable[str]) -> Dict[str, Optional[str]]:
+    """Map our field names onto the export's header."""
+    lowered = {name.strip().lower().replace(' ', '_').replace('-', '_'): name for name in fieldnames if name}
+    return {
+        field: next((lowered[alias] for alias in aliases if alias in lowered), None)
+        for field, aliases in COLUMN_ALIASES.items()
+    }
+
+def _parse_amount(value: Optional[str]) -> Optional[Decimal]:
+    """Parse '$1,234.50' style amounts."""
+    if not value:
+        return None
+    try:
+        return abs(Decimal(value.strip().replace('$', '').replace(',', '')))
+    except InvalidOperation:
+        return None
+
+def apply_updates(updates: List[PaymentUpdate]) -> int:
+    """Apply a chunk of updates as one UPDATE in one transaction."""
+    if not updates:
+        return 0
+
+    rows = " UNION ALL ".join(["SELECT %s AS id, %s AS race_id, %s AS status, %s AS amount, %s AS ref"]
+                              * len(updates))
+    # race_id is part of the key and lets the update prune partitions
+    query = f"""
+        UPDATE participants p
+        JOIN ({rows}) u ON p.participant_id = u.id AND p.race_id = u.race_id
+        SET p.payment_status = u.status,
+            p.amount_paid = COALESCE(u.amount, p.amount_paid),
+            p.payment_reference = COALESCE(u.ref, p.payment_reference)
+    """
+    params = tuple(value for update in updates for value in update)
+
+    with db_manager.transaction() as cursor:
+        cursor.execute(query, params)
+        return cursor.rowcount
+
+class PaymentReconciler:
+    """Streams a settlement export and applies it in chunks."""
+
+    def __init__(self, race_id: Optional[int] = None, chunk_size: int = 1000, dry_run: bool = False):
+        """Initialize payment reconciler."""
+        self.race_id = race_id
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.index: Optional[PaymentIndex] = None
+
+    def _flush(self, pending: Dict[int, PaymentUpdate], report: ReconcileReport):
+        """Write one chunk."""
+        if not pending:
+            return
+        if self.dry_run:
+            report.would_update += len(pending)
+        else:
+            apply_updates(list(pending.values()))
+            report.updated += len(pending)
+        report.chunks += 1
+        pending.clear()
+
+    def reconcile(self, lines: Iterable[Dict[str, str]], columns: Dict[str, Optional[str]]) -> ReconcileReport:
+        """Reconcile parsed settlement lines."""
+        report = ReconcileReport()
+        started = time.perf_counter()
+        if self.index is None:
+            self.index = PaymentIndex.load(self.race_id)
+
+        pending: Dict[int, PaymentUpdate] = {}
+        for line in lines:
+            report.rows += 1
+            raw_status = (line.get(columns['status']) or 'paid') if columns['status'] else 'paid'
+            status = STATUS_MAP.get(raw_status.strip().lower())
+            if status is None:
+                # Pending, failed and disputed lines carry no settled money
+                report.skipped += 1
+                continue
+
+            reference = (line.get(columns['reference']) or '').strip() if columns['reference'] else ''
+            email = line.get(columns['email']) if columns['email'] else None
+            amount = _parse_amount(line.get(columns['amount'])) if columns['amount'] else None
+
+            payer = self.index.match(reference or None, email, status)
+            if payer is None:
+                report.unmatched.append(line)
+                continue
+
+            # Refunds keep the original charge's reference and amount
+            new_reference = payer.payment_reference or reference or None
+            new_amount = payer.amount_paid if status == 'refunded' else amount
+            if (payer.payment_status == status and payer.payment_reference == new_reference
+                    and (new_amount is None or payer.amount_paid == new_amount)):
+                report.unchanged += 1
+                continue
+
+            payer.payment_status = status
+            payer.amount_paid = new_amount if new_amount is not None else payer.amount_paid
+            if new_reference and new_reference != payer.payment_reference:
+                payer.payment_reference = new_reference
+                self.index.by_reference[new_reference] = payer
+
+            # A later line for the same participant in a chunk supersedes the earlier one
+            pending[payer.participant_id] = PaymentUpdate(payer.participant_id, payer.race_id, status,
+                                                        new_amount, new_reference)
+            if len(pending) >= self.chunk_size:
+                self._flush(pending, report)
+
+        self._flush(pending, report)
+        report.seconds = time.perf_counter() - started
+        return report
+
+    def reconcile_file(self, path: Path) -> ReconcileReport:
+        """Stream and reconcile a settlement CSV."""
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            columns = _resolve_columns(reader.fieldnames or [])
+            if not columns['reference'] and not columns['email']:
+                raise ValueError(f"{path} has neither a reference nor an email column")
+            report = self.reconcile(reader, columns)
+
+        logger.info(f"Reconciled {path.name}: {report.summary()}")
+        return report
+
+def write_unmatched(report: ReconcileReport, path: Path) -> int:
+    """Write unmatched settlement lines for manual review."""
+    if not report.unmatched:
+        return 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(report.unmatched[0].keys()))
+        writer.writeheader()
+        writer.writerows(report.unmatched)
+    return len(report.unmatched)
+
+def get_payment_summary(race_id: int) -> List[Dict]:
+    """Count participants and money by payment status for a race."""
+    query = """
+        SELECT payment_status, COUNT(*) AS participants, COALESCE(SUM(amount_paid), 0) AS total
+        FROM participants
+        WHERE race_id = %s AND registration_status <> 'cancelled'
+        GROUP BY payment_status
+        ORDER BY payment_status
+    """
+
+    try:
+        return db_manager.execute_query(query, (race_id,))
+    except Exception as e:
+        print(f"Error getting payment summary: {e}")
+        return []
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Reconcile a payment processor settlement export")
+    parser.add_argument('file', type=Path, help="Settlement CSV")
+    parser.add_argument('--race', type=int, help="Only match participants of this race")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Updates per transaction")
+    parser.add_argument('--dry-run', action='store_true', help="Match and count without writing")
+    parser.add_argument('--unmatched', type=Path, help="Write unmatched lines to this CSV")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    try:
+        report = PaymentReconciler(args.race, args.chunk_size, args.dry_run).reconcile_file(args.file)
+    except Exception as e:
+        logger.error(f"Reconciliation failed: {e}")
+        return 1
+
+    summary = report.summary()
+    changed = f"{summary['would_update']} would update" if args.dry_run else f"{summary['updated']} updated"
+    print(f"💳 {summary['rows']} lines: {changed}, {summary['unchanged']} unchanged, "
+          f"{summary['skipped']} skipped, {summary['unmatched']} unmatched "
+          f"in {summary['seconds']:.2f}s{' (dry run)' if args.dry_run else ''}")
+    if args.unmatched and report.unmatched:
+        print(f"📝 Wrote {write_unmatched(report, args.unmatched)} unmatched lines to {args.unmatched}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
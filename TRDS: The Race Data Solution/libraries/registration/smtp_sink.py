@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+📮 TRRS Local SMTP Sink
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Minimal SMTP server that accepts every message and keeps it, for trying
+    the email dispatcher without a real mail server. Messages are held in
+    memory and, optionally, written one file per message to a directory.
+
+        python3 -m libraries.registration.smtp_sink --port 1025 --save-dir /tmp/trrs-mail
+        SMTP_HOST=localhost SMTP_PORT=1025 python3 -m libraries.registration.mailer --drain
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import socketserver
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, NamedTuple
+
+class SinkMessage(NamedTuple):
+    """One accepted message."""
+    mail_from: str
+    recipients: List[str]
+    data: bytes
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    """Speak just enough SMTP for smtplib."""
+
+    def _reply(self, line: str):
+        """Send one reply line."""
+        self.wfile.write(line.encode('ascii') + b"\r\n")
+
+    def handle(self):
+        """Serve one client connection."""
+        sink: SMTPSink = self.server.sink
+        mail_from, recipients = '', []
+        self._reply("220 trrs-sink ESMTP")
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+
+            if verb == 'EHLO':
+                self._reply("250-trrs-sink")
+                self._reply("250 8BITMIME")
+            elif verb == 'HELO':
+                self._reply("250 trrs-sink")
+            elif verb == 'MAIL':
+                mail_from, recipients = command[10:].strip(), []
+                self._reply("250 OK")
+            elif verb == 'RCPT':
+                recipients.append(command[8:].strip())
+                self._reply("250 OK")
+            elif verb == 'DATA':
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if not data_line or data_line in (b".\r\n", b".\n"):
+                        break
+                    # Undo dot-stuffing
+                    lines.append(data_line[1:] if data_line.startswith(b"..") else data_line)
+                sink.accept(SinkMessage(mail_from, recipients, b"".join(lines)))
+                mail_from, recipients = '', []
+                self._reply("250 OK queued")
+            elif verb in ('RSET', 'NOOP'):
+                if verb == 'RSET':
+                    mail_from, recipients = '', []
+                self._reply("250 OK")
+            elif verb == 'QUIT':
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+class _ThreadingSMTPServer(socketserver.ThreadingTCPServer):
+    """Threaded TCP server carrying a reference to its sink."""
+    allow_reuse_address = True
+    daemon_threads = True
+
+class SMTPSink:
+    """Local SMTP server that accepts and keeps every message."""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 1025, save_dir: Optional[Path] = None):
+        """Initialize SMTP sink; port 0 picks a free port."""
+        self.save_dir = Path(save_dir) if save_dir else None
+        self.messages: List[SinkMessage] = []
+        self._lock = threading.Lock()
+
+        self.server = _ThreadingSMTPServer((host, port), _SMTPHandler)
+        self.server.sink = self
+        self.host, self.port = self.server.server_address[:2]
+        self._thread: Optional[threading.Thread] = None
+
+    def accept(self, message: SinkMessage):
+        """Keep an accepted message."""
+        with self._lock:
+            self.messages.append(message)
+            count = len(self.messages)
+        if self.save_dir:
+            self.save_dir.mkdir(parents=True, exist_ok=True)
+            (self.save_dir / f"{count:06d}.eml").write_bytes(message.data)
+
+    def start(self) -> 'SMTPSink':
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="trrs-smtp-sink", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        """Start the sink as a context manager."""
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        """Stop the sink on exit."""
+        self.stop()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Local SMTP sink for testing TRRS email")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=1025)
+    parser.add_argument('--save-dir', type=Path, help="Write each message to this directory")
+    args = parser.parse_args(argv)
+
+    with SMTPSink(args.host, args.port, args.save_dir) as sink:
+        print(f"📮 SMTP sink listening on {sink.host}:{sink.port} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(5)
+                print(f"   {len(sink.messages)} messages received")
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+📰 TRMS Static Results Publisher
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Renders race results to static HTML and JSON under TRWS
+    web/static/results so nginx can serve finished races without touching
+    the database. A race is read from race_results in one query and split
+    into pages per distance, distance + gender and distance + gender + age
+    group. Each page's content digest is kept in a manifest, so after a
+    correction only pages whose placements changed are rewritten. Pages are
+    rendered in parallel and swapped into place atomically.
+
+        python3 -m libraries.results.publisher --race 12
+        python3 -m libraries.results.publisher --race 12 --force --workers 8
+
+    Output layout:
+        results/{race_id}/index.html            Category index
+        results/{race_id}/{page}.html|.json     One per category
+        results/{race_id}/manifest.json         Page digests
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional, Dict, List, NamedTuple
+
+from ..database.connection import db_manager
+from ..models.race import race_manager
+from ..utils.paths import paths
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = paths.TRWS_DIR / 'web' / 'static' / 'results'
+
+PAGE_COLUMNS = ('overall_place', 'gender_place', 'age_group_place', 'bib_number',
+                'participant_name', 'gender', 'age_group', 'city', 'state',
+                'net_time', 'timing_status')
+
+PAGE_STYLE = """
+    :root{--brand:#0b5cab;--ink:#1d2833;--muted:#6b7280;--bg:#f8fafc;--card:#ffffff}
+    body{margin:0;padding:24px;color:var(--ink);font-family:system-ui,-apple-system,Segoe UI,Roboto,Inter,Arial,sans-serif;background:var(--bg)}
+    a{color:var(--brand);text-decoration:none}
+    .container{max-width:1120px;margin:0 auto}
+    .muted{color:var(--muted)}
+    table{width:100%;border-collapse:collapse;background:var(--card)}
+    th,td{padding:6px 10px;text-align:left;border-bottom:1px solid #e5e7eb}
+    th{background:#eef6ff;color:var(--brand)}
+"""
+
+class ResultsPage(NamedTuple):
+    """One static results page."""
+    slug: str
+    title: str
+    rows: List[Dict]
+
+def format_net_time(value) -> str:
+    """Format a net time as H:MM:SS."""
+    if not isinstance(value, timedelta):
+        return ''
+    seconds = int(value.total_seconds())
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+def slugify(*parts) -> str:
+    """Build a file-safe page name."""
+    text = "-".join(str(part) for part in parts if part)
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'all'
+
+def get_results_rows(race_id: int) -> List[Dict]:
+    """Read a race's results with the fields the pages show."""
+    query = """
+        SELECT rr.overall_place, rr.gender_place, rr.age_group_place, rr.bib_number,
+               rr.participant_name, rr.distance, rr.net_time, rr.timing_status,
+               p.gender, p.age_group, p.city, p.state
+        FROM race_results rr
+        LEFT JOIN participants p ON p.participant_id = rr.participant_id AND p.race_id = rr.race_id
+        WHERE rr.race_id = %s
+        ORDER BY rr.distance, rr.overall_place IS NULL, rr.overall_place
+    """
+    return db_manager.execute_query(query, (race_id,))
+
+def build_pages(rows: List[Dict]) -> List[ResultsPage]:
+    """Split result rows into category pages, keeping place order."""
+    groups: Dict[tuple, List[Dict]] = {}
+
+    for row in rows:
+        page_row = {column: row.get(column) for column in PAGE_COLUMNS}
+        page_row['net_time'] = format_net_time(row.get('net_time'))
+
+        distance = row.get('distance')
+        keys = [(distance,)]
+        if row.get('gender'):
+            keys.append((distance, row['gender']))
+            if row.get('age_group'):
+                keys.append((distance, row['gender'], row['age_group']))
+        for key in keys:
+            groups.setdefault(key, []).append(page_row)
+
+    pages = []
+    for key, page_rows in groups.items():
+        title = " ".join(str(part) for part in key if part) or "Overall"
+        pages.append(ResultsPage(slugify(*key), title, page_rows))
+    return sorted(pages, key=lambda page: page.slug)
+
+def page_digest(page: ResultsPage) -> str:
+    """Digest of everything a page shows."""
+    body = json.dumps([page.title, page.rows], sort_keys=True, default=str)
+    return hashlib.sha1(body.encode('utf-8')).hexdigest()
+
+def render_html(race_name: str, page: ResultsPage) -> str:
+    """Render a category page."""
+    header = "".join(f"<th>{html.escape(column.replace('_', ' ').title())}</th>" for column in PAGE_COLUMNS)
+    body = "\n".join(
+        "<tr>" + "".join(f"<td>{html.escape(str(row[column] if row[column] is not None else ''))}</td>"
+                         for column in PAGE_COLUMNS) + "</tr>"
+        for row in page.rows
+    )
+    return f"""<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <title>{html.escape(race_name)} — {html.escape(page.title)}</title>
+  <style>{PAGE_STYLE}</style>
+</head>
+<body>
+  <div class="container">
+    <p><a href="index.html">← All categories</a></p>
+    <h1>{html.escape(race_name)}</h1>
+    <h2>{html.escape(page.title)} <span class="muted">({len(page.rows)})</span></h2>
+    <table>
+      <thead><tr>{header}</tr></thead>
+      <tbody>
+{body}
+      </tbody>
+    </table>
+  </div>
+</body>
+</html>
+"""
+
+def render_index(race_name: str, pages: List[ResultsPage]) -> str:
+    """Render the category index page."""
+    links = "\n".join(
+        f'      <li><a href="{page.slug}.html">{html.escape(page.title)}</a> '
+        f'<span class="muted">({len(page.rows)})</span> · <a href="{page.slug}.json">JSON</a></li>'
+        for page in pages
+    )
+    return f"""<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <title>{html.escape(race_name)} — Results</title>
+  <style>{PAGE_STYLE}</style>
+</head>
+<body>
+  <div class="container">
+    <h1>{html.escape(race_name)}</h1>
+    <ul>
+{links}
+    </ul>
+  </div>
+</body>
+</html>
+"""
+
+def write_atomic(path: Path, content: str):
+    """Write a file so readers never see it half written."""
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(content, encoding='utf-8')
+    os.replace(temp_path, path)
+
+class ResultsPublisher:
+    """Publishes static results pages for races."""
+
+    def __init__(self, output_dir: Optional[Path] = None, workers: int = 4):
+        """Initialize results publisher."""
+        self.output_dir = Path(output_dir or RESULTS_DIR)
+        self.workers = workers
+
+    def _race_dir(self, race_id: int) -> Path:
+        """Directory holding one race's pages."""
+        return self.output_dir / str(race_id)
+
+    def _load_manifest(self, race_dir: Path) -> Dict[str, str]:
+        """Load page digests from the last publish."""
+        try:
+            return json.loads((race_dir / 'manifest.json').read_text(encoding='utf-8'))['pages']
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def _write_page(self, race_dir: Path, race_name: str, page: ResultsPage):
+        """Write one category's HTML and JSON."""
+        payload = {'title': page.title, 'count': len(page.rows), 'results': page.rows}
+        write_atomic(race_dir / f"{page.slug}.json", json.dumps(payload, default=str))
+        write_atomic(race_dir / f"{page.slug}.html", render_html(race_name, page))
+
+    def publish_race(self, race_id: int, force: bool = False) -> Dict:
+        """Publish a race, rewriting only pages that changed."""
+        started = time.perf_counter()
+        race = race_manager.get_race_by_id(race_id)
+        if race is None:
+            raise ValueError(f"Race {race_id} not found")
+        if race.archived_at is not None:
+            # The results view only covers live races; republishing would unlink every page
+            raise ValueError(f"Race {race_id} is archived; its published pages are kept as they are")
+
+        pages = build_pages(get_results_rows(race_id))
+        race_dir = self._race_dir(race_id)
+        race_dir.mkdir(parents=True, exist_ok=True)
+
+        previous = {} if force else self._load_manifest(race_dir)
+        digests = {page.slug: page_digest(page) for page in pages}
+        changed = [page for page in pages
+                   if previous.get(page.slug) != digests[page.slug]
+                   or not (race_dir / f"{page.slug}.html").exists()]
+
+        if changed:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                list(pool.map(lambda page: self._write_page(race_dir, race.race_name, page), changed))
+
+        # Categories that no longer have anyone in them
+        removed = [slug for slug in previous if slug not in digests]
+        for slug in removed:
+            for suffix in ('.html', '.json'):
+                (race_dir / f"{slug}{suffix}").unlink(missing_ok=True)
+
+        if changed or removed or force or not (race_dir / 'index.html').exists():
+            write_atomic(race_dir / 'index.html', render_index(race.race_name, pages))
+        write_atomic(race_dir / 'manifest.json', json.dumps({'race_id': race_id, 'pages': digests}, indent=2))
+
+        summary = {
+            'race_id': race_id,
+            'pages': len(pages),
+            'written': len(changed),
+            'removed': len(removed),
+            'seconds': time.perf_counter() - started,
+        }
+        logger.info(f"Published race {race_id}: {summary['written']}/{summary['pages']} pages rewritten")
+        return summary
+
+# Global results publisher
+results_publisher = ResultsPublisher()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Publish static results pages")
+    parser.add_argument('--race', type=int, action='append', default=[], required=True,
+                        help="Race ID (repeatable)")
+    parser.add_argument('--force', action='store_true', help="Rewrite every page")
+    parser.add_argument('--workers', type=int, default=4, help="Parallel page writers (default 4)")
+    parser.add_argument('--output', type=Path, help=f"Output directory (default {RESULTS_DIR})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    publisher = ResultsPublisher(args.output, args.workers)
+    failed = 0
+    for race_id in args.race:
+        try:
+            summary = publisher.publish_race(race_id, force=args.force)
+            print(f"📰 Race {race_id}: {summary['written']} of {summary['pages']} pages written, "
+                  f"{summary['removed']} removed in {summary['seconds']:.2f}s")
+        except Exception as e:
+            failed += 1
+            print(f"❌ Race {race_id}: {e}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🏆 TRMS Results Ranking
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Pure placement calculation for race results. Finishers are ranked by net
+    time within each distance, with gender and gender + age group places
+    computed in the same pass.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, NamedTuple
+
+class Placement(NamedTuple):
+    """Places computed for one race_times row."""
+    time_id: int
+    overall_place: Optional[int]
+    gender_place: Optional[int]
+    age_group_place: Optional[int]
+
+def _sort_key(row: Dict) -> tuple:
+    """Net time first, then who crossed the line first, then row order."""
+    return (row['net_time'], row.get('finish_time') or datetime.max, row['time_id'])
+
+def compute_places(rows: List[Dict]) -> List[Placement]:
+    """Rank race_times rows.
+
+    Each row needs ``time_id``, ``net_time``, ``timing_status``,
+    ``distance``, ``gender`` and ``age_group``. Rows that did not finish
+    get no places.
+    """
+    finishers = [
+        row for row in rows
+        if row['timing_status'] == 'finished' and isinstance(row.get('net_time'), timedelta)
+    ]
+    finishers.sort(key=_sort_key)
+
+    overall: Dict[Optional[str], int] = {}
+    by_gender: Dict[tuple, int] = {}
+    by_age_group: Dict[tuple, int] = {}
+    placements = []
+
+    for row in finishers:
+        distance = row.get('distance')
+        overall[distance] = overall.get(distance, 0) + 1
+
+        gender_place = None
+        age_group_place = None
+        if row.get('gender'):
+            gender_key = (distance, row['gender'])
+            by_gender[gender_key] = by_gender.get(gender_key, 0) + 1
+            gender_place = by_gender[gender_key]
+
+            if row.get('age_group'):
+                age_key = (distance, row['gender'], row['age_group'])
+                by_age_group[age_key] = by_age_group.get(age_key, 0) + 1
+                age_group_place = by_age_group[age_key]
+
+        placements.append(Placement(row['time_id'], overall[distance], gender_place, age_group_place))
+
+    placed = {placement.time_id for placement in placements}
+    placements.extend(Placement(row['time_id'], None, None, None) for row in rows if row['time_id'] not in placed)
+    return placements
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🔁 TRMS Parallel Results Reprocessing
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Recomputes net-time places for races after a start time or wave offset
+    correction, or for a season-end rescore. Races (or distances within a
+    race) are fanned out to a process pool; every worker process opens its
+    own connection pool and writes places back in bulk.
+
+        python3 -m libraries.results.reprocess --race 12 --race 13 --by-category
+        python3 -m libraries.results.reprocess --season 2024 --workers 8
+        python3 -m libraries.results.reprocess --race 12 --start-offset 15 --distance 10K --publish
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, Dict, List, Tuple
+
+from ..database.connection import db_manager
+from ..models.race_time import race_time_manager
+from .publisher import results_publisher
+from .ranking import compute_places
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# (race_id, distance or None for the whole race)
+WorkUnit = Tuple[int, Optional[str]]
+
+def reprocess_unit(race_id: int, distance: Optional[str] = None) -> Dict:
+    """Rank and write back one race or one distance within a race.
+
+    Runs inside a pool worker. Worker processes are spawned, so the module
+    level db_manager here is the worker's own connection pool.
+    """
+    started = time.perf_counter()
+    rows = race_time_manager.get_ranking_rows(race_id, distance)
+    placements = compute_places(rows)
+    race_time_manager.write_placements(race_id, placements)
+
+    return {
+        'race_id': race_id,
+        'distance': distance,
+        'rows': len(rows),
+        'finishers': sum(1 for placement in placements if placement.overall_place),
+        'seconds': time.perf_counter() - started,
+        'pid': os.getpid(),
+    }
+
+def plan_units(race_ids: List[int], by_category: bool = False) -> List[WorkUnit]:
+    """Split races into work units, largest first so the pool stays busy."""
+    if not race_ids:
+        return []
+
+    placeholders = ", ".join(["%s"] * len(race_ids))
+    query = f"""
+        SELECT rt.race_id, p.distance, COUNT(*) AS row_count
+        FROM race_times rt
+        LEFT JOIN participants p ON p.participant_id = rt.participant_id AND p.race_id = rt.race_id
+        WHERE rt.race_id IN ({placeholders})
+        GROUP BY rt.race_id, p.distance
+    """
+    rows = db_manager.execute_query(query, tuple(race_ids))
+
+    sizes: Dict[WorkUnit, int] = {}
+    race_sizes: Dict[int, int] = {}
+    unsplittable = {row['race_id'] for row in rows if row['distance'] is None}
+
+    for row in rows:
+        race_sizes[row['race_id']] = race_sizes.get(row['race_id'], 0) + row['row_count']
+        if by_category and row['race_id'] not in unsplittable:
+            sizes[(row['race_id'], row['distance'])] = row['row_count']
+
+    # Races with runners missing a distance are ranked as a whole
+    for race_id, size in race_sizes.items():
+        if not by_category or race_id in unsplittable:
+            sizes[(race_id, None)] = size
+
+    return sorted(sizes, key=sizes.get, reverse=True)
+
+def get_season_race_ids(season: int) -> List[int]:
+    """Get every race held in a calendar year."""
+    query = "SELECT race_id FROM races WHERE race_date BETWEEN %s AND %s ORDER BY race_date"
+    rows = db_manager.execute_query(query, (f"{season}-01-01", f"{season}-12-31"))
+    return [row['race_id'] for row in rows]
+
+def reprocess(race_ids: List[int], by_category: bool = False, workers: Optional[int] = None,
+              progress: bool = True) -> Dict:
+    """Reprocess results for races across a process pool."""
+    started = time.perf_counter()
+    units = plan_units(race_ids, by_category)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(units) or 1))
+    results = []
+    failures = []
+
+    logger.info(f"Reprocessing {len(race_ids)} races as {len(units)} units on {workers} workers")
+
+    # Spawned workers import TRDS fresh and build their own pool instead of
+    # inheriting this process's open MySQL sockets through fork
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = {pool.submit(reprocess_unit, race_id, distance): (race_id, distance)
+                   for race_id, distance in units}
+
+        for done, future in enumerate(as_completed(futures), start=1):
+            race_id, distance = futures[future]
+            label = f"race {race_id}" + (f" {distance}" if distance else "")
+            try:
+                result = future.result()
+                results.append(result)
+                if progress:
+                    print(f"  [{done}/{len(units)}] ✅ {label}: {result['rows']} rows, "
+                          f"{result['finishers']} placed in {result['seconds']:.2f}s")
+            except Exception as e:
+                failures.append((race_id, distance, str(e)))
+                logger.error(f"Reprocessing {label} failed: {e}")
+                if progress:
+                    print(f"  [{done}/{len(units)}] ❌ {label}: {e}")
+
+    return {
+        'races': len(race_ids),
+        'units': len(units),
+        'workers': workers,
+        'rows': sum(result['rows'] for result in results),
+        'failures': failures,
+        'wall_seconds': time.perf_counter() - started,
+        'worker_seconds': sum(result['seconds'] for result in results),
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Recompute race places in parallel")
+    parser.add_argument('--race', type=int, action='append', default=[], help="Race ID (repeatable)")
+    parser.add_argument('--season', type=int, help="Reprocess every race in a calendar year")
+    parser.add_argument('--by-category', action='store_true', help="Split races by distance")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--start-offset', type=int, help="Shift start times of the --race races by N seconds first")
+    parser.add_argument('--distance', help="Limit --start-offset to one distance (wave)")
+    parser.add_argument('--publish', action='store_true', help="Republish changed static results pages")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    # A start correction is for the named races, never a whole season
+    if args.start_offset and args.season:
+        parser.error("--start-offset needs --race, not --season")
+
+    race_ids = list(args.race)
+    if args.season:
+        race_ids.extend(get_season_race_ids(args.season))
+    if not race_ids:
+        parser.error("give at least one --race or a --season")
+
+    if args.start_offset:
+        for race_id in race_ids:
+            shifted = race_time_manager.shift_start_times(race_id, args.start_offset, args.distance)
+            print(f"⏱️ Race {race_id}: shifted {shifted} start times by {args.start_offset}s")
+
+    print(f"\n🔁 Reprocessing {len(race_ids)} race(s)")
+    summary = reprocess(race_ids, by_category=args.by_category, workers=args.workers)
+
+    print("\n" + "="*50)
+    print(f"Units: {summary['units']}  Workers: {summary['workers']}  Rows: {summary['rows']}")
+    print(f"Wall time: {summary['wall_seconds']:.2f}s  (worker time {summary['worker_seconds']:.2f}s)")
+    if summary['failures']:
+        print(f"❌ {len(summary['failures'])} unit(s) failed")
+        return 1
+
+    if args.publish:
+        for race_id in race_ids:
+            published = results_publisher.publish_race(race_id)
+            print(f"📰 Race {race_id}: {published['written']} of {published['pages']} pages republished")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
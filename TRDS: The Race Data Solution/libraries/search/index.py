@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🔎 TRMS Participant Search Index
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    In-memory prefix index over participant names, city and bib across every
+    race, with each runner's result attached. Words are kept in a sorted
+    vocabulary, so a typeahead prefix is a binary search followed by a walk
+    over the matching posting lists that stops as soon as enough hits are
+    found. The index is refreshed incrementally from participants and
+    race_times updated_at and persisted to disk, so processes start from
+    the snapshot instead of rereading the whole history.
+
+        python3 -m libraries.search.index --rebuild
+        python3 -m libraries.search.index --query "smith indy"
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import bisect
+import logging
+import os
+import pickle
+import re
+import sys
+import threading
+import time
+import unicodedata
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, List, NamedTuple, Tuple
+
+from ..database.connection import db_manager
+from ..database.partitions import archive_table, has_archive
+from ..utils.paths import paths
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT = 1
+DEFAULT_INDEX_PATH = paths.get_cache_dir('search') / 'participants.idx'
+
+SEARCH_COLUMNS = """
+    SELECT p.participant_id, p.race_id, r.race_name, r.race_date,
+           p.first_name, p.last_name, p.city, p.state, p.bib_number, p.distance,
+           p.registration_status, rt.net_time, rt.overall_place,
+           GREATEST(p.updated_at, COALESCE(rt.updated_at, p.updated_at)) AS changed_at
+    FROM participants p
+    JOIN races r ON r.race_id = p.race_id
+    LEFT JOIN race_times rt ON rt.participant_id = p.participant_id AND rt.race_id = p.race_id
+"""
+
+# Same columns over archived seasons, so a rebuild keeps their history
+ARCHIVE_SEARCH_COLUMNS = SEARCH_COLUMNS.replace(
+    "FROM participants p", f"FROM {archive_table('participants')} p"
+).replace(
+    "JOIN race_times rt", f"JOIN {archive_table('race_times')} rt"
+)
+
+class SearchHit(NamedTuple):
+    """One participant entry in a race."""
+    participant_id: int
+    race_id: int
+    race_name: str
+    race_date: Optional[str]
+    name: str
+    city: Optional[str]
+    state: Optional[str]
+    bib_number: Optional[str]
+    distance: Optional[str]
+    net_time: Optional[str]
+    overall_place: Optional[int]
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercase, accent-folded words."""
+    if not text:
+        return []
+    folded = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii')
+    return re.findall(r'[a-z0-9]+', folded.lower())
+
+def _hit_from_row(row: Dict) -> SearchHit:
+    """Build a hit from a search query row."""
+    return SearchHit(
+        participant_id=row['participant_id'],
+        race_id=row['race_id'],
+        race_name=row['race_name'],
+        race_date=str(row['race_date']) if row.get('race_date') else None,
+        name=f"{row['first_name']} {row['last_name']}".strip(),
+        city=row.get('city'),
+        state=row.get('state'),
+        bib_number=row.get('bib_number'),
+        distance=row.get('distance'),
+        net_time=str(row['net_time']) if row.get('net_time') is not None else None,
+        overall_place=row.get('overall_place'),
+    )
+
+def _tokens_for(hit: SearchHit) -> Tuple[str, ...]:
+    """Searchable words of a hit."""
+    words = tokenize(hit.name) + tokenize(hit.city) + tokenize(hit.bib_number)
+    return tuple(dict.fromkeys(words))
+
+class SearchIndex:
+    """Cross-race participant and results search."""
+
+    def __init__(self, path: Optional[Path] = None, refresh_seconds: float = 5.0):
+        """Initialize search index."""
+        self.path = Path(path or DEFAULT_INDEX_PATH)
+        self.refresh_seconds = refresh_seconds
+
+        self._lock = threading.RLock()
+        self._refreshed = 0.0
+        self._reset()
+
+    def _reset(self):
+        """Empty the index."""
+        # Doc numbers are positions in _docs; replaced docs leave a None behind
+        self._docs: List[Optional[SearchHit]] = []
+        self._doc_tokens: List[Tuple[str, ...]] = []
+        self._by_participant: Dict[int, int] = {}
+        self._postings: Dict[str, array] = {}
+        self._vocab: List[str] = []
+        self._dead = 0
+        self._race_ids: set = set()
+        self.watermark: Optional[datetime] = None
+
+    def __len__(self) -> int:
+        """Number of live entries."""
+        return len(self._by_participant)
+
+    def _add(self, hit: SearchHit, new_words: Optional[set] = None):
+        """Add or replace one participant's entry."""
+        current = self._by_participant.get(hit.participant_id)
+        if current is not None and self._docs[current] == hit:
+            return
+        self._remove(hit.participant_id)
+
+        doc = len(self._docs)
+        tokens = _tokens_for(hit)
+        self._docs.append(hit)
+        self._doc_tokens.append(tokens)
+        self._by_participant[hit.participant_id] = doc
+
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = array('I')
+                if new_words is not None:
+                    new_words.add(token)
+            posting.append(doc)
+
+    def _remove(self, participant_id: int):
+        """Drop a participant's entry, leaving a tombstone."""
+        doc = self._by_participant.pop(participant_id, None)
+        if doc is not None:
+            self._docs[doc] = None
+            self._dead += 1
+
+    def _apply_rows(self, rows: List[Dict], new_words: Optional[set] = None):
+        """Apply query rows and advance the watermark."""
+        for row in rows:
+            if row['registration_status'] == 'cancelled':
+                self._remove(row['participant_id'])
+            else:
+                self._add(_hit_from_row(row), new_words)
+            if row.get('changed_at') and (self.watermark is None or row['changed_at'] > self.watermark):
+                self.watermark = row['changed_at']
+
+    def rebuild(self):
+        """Build the index from every race, archived ones included, most recent races first."""
+        started = time.perf_counter()
+        live = " WHERE p.registration_status != 'cancelled'"
+        query = SEARCH_COLUMNS + live
+        if has_archive():
+            query += " UNION ALL " + ARCHIVE_SEARCH_COLUMNS + live
+        rows = db_manager.execute_query(query + " ORDER BY race_date DESC, participant_id")
+
+        with self._lock:
+            self._reset()
+            self._apply_rows(rows)
+            self._vocab = sorted(self._postings)
+            self._race_ids = {row['race_id'] for row in rows}
+            self._refreshed = time.monotonic()
+
+        logger.info(f"Search index built: {len(self)} entries, {len(self._vocab)} words "
+                    f"in {time.perf_counter() - started:.2f}s")
+
+    def refresh(self) -> int:
+        """Apply changes since the watermark; returns the number of rows applied."""
+        if self.watermark is None:
+            self.rebuild()
+            return len(self)
+
+        # >= so rows written in the watermark's own second are not missed
+        rows = db_manager.execute_query(
+            SEARCH_COLUMNS + """
+            WHERE p.participant_id IN (
+                SELECT participant_id FROM participants WHERE updated_at >= %s
+                UNION
+                SELECT participant_id FROM race_times WHERE updated_at >= %s AND participant_id IS NOT NULL
+            )
+            """,
+            (self.watermark, self.watermark)
+        )
+        race_ids = {row['race_id'] for row in db_manager.execute_query("SELECT race_id FROM races")}
+
+        with self._lock:
+            new_words: set = set()
+            self._apply_rows(rows, new_words)
+            for word in new_words:
+                bisect.insort(self._vocab, word)
+
+            # RaceManager.delete_race deletes a race's participants along with it
+            deleted = self._race_ids - race_ids
+            if deleted:
+                for participant_id, doc in list(self._by_participant.items()):
+                    if self._docs[doc].race_id in deleted:
+                        self._remove(participant_id)
+            self._race_ids = race_ids
+
+            if self._dead > 1000 and self._dead > len(self._docs) // 4:
+                self._compact()
+            self._refreshed = time.monotonic()
+        return len(rows)
+
+    def maybe_refresh(self):
+        """Refresh at most once per refresh interval."""
+        if time.monotonic() - self._refreshed >= self.refresh_seconds:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Search index refresh failed: {e}")
+                self._refreshed = time.monotonic()
+
+    def _compact(self):
+        """Rebuild postings without tombstones, keeping entry order."""
+        live = [hit for hit in self._docs if hit is not None]
+        watermark, race_ids = self.watermark, self._race_ids
+        self._reset()
+        for hit in live:
+            self._add(hit)
+        self._vocab = sorted(self._postings)
+        self.watermark, self._race_ids = watermark, race_ids
+        logger.info(f"Search index compacted to {len(self)} entries")
+
+    def save(self):
+        """Write the index snapshot to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            state = {
+                'format': INDEX_FORMAT,
+                'watermark': self.watermark,
+                'docs': self._docs,
+                'doc_tokens': self._doc_tokens,
+                'postings': self._postings,
+                'vocab': self._vocab,
+                'dead': self._dead,
+                'race_ids': self._race_ids,
+            }
+            temp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            with open(temp_path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.path)
+        logger.info(f"Search index saved to {self.path}")
+
+    def load(self) -> bool:
+        """Load the snapshot from disk; returns False if there is none usable."""
+        try:
+            with open(self.path, 'rb') as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.info(f"No search index snapshot loaded: {e}")
+            return False
+        if state.get('format') != INDEX_FORMAT:
+            return False
+
+        with self._lock:
+            self._docs = state['docs']
+            self._postings = state['postings']
+            self._vocab = state['vocab']
+            self._dead = state['dead']
+            self._race_ids = state['race_ids']
+            self.watermark = state['watermark']
+            self._doc_tokens = state['doc_tokens']
+            self._by_participant = {hit.participant_id: doc
+                                    for doc, hit in enumerate(self._docs) if hit is not None}
+        return True
+
+    def open(self):
+        """Load the snapshot and catch up, or build from scratch."""
+        if self.load():
+            self.refresh()
+        else:
+            self.rebuild()
+
+    def _prefix_range(self, term: str) -> Tuple[int, int]:
+        """Vocabulary positions of the words starting with term."""
+        start = bisect.bisect_left(self._vocab, term)
+        end = bisect.bisect_left(self._vocab, term + '\x7f', start)
+        return start, end
+
+    def _posting_count(self, start: int, end: int) -> int:
+        """Entries behind a range of vocabulary words."""
+        return sum(len(self._postings[word]) for word in self._vocab[start:end])
+
+    def search(self, query: str, limit: int = 10, race_id: Optional[int] = None) -> List[SearchHit]:
+        """Typeahead search; every query word must prefix one of the entry's words."""
+        terms = set(tokenize(query))
+        if not terms:
+            return []
+
+        hits: List[SearchHit] = []
+        seen = set()
+
+        with self._lock:
+            # Walk the term with the fewest postings; check the others per entry
+            ranges = {term: self._prefix_range(term) for term in terms}
+            driver = next(iter(terms))
+            if len(terms) > 1:
+                driver = min(terms, key=lambda term: self._posting_count(*ranges[term]))
+            others = [term for term in terms if term != driver]
+
+            for word in self._vocab[slice(*ranges[driver])]:
+                for doc in self._postings[word]:
+                    hit = self._docs[doc]
+                    if hit is None or doc in seen:
+                        continue
+                    seen.add(doc)
+                    if race_id is not None and hit.race_id != race_id:
+                        continue
+                    tokens = self._doc_tokens[doc]
+                    if all(any(token.startswith(term) for token in tokens) for term in others):
+                        hits.append(hit)
+                        if len(hits) >= limit:
+                            return hits
+        return hits
+
+    def get_stats(self) -> Dict:
+        """Get index statistics."""
+        return {
+            'entries': len(self),
+            'words': len(self._vocab),
+            'tombstones': self._dead,
+            'watermark': str(self.watermark) if self.watermark else None,
+        }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Build or query the participant search index")
+    parser.add_argument('--rebuild', action='store_true', help="Rebuild from the database")
+    parser.add_argument('--query', help="Run a typeahead query")
+    parser.add_argument('--limit', type=int, default=10, help="Maximum hits (default 10)")
+    parser.add_argument('--path', type=Path, help=f"Index file (default {DEFAULT_INDEX_PATH})")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    index = SearchIndex(args.path)
+    if args.rebuild:
+        index.rebuild()
+    else:
+        index.open()
+    index.save()
+    print(f"🔎 {index.get_stats()}")
+
+    if args.query:
+        started = time.perf_counter()
+        hits = index.search(args.query, args.limit)
+        elapsed = (time.perf_counter() - started) * 1000
+        for hit in hits:
+            print(f"  {hit.name:<30} #{hit.bib_number or '-':<6} {hit.race_date} {hit.race_name}"
+                  f"  {hit.net_time or ''}")
+        print(f"{len(hits)} hits in {elapsed:.2f} ms")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🎤 TRMS Announcer Lookup Service
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    In-memory snapshot of a race field for the pre-finish announcer timing
+    point. Bib and RFID reads are answered from dictionaries instead of a
+    per-runner query, and the snapshot is refreshed incrementally using the
+    updated_at watermarks on participants and race_times.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import logging
+import threading
+from datetime import datetime
+from typing import Optional, Dict, List
+from pydantic import BaseModel, Field
+
+from ..database.connection import db_manager
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+class AnnouncerEntry(BaseModel):
+    """Announcer view of a single runner."""
+    participant_id: int = Field(..., description="Participant ID")
+    first_name: str = Field(..., description="First name")
+    last_name: str = Field(..., description="Last name")
+    city: Optional[str] = Field(None, description="Hometown city")
+    state: Optional[str] = Field(None, description="Hometown state")
+    gender: Optional[str] = Field(None, description="Gender")
+    age_group: Optional[str] = Field(None, description="Age group label")
+    distance: Optional[str] = Field(None, description="Distance")
+    bib_number: Optional[str] = Field(None, description="Bib number")
+    rfid_tag: Optional[str] = Field(None, description="RFID tag")
+
+    # Live placement
+    overall_place: Optional[int] = Field(None, description="Overall place")
+    gender_place: Optional[int] = Field(None, description="Gender place")
+    age_group_place: Optional[int] = Field(None, description="Age group place")
+    timing_status: Optional[str] = Field(None, description="Timing status")
+
+    @property
+    def full_name(self) -> str:
+        """Runner name as it should be announced."""
+        return f"{self.first_name} {self.last_name}"
+
+    @property
+    def hometown(self) -> Optional[str]:
+        """City and state joined for the call-out."""
+        parts = [part for part in (self.city, self.state) if part]
+        return ", ".join(parts) if parts else None
+
+def ordinal(number: int) -> str:
+    """Format a place as 1st, 2nd, 3rd, 4th..."""
+    if 10 <= number % 100 <= 20:
+        suffix = 'th'
+    else:
+        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(number % 10, 'th')
+    return f"{number}{suffix}"
+
+def normalize_rfid(tag: Optional[str]) -> Optional[str]:
+    """Normalize an RFID tag so reader output and roster values match."""
+    if not tag:
+        return None
+    return tag.strip().upper()
+
+class AnnouncerService:
+    """Preloaded bib/RFID lookup service for one race."""
+
+    PARTICIPANT_COLUMNS = """
+        p.participant_id, p.first_name, p.last_name, p.city, p.state,
+        p.gender, p.age_group, p.distance, p.bib_number, p.rfid_tag
+    """
+
+    def __init__(self, race_id: int):
+        """Initialize announcer service for a race."""
+        self.race_id = race_id
+        self._lock = threading.Lock()
+        self._entries: Dict[int, AnnouncerEntry] = {}
+        self._by_bib: Dict[str, int] = {}
+        self._by_rfid: Dict[str, int] = {}
+        self._participants_watermark: Optional[datetime] = None
+        self._times_watermark: Optional[datetime] = None
+        self.loaded = False
+
+    def load(self) -> int:
+        """Load the full field and current places in one query."""
+        query = f"""
+            SELECT {self.PARTICIPANT_COLUMNS},
+                   p.updated_at AS participant_updated_at,
+                   rt.overall_place, rt.gender_place, rt.age_group_place,
+                   rt.timing_status, rt.updated_at AS time_updated_at
+            FROM participants p
+            LEFT JOIN race_times rt ON rt.participant_id = p.participant_id AND rt.race_id = p.race_id
+            WHERE p.race_id = %s AND p.registration_status != 'cancelled'
+        """
+
+        rows = db_manager.execute_query(query, (self.race_id,))
+
+        entries = {}
+        by_bib = {}
+        by_rfid = {}
+        participants_watermark = None
+        times_watermark = None
+
+        for row in rows:
+            entry = AnnouncerEntry(**row)
+            entries[entry.participant_id] = entry
+            if entry.bib_number:
+                by_bib[entry.bib_number.strip()] = entry.participant_id
+            rfid = normalize_rfid(entry.rfid_tag)
+            if rfid:
+                by_rfid[rfid] = entry.participant_id
+
+            participants_watermark = self._max_time(participants_watermark, row['participant_updated_at'])
+            times_watermark = self._max_time(times_watermark, row['time_updated_at'])
+
+        # Swap in the new snapshot so readers never see a half-built index
+        with self._lock:
+            self._entries = entries
+            self._by_bib = by_bib
+            self._by_rfid = by_rfid
+            self._participants_watermark = participants_watermark
+            self._times_watermark = times_watermark
+            self.loaded = True
+
+        logger.info(f"Announcer snapshot loaded for race {self.race_id}: {len(entries)} runners")
+        return len(entries)
+
+    def refresh(self) -> int:
+        """Apply participant and placement changes since the last refresh."""
+        if not self.loaded:
+            return self.load()
+
+        changed = self._refresh_participants() + self._refresh_places()
+        if changed:
+            logger.debug(f"Announcer refresh for race {self.race_id}: {changed} changes")
+        return changed
+
+    def _refresh_participants(self) -> int:
+        """Pick up new, edited or cancelled registrations."""
+        query = f"""
+            SELECT {self.PARTICIPANT_COLUMNS}, p.registration_status, p.updated_at
+            FROM participants p
+            WHERE p.race_id = %s AND p.updated_at >= %s
+        """
+
+        watermark = self._participants_watermark or datetime.min
+        rows = db_manager.execute_query(query, (self.race_id, watermark))
+
+        with self._lock:
+            for row in rows:
+                participant_id = row['participant_id']
+                current = self._entries.get(participant_id)
+                self._unindex(current)
+
+                if row['registration_status'] == 'cancelled':
+                    self._entries.pop(participant_id, None)
+                else:
+                    places = current.dict(include={'overall_place', 'gender_place',
+                                                   'age_group_place', 'timing_status'}) if current else {}
+                    entry = AnnouncerEntry(**{**row, **places})
+                    self._entries[participant_id] = entry
+                    self._index(entry)
+
+                self._participants_watermark = self._max_time(self._participants_watermark, row['updated_at'])
+
+        return len(rows)
+
+    def _refresh_places(self) -> int:
+        """Pick up placement changes written by the timing system."""
+        query = """
+            SELECT participant_id, overall_place, gender_place, age_group_place,
+                   timing_status, updated_at
+            FROM race_times
+            WHERE race_id = %s AND updated_at >= %s AND participant_id IS NOT NULL
+        """
+
+        watermark = self._times_watermark or datetime.min
+        rows = db_manager.execute_query(query, (self.race_id, watermark))
+
+        for row in rows:
+            self.update_places(
+                row['participant_id'],
+                overall_place=row['overall_place'],
+                gender_place=row['gender_place'],
+                age_group_place=row['age_group_place'],
+                timing_status=row['timing_status']
+            )
+            with self._lock:
+                self._times_watermark = self._max_time(self._times_watermark, row['updated_at'])
+
+        return len(rows)
+
+    def update_places(self, participant_id: int, **places) -> bool:
+        """Push live places straight from the timing pipeline."""
+        with self._lock:
+            current = self._entries.get(participant_id)
+            if not current:
+                return False
+            self._entries[participant_id] = current.copy(update=places)
+            return True
+
+    def lookup_bib(self, bib_number: str) -> Optional[AnnouncerEntry]:
+        """Look up a runner by bib number."""
+        participant_id = self._by_bib.get(str(bib_number).strip())
+        return self._entries.get(participant_id) if participant_id else None
+
+    def lookup_rfid(self, rfid_tag: str) -> Optional[AnnouncerEntry]:
+        """Look up a runner by RFID chip read."""
+        participant_id = self._by_rfid.get(normalize_rfid(rfid_tag))
+        return self._entries.get(participant_id) if participant_id else None
+
+    def get_all_entries(self) -> List[AnnouncerEntry]:
+        """Get every runner in the snapshot."""
+        return list(self._entries.values())
+
+    def format_callout(self, entry: AnnouncerEntry) -> str:
+        """Build the announcer call-out for a runner."""
+        callout = entry.full_name
+        if entry.hometown:
+            callout += f" from {entry.hometown}"
+        if entry.age_group_place and entry.age_group:
+            callout += f", {ordinal(entry.age_group_place)} in the {entry.age_group} age group"
+        elif entry.age_group_place:
+            callout += f", {ordinal(entry.age_group_place)} in age group"
+        elif entry.overall_place:
+            callout += f", {ordinal(entry.overall_place)} overall"
+        return callout
+
+    def _index(self, entry: AnnouncerEntry):
+        """Add an entry to the bib and RFID indexes."""
+        if entry.bib_number:
+            self._by_bib[entry.bib_number.strip()] = entry.participant_id
+        rfid = normalize_rfid(entry.rfid_tag)
+        if rfid:
+            self._by_rfid[rfid] = entry.participant_id
+
+    def _unindex(self, entry: Optional[AnnouncerEntry]):
+        """Remove an entry from the bib and RFID indexes."""
+        if not entry:
+            return
+        if entry.bib_number:
+            self._by_bib.pop(entry.bib_number.strip(), None)
+        rfid = normalize_rfid(entry.rfid_tag)
+        if rfid:
+            self._by_rfid.pop(rfid, None)
+
+    @staticmethod
+    def _max_time(current: Optional[datetime], candidate: Optional[datetime]) -> Optional[datetime]:
+        """Advance a watermark."""
+        if candidate is None:
+            return current
+        if current is None or candidate > current:
+            return candidate
+        return current
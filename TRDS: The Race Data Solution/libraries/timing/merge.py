@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🔀 TRMS Timing Stream Merger
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Streaming k-way merge of per-timing-point read streams (start mats,
+    mid-course splits, finish) into one globally ordered race event stream.
+    Each stream passes through a bounded reorder buffer so late packets are
+    put back in order, and the merged stream feeds splits, placement and the
+    live feed in a single pass.
+
+    A merge can only emit a read once every stream has moved past it, so a
+    live stream that goes quiet (the start mat after the gun) must say so:
+    it yields a Heartbeat carrying its clock instead of blocking.
+    queue_reads() wraps a reader queue that way, sending a heartbeat after
+    each idle interval.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import heapq
+import logging
+import queue
+from abc import ABC, abstractmethod
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Iterable, Iterator, Callable, NamedTuple, Union
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+START_POINT = "start"
+FINISH_POINT = "finish"
+
+class TimingRead(NamedTuple):
+    """Single chip or bib read from a timing point."""
+    read_time: datetime
+    point: str
+    rfid_tag: Optional[str] = None
+    bib_number: Optional[str] = None
+    reader_id: Optional[str] = None
+
+    @property
+    def key(self) -> str:
+        """Identifier of the runner that was read."""
+        return self.rfid_tag or self.bib_number or ""
+
+class Heartbeat(NamedTuple):
+    """A stream's promise that it has no more reads before ``read_time``."""
+    read_time: datetime
+    point: str
+
+StreamItem = Union[TimingRead, Heartbeat]
+
+def queue_reads(reads: "queue.Queue", point: str, idle: timedelta = timedelta(seconds=1),
+                clock: Callable[[], datetime] = datetime.now) -> Iterator[StreamItem]:
+    """Turn a live reader queue into a merge stream; ``None`` on the queue ends it.
+
+    When no read arrives for ``idle`` the stream yields a heartbeat at the
+    current clock, so an idle timing point never holds back the others.
+    """
+    while True:
+        try:
+            read = reads.get(timeout=idle.total_seconds())
+        except queue.Empty:
+            yield Heartbeat(clock(), point)
+            continue
+        if read is None:
+            return
+        yield read
+
+def reorder(reads: Iterable[StreamItem], window: timedelta, max_buffer: int = 1024,
+            on_late: Optional[Callable[[TimingRead], None]] = None) -> Iterator[StreamItem]:
+    """Put a nearly ordered stream back in order using a bounded buffer.
+
+    A read is held until the stream has moved ``window`` past it or the
+    buffer is full. Reads older than something already emitted are too late
+    to place and go to ``on_late`` instead. A heartbeat advances the stream
+    like a read and is passed on, moved back by ``window``, once the reads
+    before it have been emitted.
+    """
+    buffer: List[tuple] = []
+    sequence = 0
+    newest: Optional[datetime] = None
+    last_emitted: Optional[datetime] = None
+
+    for read in reads:
+        if isinstance(read, Heartbeat):
+            if newest is None or read.read_time > newest:
+                newest = read.read_time
+            while buffer and (len(buffer) > max_buffer or buffer[0][0] <= newest - window):
+                last_emitted, _, ready = heapq.heappop(buffer)
+                yield ready
+            # Reads older than the heartbeat are late from now on
+            settled = newest - window
+            if last_emitted is None or settled > last_emitted:
+                last_emitted = settled
+                yield Heartbeat(settled, read.point)
+            continue
+
+        if last_emitted is not None and read.read_time < last_emitted:
+            if on_late:
+                on_late(read)
+            else:
+                logger.warning(f"Dropping late read {read.key} at {read.point} ({read.read_time})")
+            continue
+
+        # Sequence number keeps equal timestamps in arrival order
+        heapq.heappush(buffer, (read.read_time, sequence, read))
+        sequence += 1
+        if newest is None or read.read_time > newest:
+            newest = read.read_time
+
+        while buffer and (len(buffer) > max_buffer or buffer[0][0] <= newest - window):
+            last_emitted, _, ready = heapq.heappop(buffer)
+            yield ready
+
+    while buffer:
+        last_emitted, _, ready = heapq.heappop(buffer)
+        yield ready
+
+class TimingStreamMerger:
+    """Heap-merge N per-point read streams into one ordered event stream."""
+
+    def __init__(self, streams: Dict[str, Iterable[StreamItem]],
+                 window: timedelta = timedelta(seconds=2), max_buffer: int = 1024,
+                 dedupe: bool = True, dedupe_window: timedelta = timedelta(minutes=2)):
+        """Initialize merger with one read stream per timing point.
+
+        Repeat reads of a chip at a point within ``dedupe_window`` of its
+        first read are dropped; older crossings are forgotten, so memory
+        stays bounded over a long race.
+        """
+        self.streams = streams
+        self.window = window
+        self.max_buffer = max_buffer
+        self.dedupe = dedupe
+        self.dedupe_window = dedupe_window
+        self.late_reads: List[TimingRead] = []
+        self.duplicate_count = 0
+        self.event_count = 0
+
+    def events(self) -> Iterator[TimingRead]:
+        """Yield reads from all points in global time order."""
+        ordered = [
+            reorder(stream, self.window, self.max_buffer, self.late_reads.append)
+            for stream in self.streams.values()
+        ]
+
+        # Readers report each chip many times per crossing; the first read counts
+        seen: Dict[tuple, datetime] = {}
+        expiry: deque = deque()
+        for read in heapq.merge(*ordered, key=lambda r: r.read_time):
+            if isinstance(read, Heartbeat):
+                continue
+            if self.dedupe:
+                # Events arrive in time order, so the oldest crossings are at the front
+                horizon = read.read_time - self.dedupe_window
+                while expiry and expiry[0][0] < horizon:
+                    _, old = expiry.popleft()
+                    seen.pop(old, None)
+
+                crossing = (read.point, read.key)
+                if crossing in seen:
+                    self.duplicate_count += 1
+                    continue
+                seen[crossing] = read.read_time
+                expiry.append((read.read_time, crossing))
+            self.event_count += 1
+            yield read
+
+    def run(self, sinks: List["TimingSink"]) -> int:
+        """Feed every merged event to each sink in a single pass."""
+        for read in self.events():
+            for sink in sinks:
+                sink.handle(read)
+
+        if self.late_reads:
+            logger.warning(f"{len(self.late_reads)} reads arrived outside the reorder window")
+        return self.event_count
+
+class TimingSink(ABC):
+    """Consumer of the merged race event stream."""
+
+    @abstractmethod
+    def handle(self, read: TimingRead):
+        """Process one merged read."""
+
+class SplitTracker(TimingSink):
+    """Collect start, split and finish times per runner."""
+
+    def __init__(self):
+        """Initialize split tracker."""
+        self.crossings: Dict[str, Dict[str, datetime]] = {}
+
+    def handle(self, read: TimingRead):
+        """Record the first crossing of each point."""
+        self.crossings.setdefault(read.key, {}).setdefault(read.point, read.read_time)
+
+    def get_splits(self, key: str) -> Dict[str, timedelta]:
+        """Elapsed time from the start mat to each later point."""
+        crossings = self.crossings.get(key, {})
+        start = crossings.get(START_POINT)
+        if start is None:
+            return {}
+        return {point: when - start for point, when in crossings.items() if point != START_POINT}
+
+class PlacementTracker(TimingSink):
+    """Assign live overall, gender and age-group places at the finish."""
+
+    def __init__(self, lookup: Callable[[str], Optional[object]],
+                 on_place: Optional[Callable[[object, Dict[str, int]], None]] = None):
+        """Initialize placement tracker.
+
+        ``lookup`` maps a read key to a runner record with ``gender``,
+        ``age_group`` and ``participant_id`` attributes, such as
+        ``AnnouncerService.lookup_rfid``.
+        """
+        self.lookup = lookup
+        self.on_place = on_place
+        self.overall = 0
+        self.gender_counts: Dict[str, int] = {}
+        self.age_group_counts: Dict[tuple, int] = {}
+        self.places: Dict[str, Dict[str, int]] = {}
+
+    def handle(self, read: TimingRead):
+        """Place runners in finish-crossing order."""
+        if read.point != FINISH_POINT or read.key in self.places:
+            return
+
+        runner = self.lookup(read.key)
+        self.overall += 1
+        places = {'overall_place': self.overall}
+
+        if runner is not None and getattr(runner, 'gender', None):
+            gender = runner.gender
+            self.gender_counts[gender] = self.gender_counts.get(gender, 0) + 1
+            places['gender_place'] = self.gender_counts[gender]
+
+            age_group = getattr(runner, 'age_group', None)
+            if age_group:
+                bucket = (gender, age_group)
+                self.age_group_counts[bucket] = self.age_group_counts.get(bucket, 0) + 1
+                places['age_group_place'] = self.age_group_counts[bucket]
+
+        self.places[read.key] = places
+        if self.on_place and runner is not None:
+            self.on_place(runner, places)
+
+class LiveFeed(TimingSink):
+    """Recent-events buffer and subscriber fan-out for the live results feed."""
+
+    def __init__(self, max_events: int = 500):
+        """Initialize live feed."""
+        self.recent = deque(maxlen=max_events)
+        self.subscribers: List[Callable[[TimingRead], None]] = []
+
+    def subscribe(self, callback: Callable[[TimingRead], None]):
+        """Register a callback for every merged event."""
+        self.subscribers.append(callback)
+
+    def handle(self, read: TimingRead):
+        """Publish a merged read."""
+        self.recent.append(read)
+        for callback in self.subscribers:
+            try:
+                callback(read)
+            except Exception as e:
+                logger.error(f"Live feed subscriber failed: {e}")
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🏃 TRMS Race-Day Simulator
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Synthetic race-day load generator and end-to-end benchmark. Builds a
+    field from the databases/imports CSV layouts, emits start and finish
+    chip reads with a realistic finish-time distribution and burst profile,
+    drives them through the merge → placement → race_times write path and
+    reports reads/sec, ingest-to-results latency and database load.
+
+    Run against a local (or disposable) database only:
+
+        DB_NAME=trms_sim python3 -m libraries.timing.simulator --runners 10000
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import argparse
+import csv
+import logging
+import math
+import random
+import sys
+import threading
+import time
+from datetime import datetime, date, timedelta
+from pathlib import Path
+from typing import Optional, Dict, List
+
+from ..database.connection import db_manager
+from ..models.race import Race, race_manager
+from ..models.participant import Participant, participant_manager
+from ..utils.paths import TRDS_DIR
+from .announcer import AnnouncerService
+from .merge import TimingRead, TimingStreamMerger, PlacementTracker, START_POINT, FINISH_POINT
+from .writer import TimingWriter
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+IMPORTS_DIR = TRDS_DIR / 'databases' / 'imports'
+
+# Median net time and spread (log-normal sigma) per distance
+FINISH_PROFILES = {
+    '5K': (timedelta(minutes=31), 0.22, timedelta(minutes=14)),
+    '10K': (timedelta(minutes=62), 0.20, timedelta(minutes=29)),
+    'Half': (timedelta(minutes=130), 0.18, timedelta(minutes=62)),
+}
+
+# MySQL counters sampled before and after a run
+DB_STATUS_VARIABLES = (
+    'Questions', 'Com_insert', 'Com_select', 'Innodb_rows_inserted',
+    'Innodb_rows_updated', 'Innodb_data_writes', 'Threads_running'
+)
+
+class LatencyRecorder:
+    """Thread-safe collector of ingest-to-commit latencies."""
+
+    def __init__(self):
+        """Initialize latency recorder."""
+        self._lock = threading.Lock()
+        self.latencies: List[float] = []
+        self.commit_seconds: Dict[int, int] = {}
+        self.started = time.perf_counter()
+
+    def on_commit(self, ingested: List[float]):
+        """Record one committed batch."""
+        now = time.perf_counter()
+        with self._lock:
+            self.latencies.extend(now - when for when in ingested)
+            second = int(now - self.started)
+            self.commit_seconds[second] = self.commit_seconds.get(second, 0) + len(ingested)
+
+    def percentile(self, pct: float) -> float:
+        """Latency percentile in seconds."""
+        with self._lock:
+            ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    @property
+    def peak_per_second(self) -> int:
+        """Highest number of reads committed in any one second."""
+        return max(self.commit_seconds.values(), default=0)
+
+class RaceDaySimulator:
+    """Synthetic field and chip read generator for load testing."""
+
+    def __init__(self, runners: int = 10000, distance: str = '5K', seed_csv: Optional[Path] = None,
+                 speed: float = 20.0, reads_per_crossing: int = 3, late_fraction: float = 0.02,
+                 batch_size: int = 200, random_seed: Optional[int] = None):
+        """Initialize simulator."""
+        self.runners = runners
+        self.distance = distance
+        self.seed_csv = seed_csv or IMPORTS_DIR / 'road_runners.csv'
+        self.speed = speed
+        self.reads_per_crossing = reads_per_crossing
+        self.late_fraction = late_fraction
+        self.batch_size = batch_size
+        self.rng = random.Random(random_seed)
+        self.race_id: Optional[int] = None
+
+    def generate_field(self, race_id: int) -> List[Participant]:
+        """Build a synthetic field from a seed roster CSV."""
+        with open(self.seed_csv, newline='') as f:
+            seed_rows = list(csv.DictReader(f))
+        if not seed_rows:
+            raise ValueError(f"Seed roster {self.seed_csv} is empty")
+
+        field = []
+        for number in range(1, self.runners + 1):
+            row = self.rng.choice(seed_rows)
+            first_name, _, last_name = row['name'].strip().partition(' ')
+            participant = Participant(
+                race_id=race_id,
+                first_name=first_name,
+                last_name=f"{last_name}-{number}",
+                gender=self.rng.choice(('M', 'F')),
+                distance=self.distance,
+                bib_number=str(number),
+                rfid_tag=f"SIM{number:06d}",
+                registration_status='confirmed'
+            )
+
+            if row.get('dob'):
+                participant.date_of_birth = datetime.strptime(row['dob'], '%Y-%m-%d').date()
+            elif row.get('age'):
+                participant.age_on_race_day = int(row['age'])
+            else:
+                participant.age_on_race_day = self.rng.randint(12, 75)
+
+            field.append(participant)
+        return field
+
+    def generate_reads(self, rfid_tags: List[str], gun_time: datetime) -> Dict[str, List[TimingRead]]:
+        """Generate start and finish read streams for the field."""
+        median, sigma, fastest = FINISH_PROFILES.get(self.distance, FINISH_PROFILES['5K'])
+        start_reads = []
+        finish_reads = []
+
+        for tag in rfid_tags:
+            # Big fields take minutes to cross the start mat, front-loaded
+            start = gun_time + timedelta(seconds=self.rng.expovariate(1 / 45.0))
+            net = max(fastest, median * math.exp(self.rng.gauss(0, sigma)))
+            finish = start + net
+
+            for point, when, reads in ((START_POINT, start, start_reads), (FINISH_POINT, finish, finish_reads)):
+                for repeat in range(self.reads_per_crossing):
+                    reads.append(TimingRead(when + timedelta(milliseconds=repeat * 150), point, tag))
+
+        streams = {}
+        for point, reads in ((START_POINT, start_reads), (FINISH_POINT, finish_reads)):
+            reads.sort(key=lambda r: r.read_time)
+            streams[point] = self._jitter(reads)
+        return streams
+
+    def _jitter(self, reads: List[TimingRead]) -> List[TimingRead]:
+        """Swap neighbouring reads to mimic packets arriving out of order."""
+        jittered = list(reads)
+        for index in range(len(jittered) - 1):
+            if self.rng.random() < self.late_fraction:
+                jittered[index], jittered[index + 1] = jittered[index + 1], jittered[index]
+        return jittered
+
+    def paced(self, events, idle_skip: timedelta = timedelta(seconds=5)):
+        """Release merged events at race pace scaled by ``speed``."""
+        if self.speed <= 0:
+            yield from events
+            return
+
+        wall_start = time.perf_counter()
+        race_start = None
+        skipped = timedelta()
+        previous = None
+
+        for read in events:
+            if race_start is None:
+                race_start = read.read_time
+            # Nothing happens between the start surge and the first finishers
+            if previous is not None and read.read_time - previous > idle_skip:
+                skipped += read.read_time - previous - idle_skip
+            previous = read.read_time
+
+            due = wall_start + (read.read_time - race_start - skipped).total_seconds() / self.speed
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            yield read
+
+    def setup_race(self) -> int:
+        """Create the simulated race and import its field."""
+        race = Race(
+            race_name=f"TRMS Simulator {self.distance} ({self.runners} runners)",
+            race_description="Synthetic race created by the TRDS race-day simulator",
+            race_date=date.today(),
+            race_distances=self.distance,
+            chip_timing=True,
+            timing_method="rfid"
+        )
+        race_id = race_manager.create_race(race)
+        if not race_id:
+            raise RuntimeError("Could not create simulated race")
+
+        self.race_id = race_id
+        imported = participant_manager.import_participants(race_id, self.generate_field(race_id))
+        logger.info(f"Simulated race {race_id} created with {imported} participants")
+        return race_id
+
+    def run(self) -> Dict:
+        """Run the simulation end to end and return the report."""
+        race_id = self.race_id or self.setup_race()
+
+        announcer = AnnouncerService(race_id)
+        announcer.load()
+        tags = [entry.rfid_tag for entry in announcer.get_all_entries() if entry.rfid_tag]
+
+        gun_time = datetime.combine(date.today(), datetime.min.time()) + timedelta(hours=8)
+        streams = self.generate_reads(tags, gun_time)
+        total_reads = sum(len(reads) for reads in streams.values())
+
+        recorder = LatencyRecorder()
+        merger = TimingStreamMerger({point: iter(reads) for point, reads in streams.items()})
+        placement = PlacementTracker(
+            announcer.lookup_rfid,
+            on_place=lambda runner, places: announcer.update_places(runner.participant_id, **places)
+        )
+        writer = TimingWriter(race_id, announcer.lookup_rfid, placement=placement,
+                              batch_size=self.batch_size, on_commit=recorder.on_commit)
+
+        status_before = self.sample_db_status()
+        started = time.perf_counter()
+
+        for read in self.paced(merger.events()):
+            placement.handle(read)
+            writer.handle(read)
+
+        unwritten = writer.close()
+        elapsed = time.perf_counter() - started
+        status_after = self.sample_db_status()
+
+        return {
+            'race_id': race_id,
+            'runners': len(tags),
+            'reads_generated': total_reads,
+            'reads_merged': merger.event_count,
+            'duplicates_dropped': merger.duplicate_count,
+            'late_reads': len(merger.late_reads),
+            'rows_written': writer.written,
+            'failed_batches': writer.failed_batches,
+            'unwritten_reads': len(unwritten),
+            'elapsed_seconds': round(elapsed, 3),
+            'reads_per_second': round(total_reads / elapsed, 1) if elapsed else 0.0,
+            'writes_per_second': round(writer.written / elapsed, 1) if elapsed else 0.0,
+            'peak_writes_per_second': recorder.peak_per_second,
+            'latency_p50_ms': round(recorder.percentile(50) * 1000, 2),
+            'latency_p99_ms': round(recorder.percentile(99) * 1000, 2),
+            'db_load': {
+                name: status_after.get(name, 0) - status_before.get(name, 0)
+                for name in DB_STATUS_VARIABLES if name != 'Threads_running'
+            },
+            'db_threads_running': status_after.get('Threads_running', 0),
+        }
+
+    def cleanup(self):
+        """Delete the simulated race and everything attached to it."""
+        if self.race_id:
+            race_manager.delete_race(self.race_id)
+            logger.info(f"Simulated race {self.race_id} removed")
+
+    @staticmethod
+    def sample_db_status() -> Dict[str, int]:
+        """Read MySQL global status counters."""
+        placeholders = ", ".join(["%s"] * len(DB_STATUS_VARIABLES))
+        query = f"SHOW GLOBAL STATUS WHERE Variable_name IN ({placeholders})"
+
+        try:
+            rows = db_manager.execute_query(query, DB_STATUS_VARIABLES)
+            return {row['Variable_name']: int(row['Value']) for row in rows}
+        except Exception as e:
+            logger.warning(f"Could not sample database status: {e}")
+            return {}
+
+def print_report(report: Dict):
+    """Print a simulation report."""
+    print("\n" + "="*60)
+    print("🏃 RACE-DAY SIMULATION REPORT")
+    print("="*60)
+    print(f"Race ID:            {report['race_id']}")
+    print(f"Runners:            {report['runners']}")
+    print(f"Reads generated:    {report['reads_generated']}")
+    print(f"Crossings merged:   {report['reads_merged']} "
+          f"({report['duplicates_dropped']} duplicates, {report['late_reads']} late)")
+    print(f"Rows written:       {report['rows_written']} ({report['failed_batches']} failed batches, "
+          f"{report['unwritten_reads']} reads never written)")
+    print(f"Elapsed:            {report['elapsed_seconds']}s")
+    print(f"Reads/sec:          {report['reads_per_second']}")
+    print(f"Writes/sec:         {report['writes_per_second']} (peak {report['peak_writes_per_second']})")
+    print(f"Latency p50/p99:    {report['latency_p50_ms']} ms / {report['latency_p99_ms']} ms")
+    print("-"*60)
+    print("Database load (delta):")
+    for name, value in report['db_load'].items():
+        print(f"  {name:<22} {value}")
+    print(f"  {'Threads_running':<22} {report['db_threads_running']}")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="TRDS race-day simulator and load benchmark")
+    parser.add_argument('--runners', type=int, default=10000, help="Field size")
+    parser.add_argument('--distance', choices=sorted(FINISH_PROFILES), default='5K')
+    parser.add_argument('--seed-csv', type=Path, help="Roster CSV in the databases/imports layout")
+    parser.add_argument('--speed', type=float, default=20.0, help="Race-time speed-up factor (0 = unthrottled)")
+    parser.add_argument('--reads-per-crossing', type=int, default=3, help="Duplicate chip reads per crossing")
+    parser.add_argument('--batch-size', type=int, default=200, help="Rows per race_times write batch")
+    parser.add_argument('--random-seed', type=int, help="Seed for a reproducible field")
+    parser.add_argument('--keep', action='store_true', help="Keep the simulated race afterwards")
+    parser.add_argument('--allow-cloud', action='store_true', help="Allow running against the cloud database")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if db_manager.is_cloud_connected and not args.allow_cloud:
+        print("❌ Refusing to load-test the CLOUD database. Use a local database or pass --allow-cloud.")
+        return 1
+
+    simulator = RaceDaySimulator(
+        runners=args.runners, distance=args.distance, seed_csv=args.seed_csv,
+        speed=args.speed, reads_per_crossing=args.reads_per_crossing,
+        batch_size=args.batch_size, random_seed=args.random_seed
+    )
+
+    try:
+        simulator.setup_race()
+        print_report(simulator.run())
+    finally:
+        if not args.keep:
+            simulator.cleanup()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
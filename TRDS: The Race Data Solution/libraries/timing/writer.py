@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+💾 TRMS Timing Writer
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Timing sink that persists merged start and finish reads to race_times.
+    Reads are queued and written by a background thread in batches, so the
+    merge loop never waits on the database. A failed batch is retried with
+    backoff; one that still fails is set aside and written again after the
+    next successful batch, and close() returns whatever never made it.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Optional, List, Callable
+
+from ..models.race_time import race_time_manager
+from .merge import TimingSink, TimingRead, PlacementTracker, START_POINT, FINISH_POINT
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Attempts per batch before it is set aside
+WRITE_ATTEMPTS = 4
+
+# Seconds before the first retry; doubled for each further attempt
+RETRY_BASE_SECONDS = 0.25
+
+class TimingWriter(TimingSink):
+    """Batched background writer from the timing pipeline into race_times."""
+
+    def __init__(self, race_id: int, lookup: Callable[[str], Optional[object]],
+                 placement: Optional[PlacementTracker] = None,
+                 batch_size: int = 200, flush_interval: float = 0.25,
+                 on_commit: Optional[Callable[[List[float]], None]] = None,
+                 write_attempts: int = WRITE_ATTEMPTS, retry_base_seconds: float = RETRY_BASE_SECONDS):
+        """Initialize timing writer.
+
+        ``lookup`` maps a read key to a runner record with ``participant_id``
+        and ``bib_number``. When ``placement`` is given, its live places are
+        written with each finish. ``on_commit`` receives the ingest
+        timestamps (time.perf_counter) of every read in a committed batch.
+        """
+        self.race_id = race_id
+        self.lookup = lookup
+        self.placement = placement
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.on_commit = on_commit
+        self.write_attempts = write_attempts
+        self.retry_base_seconds = retry_base_seconds
+
+        self.queue: "queue.Queue" = queue.Queue()
+        self.written = 0
+        self.unknown_reads = 0
+        self.failed_batches = 0
+        # Batches that failed every attempt, oldest first
+        self.dead_letter: List[List[tuple]] = []
+        self._thread = threading.Thread(target=self._run, name="trms-timing-writer", daemon=True)
+        self._thread.start()
+
+    def handle(self, read: TimingRead):
+        """Queue a start or finish read for writing."""
+        if read.point not in (START_POINT, FINISH_POINT):
+            return
+
+        runner = self.lookup(read.key)
+        if runner is None:
+            self.unknown_reads += 1
+            return
+
+        places = {}
+        if read.point == FINISH_POINT and self.placement:
+            places = self.placement.places.get(read.key, {})
+
+        self.queue.put((time.perf_counter(), read, runner, places))
+
+    def close(self, timeout: Optional[float] = None) -> List[TimingRead]:
+        """Flush outstanding reads, stop the writer thread and return reads that were never written."""
+        self.queue.put(None)
+        self._thread.join(timeout)
+
+        unwritten = [read for batch in list(self.dead_letter) for _, read, _, _ in batch]
+        if unwritten:
+            logger.error(f"{len(unwritten)} timing reads for race {self.race_id} were not written")
+        return unwritten
+
+    def _run(self):
+        """Drain the queue in batches until closed."""
+        running = True
+        while running:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+
+            while len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    running = False
+                    break
+                batch.append(item)
+
+            # The database is back; catch up on batches set aside earlier
+            if batch and self._write(batch) and self.dead_letter:
+                self._retry_dead_letter()
+
+        if self.dead_letter:
+            self._retry_dead_letter()
+
+    def _write(self, batch: List[tuple]) -> bool:
+        """Write a batch, retrying with backoff; set it aside if every attempt fails."""
+        for attempt in range(1, self.write_attempts + 1):
+            try:
+                self._commit(batch)
+                return True
+            except Exception as e:
+                logger.error(f"Timing write failed for {len(batch)} reads "
+                             f"(attempt {attempt}/{self.write_attempts}): {e}")
+                if attempt < self.write_attempts:
+                    time.sleep(self.retry_base_seconds * 2 ** (attempt - 1))
+
+        self.failed_batches += 1
+        self.dead_letter.append(batch)
+        return False
+
+    def _retry_dead_letter(self):
+        """Write set-aside batches once each, oldest first, until one fails."""
+        while self.dead_letter:
+            try:
+                self._commit(self.dead_letter[0])
+            except Exception as e:
+                logger.error(f"Timing write still failing with {len(self.dead_letter)} batches set aside: {e}")
+                return
+            self.dead_letter.pop(0)
+
+    def _commit(self, batch: List[tuple]):
+        """Write one batch of starts and finishes; raises if the database write fails."""
+        starts = []
+        finishes = []
+
+        for _, read, runner, places in batch:
+            if read.point == START_POINT:
+                starts.append((runner.participant_id, runner.bib_number, read.read_time))
+            else:
+                finishes.append((
+                    runner.participant_id, runner.bib_number, read.read_time,
+                    places.get('overall_place'), places.get('gender_place'),
+                    places.get('age_group_place')
+                ))
+
+        # Both statements upsert, so writing a batch again is safe
+        if starts:
+            race_time_manager.record_starts(self.race_id, starts)
+        if finishes:
+            race_time_manager.record_finishes(self.race_id, finishes)
+
+        self.written += len(batch)
+        if self.on_commit:
+            self.on_commit([ingested for ingested, _, _, _ in batch])
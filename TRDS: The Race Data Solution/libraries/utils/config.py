@@ -9,6 +9,13 @@
     Centralized configuration for all TRMS solutions with automatic cloud/local
     database switching and Docker support.
 
+    The validated configuration is kept as a binary snapshot under
+    cache/config/, keyed by the YAML file's mtime and size, this module and
+    the environment overrides. Later processes unpickle the snapshot instead
+    of importing yaml, parsing and validating; pydantic schemas are built
+    lazily so a snapshot hit never builds them. Set TRMS_CONFIG_CACHE=0 to
+    bypass the snapshot.
+
 👤 AUTHOR: TRMS Development Team
 📅 CREATED: 2024
 🏷️ VERSION: 1.0.0
@@ -16,16 +23,27 @@
 ═══════════════════════════════════════════════════════════════════════════════
 """
 
+import hashlib
 import os
-import yaml
+import pickle
 from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from pathlib import Path
 
 # Import path resolver
 from .paths import paths, TRMS_BASE, TRDS_DIR
 
-class DatabaseConfig(BaseModel):
+SNAPSHOT_VERSION = 1
+
+# Environment variables applied on top of the config file
+ENV_OVERRIDES = ('DB_HOST', 'CLOUD_DB_HOST', 'DB_NAME', 'DB_PASSWORD',
+                 'SMTP_HOST', 'SMTP_PORT', 'USE_CLOUD_DB', 'TRMS_METRICS')
+
+class ConfigModel(BaseModel):
+    """Base for configuration sections; schemas are built on first validation."""
+    model_config = ConfigDict(defer_build=True)
+
+class DatabaseConfig(ConfigModel):
     """Database configuration with cloud/local support."""
     # Local database settings
     local_host: str = Field(default="localhost", description="Local database host")
@@ -44,6 +62,15 @@ class DatabaseConfig(BaseModel):
     use_cloud: bool = Field(default=False, description="Use cloud database")
     auto_failover: bool = Field(default=True, description="Auto failover to local")
     
+    # Connection pool settings
+    local_pool_size: int = Field(default=5, description="Local connection pool size")
+    cloud_pool_size: int = Field(default=10, description="Cloud connection pool size")
+    reserved_write_connections: int = Field(default=1, description="Pool connections public reads may not use")
+    public_read_timeout: float = Field(default=0.25, description="Seconds a public read waits for a connection")
+    reload_interval: float = Field(default=5.0, description="Seconds between config change checks (0 disables)")
+    slow_query_ms: float = Field(default=500.0, description="Log queries slower than this (0 disables)")
+    slow_query_top: int = Field(default=20, description="Slow query fingerprints shown by default")
+    
     @property
     def host(self) -> str:
         """Get active host based on cloud/local setting."""
@@ -58,11 +85,16 @@ class DatabaseConfig(BaseModel):
         """Get database connection string."""
         return f"mysql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
 
-class WebConfig(BaseModel):
+class WebConfig(ConfigModel):
     """Web server configuration for TRWS."""
     host: str = Field(default="0.0.0.0", description="Web server host")
     port: int = Field(default=8000, description="Web server port")
     workers: int = Field(default=4, description="Number of workers")
+    worker_pool_size: int = Field(default=5, description="Database pool size per worker")
+    shutdown_timeout: float = Field(default=10.0, description="Seconds to drain requests on shutdown")
+    rate_limit_per_second: float = Field(default=5.0, description="Requests per second per client")
+    rate_limit_burst: int = Field(default=20, description="Request burst per client")
+    trust_forwarded_for: bool = Field(default=False, description="Identify clients by X-Forwarded-For")
     debug: bool = Field(default=False, description="Debug mode")
     
     # Docker settings
@@ -73,7 +105,7 @@ class WebConfig(BaseModel):
     trrs_api_url: str = Field(default="/api/trrs", description="TRRS API endpoint")
     trts_api_url: str = Field(default="/api/trts", description="TRTS API endpoint")
 
-class DockerConfig(BaseModel):
+class DockerConfig(ConfigModel):
     """Docker deployment configuration."""
     compose_file: str = Field(default="docker-compose.yml", description="Compose file")
     network_name: str = Field(default="trms-network", description="Docker network")
@@ -86,7 +118,29 @@ class DockerConfig(BaseModel):
     # Volumes
     use_volumes: bool = Field(default=True, description="Use Docker volumes")
     
-class LoggingConfig(BaseModel):
+class EmailConfig(ConfigModel):
+    """Outbound email configuration for TRRS."""
+    smtp_host: str = Field(default="localhost", description="SMTP server host")
+    smtp_port: int = Field(default=25, description="SMTP server port")
+    smtp_user: Optional[str] = Field(default=None, description="SMTP login user")
+    smtp_password: str = Field(default="", description="SMTP login password")
+    use_tls: bool = Field(default=False, description="Upgrade with STARTTLS")
+    from_address: str = Field(default="registration@localhost", description="Sender address")
+    
+    # Dispatcher settings
+    workers: int = Field(default=2, description="Dispatcher worker threads")
+    batch_size: int = Field(default=50, description="Emails claimed per batch")
+    max_attempts: int = Field(default=5, description="Attempts before an email is failed")
+    retry_base_seconds: float = Field(default=30.0, description="First retry delay, doubled per attempt")
+    poll_interval: float = Field(default=2.0, description="Seconds between polls of an empty queue")
+
+class MetricsConfig(ConfigModel):
+    """Timing metrics configuration."""
+    enabled: bool = Field(default=False, description="Collect timing histograms")
+    export_dir: Optional[str] = Field(default=None, description="Directory for .prom files (textfile collector)")
+    export_interval: float = Field(default=15.0, description="Seconds between .prom file writes")
+
+class LoggingConfig(ConfigModel):
     """Logging configuration."""
     level: str = Field(default="INFO", description="Log level")
     format: str = Field(default="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -94,8 +148,12 @@ class LoggingConfig(BaseModel):
     # Log rotation
     max_bytes: int = Field(default=10485760, description="Max log file size (10MB)")
     backup_count: int = Field(default=5, description="Number of backup files")
+    
+    # Output
+    json_format: bool = Field(default=False, description="Write structured JSON lines (structlog)")
+    console: bool = Field(default=True, description="Also log to the console")
 
-class TRMSConfig(BaseModel):
+class TRMSConfig(ConfigModel):
     """Master configuration for TRMS ecosystem."""
     # Environment
     environment: str = Field(default="development", description="Environment name")
@@ -105,7 +163,9 @@ class TRMSConfig(BaseModel):
     database: DatabaseConfig = Field(default_factory=DatabaseConfig)
     web: WebConfig = Field(default_factory=WebConfig)
     docker: DockerConfig = Field(default_factory=DockerConfig)
+    email: EmailConfig = Field(default_factory=EmailConfig)
     logging: LoggingConfig = Field(default_factory=LoggingConfig)
+    metrics: MetricsConfig = Field(default_factory=MetricsConfig)
     
     # Paths (auto-populated)
     trms_base: Path = Field(default_factory=lambda: TRMS_BASE)
@@ -117,19 +177,58 @@ class TRMSConfig(BaseModel):
         config_file = self.trds_dir / 'config' / f'{env}.yaml'
         config_file.parent.mkdir(parents=True, exist_ok=True)
         
+        import yaml
         with open(config_file, 'w') as f:
-            yaml.dump(self.dict(), f, default_flow_style=False)
+            yaml.dump(self.model_dump(mode='json'), f, default_flow_style=False)
 
-def load_config(environment: Optional[str] = None) -> TRMSConfig:
-    """Load configuration from file and environment variables."""
-    # Determine environment
-    if not environment:
-        environment = os.getenv('TRMS_ENV', 'development')
-    
-    # Load from config file
-    config_file = TRDS_DIR / 'config' / f'{environment}.yaml'
-    
+def _snapshot_path(environment: str) -> Path:
+    """Get the snapshot file for an environment."""
+    return paths.get_cache_dir('config') / f'{environment}.snapshot'
+
+def _snapshot_key(environment: str, config_file: Path) -> str:
+    """Fingerprint everything a loaded configuration depends on."""
+    try:
+        stat = config_file.stat()
+        source = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        source = None
+    parts = (
+        SNAPSHOT_VERSION, environment, str(config_file), source,
+        Path(__file__).stat().st_mtime_ns,
+        tuple(os.environ.get(name) for name in ENV_OVERRIDES),
+    )
+    return hashlib.sha256(repr(parts).encode()).hexdigest()
+
+def _read_snapshot(environment: str, key: str) -> Optional[TRMSConfig]:
+    """Return the snapshot if it matches the key."""
+    try:
+        with open(_snapshot_path(environment), 'rb') as f:
+            snapshot_key, snapshot = pickle.load(f)
+    except Exception:
+        return None
+    return snapshot if snapshot_key == key and isinstance(snapshot, TRMSConfig) else None
+
+def _write_snapshot(environment: str, key: str, config: TRMSConfig):
+    """Store a snapshot atomically; readable by the owner only."""
+    snapshot_file = _snapshot_path(environment)
+    tmp_file = snapshot_file.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump((key, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, snapshot_file)
+    except OSError:
+        # A read-only install just runs without the snapshot
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+
+def _build_config(environment: str, config_file: Path) -> TRMSConfig:
+    """Parse and validate the configuration."""
     if config_file.exists():
+        import yaml
         with open(config_file, 'r') as f:
             config_data = yaml.safe_load(f) or {}
         config = TRMSConfig(**config_data)
@@ -141,11 +240,40 @@ def load_config(environment: Optional[str] = None) -> TRMSConfig:
         config.database.local_host = os.environ['DB_HOST']
     if 'CLOUD_DB_HOST' in os.environ:
         config.database.cloud_host = os.environ['CLOUD_DB_HOST']
+    if 'DB_NAME' in os.environ:
+        config.database.database = os.environ['DB_NAME']
     if 'DB_PASSWORD' in os.environ:
         config.database.password = os.environ['DB_PASSWORD']
+    if 'SMTP_HOST' in os.environ:
+        config.email.smtp_host = os.environ['SMTP_HOST']
+    if 'SMTP_PORT' in os.environ:
+        config.email.smtp_port = int(os.environ['SMTP_PORT'])
     if 'USE_CLOUD_DB' in os.environ:
         config.database.use_cloud = os.environ['USE_CLOUD_DB'].lower() == 'true'
+    if 'TRMS_METRICS' in os.environ:
+        config.metrics.enabled = os.environ['TRMS_METRICS'].lower() == 'true'
+    
+    return config
+
+def load_config(environment: Optional[str] = None, use_snapshot: Optional[bool] = None) -> TRMSConfig:
+    """Load configuration from file and environment variables."""
+    # Determine environment
+    if not environment:
+        environment = os.getenv('TRMS_ENV', 'development')
+    if use_snapshot is None:
+        use_snapshot = os.getenv('TRMS_CONFIG_CACHE', '1') != '0'
+    
+    # Load from config file
+    config_file = TRDS_DIR / 'config' / f'{environment}.yaml'
+    
+    if not use_snapshot:
+        return _build_config(environment, config_file)
     
+    key = _snapshot_key(environment, config_file)
+    config = _read_snapshot(environment, key)
+    if config is None:
+        config = _build_config(environment, config_file)
+        _write_snapshot(environment, key, config)
     return config
 
 # Global configuration instance
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+📜 TRMS Logging Setup
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Non-blocking logging for TRMS processes. Loggers only put records on
+    an in-memory queue; a background listener thread formats them and
+    writes to a size-rotated log file (LoggingConfig.max_bytes and
+    backup_count) and the console. With LoggingConfig.json_format the file
+    gets one JSON object per line, rendered by structlog.
+
+        from libraries.utils.log_setup import setup_logging
+        setup_logging('trrs', 'console.log')
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+from .config import config
+from .paths import paths
+
+_listener: Optional[QueueListener] = None
+# Arguments of the last setup_logging call, replayed by reload_logging
+_setup_args: Optional[dict] = None
+
+class _QueueHandler(QueueHandler):
+    """Queue handler that does the least possible work on the logging thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Merge arguments and traceback into the message; skips the stdlib's format and copy."""
+        message = record.getMessage()
+        if record.exc_info:
+            message = f"{message}\n{logging.Formatter().formatException(record.exc_info)}"
+        if record.stack_info:
+            message = f"{message}\n{record.stack_info}"
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = None
+        record.stack_info = None
+        return record
+
+def _json_formatter() -> Optional[logging.Formatter]:
+    """structlog formatter rendering stdlib records as JSON, if structlog is installed."""
+    try:
+        import structlog
+    except ImportError:
+        return None
+
+    return structlog.stdlib.ProcessorFormatter(
+        processor=structlog.processors.JSONRenderer(),
+        foreign_pre_chain=[
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.processors.TimeStamper(fmt='iso', utc=True),
+        ],
+    )
+
+def setup_logging(solution: str = 'system', filename: str = 'app.log', level: Optional[str] = None,
+                  json_format: Optional[bool] = None, console: Optional[bool] = None,
+                  log_path: Optional[Path] = None) -> QueueListener:
+    """Route all logging through a queue to rotating file and console handlers.
+
+    Defaults come from LoggingConfig; the file goes to the solution's log
+    directory unless ``log_path`` is given. Calling it again replaces the
+    previous setup.
+    """
+    global _listener, _setup_args
+    _setup_args = dict(solution=solution, filename=filename, level=level, json_format=json_format,
+                       console=console, log_path=log_path)
+    settings = config.logging
+    level = level or settings.level
+    json_format = settings.json_format if json_format is None else json_format
+    console = settings.console if console is None else console
+
+    log_path = Path(log_path) if log_path else paths.get_log_dir(solution) / filename
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    text_formatter = logging.Formatter(settings.format)
+    file_formatter = text_formatter
+    if json_format:
+        file_formatter = _json_formatter() or text_formatter
+        if file_formatter is text_formatter:
+            logging.getLogger(__name__).warning("structlog is not installed; writing plain text logs")
+
+    file_handler = RotatingFileHandler(log_path, maxBytes=settings.max_bytes,
+                                       backupCount=settings.backup_count, encoding='utf-8')
+    file_handler.setFormatter(file_formatter)
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(text_formatter)
+        handlers.append(console_handler)
+
+    shutdown_logging()
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(level.upper())
+
+    # Process names cost a lookup per record and no TRMS format shows them
+    if '%(process' not in settings.format:
+        logging.logProcesses = False
+        logging.logMultiprocessing = False
+
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+def reload_logging() -> bool:
+    """Rebuild handlers from the current LoggingConfig; False if setup_logging never ran."""
+    if _setup_args is None:
+        return False
+    setup_logging(**_setup_args)
+    return True
+
+def shutdown_logging():
+    """Write out queued records and stop the listener thread."""
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+# Queued records are written before the interpreter exits
+atexit.register(shutdown_logging)
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+📊 TRMS Timing Metrics
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Lightweight spans and timers aggregated in-process into fixed-bucket
+    histograms and exposed in the Prometheus text format, either from the
+    TRWS /metrics endpoint or as a file rewritten periodically for a
+    node_exporter textfile collector. Metrics are off by default; @timed
+    then hands back the undecorated function, so instrumented hot paths
+    cost nothing, and a span costs one attribute check.
+
+        @timed('trds_race_manager_seconds')
+        def get_all_races(self): ...
+
+        with span('trds_results_render_seconds', race='12'):
+            ...
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import functools
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+from .config import config
+
+# Upper bounds in seconds, from sub-millisecond lookups to slow reports
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Cumulative-bucket histogram of durations."""
+
+    __slots__ = ('name', 'labels', 'bounds', 'counts', 'total', 'count', '_lock')
+
+    def __init__(self, name: str, labels: Tuple[Tuple[str, str], ...], bounds: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """Initialize an empty histogram."""
+        self.name = name
+        self.labels = labels
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        """Record one duration."""
+        index = bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += seconds
+            self.count += 1
+
+    def clear(self):
+        """Drop every observation."""
+        with self._lock:
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.total = 0.0
+            self.count = 0
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Consistent copy of (bucket counts, sum, count)."""
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+class MetricsRegistry:
+    """Histograms keyed by name and labels."""
+
+    def __init__(self, enabled: bool = False):
+        """Initialize registry."""
+        self.enabled = enabled
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, **labels: str) -> Histogram:
+        """Get or create a histogram."""
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram(name, key[1]))
+        return histogram
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        """Record a duration if metrics are on."""
+        if self.enabled:
+            self.histogram(name, **labels).observe(seconds)
+
+    def reset(self):
+        """Zero every histogram in place; decorators keep their references."""
+        for histogram in list(self._histograms.values()):
+            histogram.clear()
+
+    def render(self) -> str:
+        """Render every histogram in the Prometheus text format."""
+        lines: List[str] = []
+        seen = set()
+        for histogram in sorted(self._histograms.values(), key=lambda h: (h.name, h.labels)):
+            if histogram.name not in seen:
+                seen.add(histogram.name)
+                lines.append(f"# TYPE {histogram.name} histogram")
+
+            counts, total, count = histogram.snapshot()
+            labels = ",".join(f'{key}="{value}"' for key, value in histogram.labels)
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.bounds, counts):
+                cumulative += bucket_count
+                lines.append(f'{histogram.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{histogram.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{histogram.name}_sum{suffix} {total:.6f}")
+            lines.append(f"{histogram.name}_count{suffix} {count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path):
+        """Write the text format atomically, for a textfile collector."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp_path.write_text(self.render())
+        os.replace(tmp_path, path)
+
+def timed(name: str, **labels: str):
+    """Decorator timing every call into a histogram, labelled with the function name.
+
+    Decided at import time: with metrics disabled the function is returned
+    unwrapped, so turning metrics on needs a restart.
+    """
+    def decorator(func):
+        if not metrics.enabled:
+            return func
+        histogram = metrics.histogram(name, function=func.__name__, **labels)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+@contextmanager
+def span(name: str, **labels: str):
+    """Time a block into a histogram."""
+    if not metrics.enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.histogram(name, **labels).observe(time.perf_counter() - started)
+
+class MetricsFileExporter:
+    """Background thread rewriting a .prom file every interval."""
+
+    def __init__(self, path: Path, interval: float):
+        """Initialize exporter."""
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _run(self):
+        """Write until stopped, and once more on the way out."""
+        while not self._stop.wait(self.interval):
+            try:
+                metrics.write(self.path)
+            except OSError:
+                pass
+        try:
+            metrics.write(self.path)
+        except OSError:
+            pass
+
+    def start(self) -> 'MetricsFileExporter':
+        """Start exporting."""
+        self._thread = threading.Thread(target=self._run, name="trms-metrics-export", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop after a final write."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+def start_file_export(solution: str) -> Optional[MetricsFileExporter]:
+    """Export this process's metrics under MetricsConfig.export_dir, if configured."""
+    settings = config.metrics
+    if not metrics.enabled or not settings.export_dir:
+        return None
+    path = Path(settings.export_dir) / f"{solution}-{os.getpid()}.prom"
+    return MetricsFileExporter(path, settings.export_interval).start()
+
+# Global metrics registry
+metrics = MetricsRegistry(enabled=config.metrics.enabled)
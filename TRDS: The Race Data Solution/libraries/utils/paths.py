@@ -27,6 +27,11 @@ class TRMSPaths:
     @staticmethod
     def find_trms_base() -> Path:
         """Find the TRMS base directory from any location."""
+        return TRMSPaths.locate_trms_base() or Path.cwd() / 'TRMS: The Race Management Solution'
+    
+    @staticmethod
+    def locate_trms_base() -> Optional[Path]:
+        """Search for the TRMS base directory; None if it cannot be found."""
         # Check environment variable first
         if 'TRMS_BASE' in os.environ:
             return Path(os.environ['TRMS_BASE'])
@@ -50,17 +55,22 @@ class TRMSPaths:
             parts = str(cwd).split('TRMS: The Race Management Solution')
             return Path(parts[0]) / 'TRMS: The Race Management Solution'
         
-        # Default fallback
-        return Path.cwd() / 'TRMS: The Race Management Solution'
+        return None
     
     def __init__(self):
         """Initialize paths for TRMS ecosystem."""
-        self.TRMS_BASE = self.find_trms_base()
+        found = self.locate_trms_base()
+        self.TRMS_BASE = found or Path.cwd() / 'TRMS: The Race Management Solution'
         self.TRRS_DIR = self.TRMS_BASE / 'TRRS: The Race Registration Solution'
         self.TRTS_DIR = self.TRMS_BASE / 'TRTS: The Race Timing Solution'
         self.TRWS_DIR = self.TRMS_BASE / 'TRWS: The Race Web Solution'
         self.TRDS_DIR = self.TRMS_BASE / 'TRDS: The Race Data Solution'
         
+        # Processes we spawn inherit a resolved base and skip the search; a
+        # guessed fallback is not exported, so they still search for themselves
+        if found is not None:
+            os.environ.setdefault('TRMS_BASE', str(self.TRMS_BASE))
+        
         # Add libraries to Python path
         lib_path = str(self.TRDS_DIR / 'libraries')
         if lib_path not in sys.path:
@@ -77,6 +87,10 @@ class TRMSPaths:
     def get_backup_dir(self, frequency: str = 'daily') -> Path:
         """Get backup directory by frequency."""
         return self.TRDS_DIR / 'backups' / frequency
+    
+    def get_cache_dir(self, component: str = 'system') -> Path:
+        """Get cache directory for a component."""
+        return self.TRDS_DIR / 'cache' / component
 
 # Global paths instance
 paths = TRMSPaths()
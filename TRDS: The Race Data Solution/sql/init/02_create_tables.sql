@@ -1,6 +1,9 @@
 -- ═══════════════════════════════════════════════════════════════════════════════
 -- 📊 TRMS Tables Schema
 -- ═══════════════════════════════════════════════════════════════════════════════
+-- CREATE TABLE IF NOT EXISTS leaves existing tables alone. Columns and keys
+-- added to existing tables are listed in libraries/database/schema.py and
+-- applied by: python3 -m libraries.database.partitions --convert
 
 USE trms_db;
 
@@ -28,6 +31,9 @@ CREATE TABLE IF NOT EXISTS races (
     timing_method VARCHAR(50),
     chip_timing BOOLEAN DEFAULT FALSE,
     
+    -- Set when the race's participants and times move to the archive tables
+    archived_at TIMESTAMP NULL,
+    
     -- Timestamps
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
@@ -40,9 +46,12 @@ CREATE TABLE IF NOT EXISTS races (
 
 -- =============================================
 -- PARTICIPANTS TABLE (TRRS)
+-- Partitioned by race_id range (see libraries/database/partitions.py).
+-- MySQL does not allow foreign keys on partitioned tables, so deleting a
+-- race removes its participants in RaceManager.delete_race.
 -- =============================================
 CREATE TABLE IF NOT EXISTS participants (
-    participant_id INT AUTO_INCREMENT PRIMARY KEY,
+    participant_id INT AUTO_INCREMENT,
     race_id INT NOT NULL,
     
     -- Personal information
@@ -53,6 +62,10 @@ CREATE TABLE IF NOT EXISTS participants (
     date_of_birth DATE,
     gender ENUM('M', 'F', 'Other'),
     
+    -- Age on race day (computed at registration/import)
+    age_on_race_day TINYINT UNSIGNED,
+    age_group VARCHAR(20),
+    
     -- Address
     address_line1 VARCHAR(255),
     address_line2 VARCHAR(255),
@@ -64,6 +77,7 @@ CREATE TABLE IF NOT EXISTS participants (
     -- Race specific
     distance VARCHAR(50),
     bib_number VARCHAR(20),
+    rfid_tag VARCHAR(50),
     t_shirt_size ENUM('XS', 'S', 'M', 'L', 'XL', 'XXL'),
     
     -- Emergency contact
@@ -75,22 +89,142 @@ CREATE TABLE IF NOT EXISTS participants (
     registration_status ENUM('pending', 'confirmed', 'cancelled') DEFAULT 'pending',
     payment_status ENUM('pending', 'paid', 'refunded') DEFAULT 'pending',
     amount_paid DECIMAL(10,2),
+    payment_reference VARCHAR(100),
     
     -- Timestamps
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     
-    FOREIGN KEY (race_id) REFERENCES races(race_id) ON DELETE CASCADE,
+    PRIMARY KEY (participant_id, race_id),
     INDEX idx_race_participant (race_id, last_name, first_name),
     INDEX idx_email (email),
-    INDEX idx_bib_number (bib_number)
+    UNIQUE KEY uq_race_bib (race_id, bib_number),
+    INDEX idx_bib_number (bib_number),
+    INDEX idx_race_rfid (race_id, rfid_tag),
+    INDEX idx_race_updated (race_id, updated_at),
+    INDEX idx_updated (updated_at),
+    INDEX idx_race_age_group (race_id, gender, age_group),
+    INDEX idx_race_status (race_id, registration_status),
+    INDEX idx_payment_reference (payment_reference)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (race_id) (
+    PARTITION p250 VALUES LESS THAN (250),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
+
+-- =============================================
+-- AGE_GROUP_BRACKETS TABLE (per-race age groups)
+-- =============================================
+CREATE TABLE IF NOT EXISTS age_group_brackets (
+    bracket_id INT AUTO_INCREMENT PRIMARY KEY,
+    race_id INT NOT NULL,
+    label VARCHAR(20) NOT NULL,
+    min_age TINYINT UNSIGNED NOT NULL,
+    max_age TINYINT UNSIGNED NOT NULL,
+    
+    -- Timestamps
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (race_id) REFERENCES races(race_id) ON DELETE CASCADE,
+    UNIQUE KEY uq_race_label (race_id, label),
+    INDEX idx_race_ages (race_id, min_age, max_age)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- =============================================
+-- RACE_CAPACITY TABLE (TRRS registration intake)
+-- =============================================
+CREATE TABLE IF NOT EXISTS race_capacity (
+    race_id INT PRIMARY KEY,
+    capacity INT,
+    reserved INT NOT NULL DEFAULT 0,
+    auto_closed BOOLEAN DEFAULT FALSE,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (race_id) REFERENCES races(race_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- =============================================
+-- RACE_CAPACITY_LEASES TABLE (unused slots held by intake processes)
+-- =============================================
+CREATE TABLE IF NOT EXISTS race_capacity_leases (
+    race_id INT NOT NULL,
+    holder VARCHAR(100) NOT NULL,
+    slots INT NOT NULL,
+    expires_at TIMESTAMP NOT NULL,
+    
+    PRIMARY KEY (race_id, holder),
+    FOREIGN KEY (race_id) REFERENCES races(race_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- =============================================
+-- BIB_RANGES TABLE (TRRS bib allocation)
+-- =============================================
+CREATE TABLE IF NOT EXISTS bib_ranges (
+    race_id INT NOT NULL,
+    distance VARCHAR(50) NOT NULL DEFAULT '',
+    first_bib INT UNSIGNED NOT NULL,
+    last_bib INT UNSIGNED NOT NULL,
+    next_bib INT UNSIGNED NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    
+    PRIMARY KEY (race_id, distance),
+    FOREIGN KEY (race_id) REFERENCES races(race_id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- =============================================
+-- BIB_RETURNS TABLE (unused bib blocks handed back)
+-- =============================================
+CREATE TABLE IF NOT EXISTS bib_returns (
+    return_id INT AUTO_INCREMENT PRIMARY KEY,
+    race_id INT NOT NULL,
+    distance VARCHAR(50) NOT NULL DEFAULT '',
+    first_bib INT UNSIGNED NOT NULL,
+    last_bib INT UNSIGNED NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (race_id) REFERENCES races(race_id) ON DELETE CASCADE,
+    INDEX idx_race_distance (race_id, distance)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- =============================================
+-- EMAIL_OUTBOX TABLE (TRRS outbound email queue)
+-- =============================================
+CREATE TABLE IF NOT EXISTS email_outbox (
+    email_id INT AUTO_INCREMENT PRIMARY KEY,
+    race_id INT,
+    participant_id INT,
+    
+    -- Message
+    to_address VARCHAR(255) NOT NULL,
+    subject VARCHAR(255) NOT NULL,
+    body_text TEXT NOT NULL,
+    
+    -- Delivery
+    status ENUM('queued', 'sending', 'sent', 'failed') DEFAULT 'queued',
+    attempts TINYINT UNSIGNED NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    claimed_by VARCHAR(64),
+    claimed_at TIMESTAMP NULL,
+    last_error VARCHAR(500),
+    sent_at TIMESTAMP NULL,
+    
+    -- Timestamps
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    
+    FOREIGN KEY (race_id) REFERENCES races(race_id) ON DELETE SET NULL,
+    INDEX idx_participant (participant_id),
+    INDEX idx_status_due (status, next_attempt_at),
+    INDEX idx_claimed_by (claimed_by)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- =============================================
 -- RACE_TIMES TABLE (TRTS)
+-- Partitioned like participants; no foreign keys for the same reason.
 -- =============================================
 CREATE TABLE IF NOT EXISTS race_times (
-    time_id INT AUTO_INCREMENT PRIMARY KEY,
+    time_id INT AUTO_INCREMENT,
     race_id INT NOT NULL,
     participant_id INT,
     bib_number VARCHAR(20),
@@ -121,12 +255,18 @@ CREATE TABLE IF NOT EXISTS race_times (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     
-    FOREIGN KEY (race_id) REFERENCES races(race_id) ON DELETE CASCADE,
-    FOREIGN KEY (participant_id) REFERENCES participants(participant_id) ON DELETE SET NULL,
+    PRIMARY KEY (time_id, race_id),
+    UNIQUE KEY uq_race_participant (race_id, participant_id),
     INDEX idx_race_times (race_id, finish_time),
     INDEX idx_bib_number (bib_number),
-    INDEX idx_participant (participant_id)
-) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+    INDEX idx_participant (participant_id),
+    INDEX idx_race_times_updated (race_id, updated_at),
+    INDEX idx_updated (updated_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+PARTITION BY RANGE (race_id) (
+    PARTITION p250 VALUES LESS THAN (250),
+    PARTITION pmax VALUES LESS THAN MAXVALUE
+);
 
 -- =============================================
 -- SYSTEM_SETTINGS TABLE
@@ -6,6 +6,8 @@ USE trms_db;
 
 -- =============================================
 -- RACE SUMMARY VIEW
+-- Live races only: archived races' participants and times are in the
+-- *_archive tables (libraries/database/partitions.py).
 -- =============================================
 CREATE OR REPLACE VIEW race_summary AS
 SELECT 
@@ -51,10 +53,12 @@ SELECT
     rt.timing_status
 FROM participants p
 JOIN races r ON p.race_id = r.race_id
-LEFT JOIN race_times rt ON p.participant_id = rt.participant_id;
+LEFT JOIN race_times rt ON rt.race_id = p.race_id AND rt.participant_id = p.participant_id;
 
 -- =============================================
 -- RACE RESULTS VIEW
+-- Live races only, like race_summary; results are not republished
+-- once a race is archived.
 -- =============================================
 CREATE OR REPLACE VIEW race_results AS
 SELECT 
@@ -73,6 +77,6 @@ SELECT
     rt.timing_status
 FROM race_times rt
 JOIN races r ON rt.race_id = r.race_id
-LEFT JOIN participants p ON rt.participant_id = p.participant_id
+LEFT JOIN participants p ON p.race_id = rt.race_id AND p.participant_id = rt.participant_id
 WHERE rt.timing_status IN ('finished', 'dnf', 'dsq')
 ORDER BY rt.race_id, rt.overall_place;
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 TRDS Test Configuration
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Shared pytest setup for the TRDS library tests. The tests cover pure
+    logic and never need MySQL: libraries is importable from the TRDS
+    directory, TRMS_BASE points at this checkout, the configuration
+    snapshot cache is off, and the connection pool created when
+    libraries.database.connection is imported is a stand-in that refuses
+    every checkout, so a test that reaches the database fails loudly.
+
+        python3 -m pytest tests
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from mysql.connector import pooling
+from mysql.connector.errors import PoolError
+
+TRDS_DIR = Path(__file__).resolve().parent.parent
+
+sys.path.insert(0, str(TRDS_DIR))
+os.environ.setdefault('TRMS_BASE', str(TRDS_DIR.parent))
+os.environ.setdefault('TRMS_CONFIG_CACHE', '0')
+
+class OfflinePool:
+    """Connection pool stand-in; tests must not reach the database."""
+
+    def __init__(self, **settings):
+        self.pool_name = settings.get('pool_name')
+        self.pool_size = settings.get('pool_size', 1)
+
+    def get_connection(self):
+        raise PoolError("Tests run without a database")
+
+pooling.MySQLConnectionPool = OfflinePool
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Age Group Bracket Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Behavior of AgeGroupManager.set_brackets: the new brackets and every
+    participant's recomputed age group are written in one transaction, so
+    a failed recompute leaves the old brackets in place. db_manager's
+    transaction is replaced by a recording cursor.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+
+from libraries.models import age_group
+from libraries.models.age_group import AgeGroupBracket, AgeGroupManager, DEFAULT_BRACKETS
+
+RACE_DAY = date(2024, 6, 1)
+
+ROSTER = [
+    {'participant_id': 1, 'date_of_birth': date(1990, 6, 2), 'age_on_race_day': None, 'race_date': RACE_DAY},
+    {'participant_id': 2, 'date_of_birth': None, 'age_on_race_day': 15, 'race_date': RACE_DAY},
+]
+
+class Cursor:
+    """Records statements; the participant UPDATE fails when ``fail`` is set."""
+
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.statements = []
+        self.rowcount = 0
+
+    def execute(self, query, params=None):
+        self.statements.append(query.split()[0])
+
+    def executemany(self, query, params_list):
+        if self.fail and query.startswith('UPDATE participants'):
+            raise RuntimeError("Lock wait timeout exceeded")
+        self.statements.append(query.split()[0])
+        self.rowcount = len(params_list)
+        self.params = params_list
+
+    def fetchall(self):
+        return [dict(row) for row in ROSTER]
+
+class Database:
+    """Transaction stand-in that records whether it committed."""
+
+    def __init__(self, fail: bool = False):
+        self.cursor = Cursor(fail)
+        self.committed = False
+
+    @contextmanager
+    def transaction(self):
+        yield self.cursor
+        self.committed = True
+
+@pytest.fixture
+def database(monkeypatch):
+    """Database whose writes succeed."""
+    db = Database()
+    monkeypatch.setattr(age_group.db_manager, 'transaction', db.transaction)
+    return db
+
+BRACKETS = [AgeGroupBracket(label='Youth', min_age=0, max_age=19),
+            AgeGroupBracket(label='Open', min_age=20, max_age=120)]
+
+def test_brackets_and_participants_commit_together(database):
+    """Brackets are replaced and participants regrouped in the same transaction."""
+    assert AgeGroupManager().set_brackets(12, BRACKETS)
+    assert database.committed
+    assert database.cursor.statements == ['DELETE', 'INSERT', 'SELECT', 'UPDATE']
+    assert database.cursor.params == [(33, 'Open', 1, 12), (15, 'Youth', 2, 12)]
+
+def test_failed_recompute_rolls_back_brackets(monkeypatch):
+    """A recompute failure leaves nothing committed."""
+    db = Database(fail=True)
+    monkeypatch.setattr(age_group.db_manager, 'transaction', db.transaction)
+    assert not AgeGroupManager().set_brackets(12, BRACKETS)
+    assert not db.committed
+
+def test_clearing_brackets_regroups_with_defaults(database):
+    """With no brackets of its own the race falls back to the defaults."""
+    assert AgeGroupManager().set_brackets(12, [])
+    assert database.cursor.statements == ['DELETE', 'SELECT', 'UPDATE']
+    expected = [age_group.assign_age_group(age, list(DEFAULT_BRACKETS)) for age in (33, 15)]
+    assert [row[1] for row in database.cursor.params] == expected
+
+def test_overlapping_brackets_are_rejected(database):
+    """An age may not fall in two brackets."""
+    with pytest.raises(ValueError):
+        AgeGroupManager().set_brackets(12, [AgeGroupBracket(label='A', min_age=0, max_age=30),
+                                            AgeGroupBracket(label='B', min_age=30, max_age=60)])
+    assert database.cursor.statements == []
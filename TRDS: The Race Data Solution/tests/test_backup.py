@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Backup Encoding Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Behavior of the backup row encoding (_encode on the way out, _decode
+    on the way back in) for every MySQL value type the tables hold, and
+    of the incremental watermark taken before the snapshots open.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from mysql.connector import Error
+
+from libraries.database.backup import WATERMARK_MARGIN, BackupEngine, _decode, _encode
+
+def round_trip(row: list) -> tuple:
+    """Write a row the way a dump file does and read it back for INSERT."""
+    return _decode(json.loads(json.dumps(row, default=_encode, ensure_ascii=False)))
+
+@pytest.mark.parametrize('value, stored', [
+    (datetime(2024, 6, 1, 8, 30, 15), '2024-06-01 08:30:15'),
+    (datetime(2024, 6, 1, 8, 30, 15, 250000), '2024-06-01 08:30:15.250000'),
+    (date(2024, 6, 1), '2024-06-01'),
+    (timedelta(hours=1, minutes=2, seconds=3), '01:02:03'),
+    (timedelta(hours=30, seconds=1, microseconds=5), '30:00:01.000005'),
+    (-timedelta(minutes=5), '-00:05:00'),
+    (Decimal('35.50'), '35.50'),
+    (b'plain text', 'plain text'),
+    ({'5K', '10K'}, '10K,5K'),
+])
+def test_encode_writes_mysql_literals(value, stored):
+    """Values json cannot write are stored as strings MySQL parses on restore."""
+    assert _encode(value) == stored
+
+def test_binary_values_survive_round_trip():
+    """Bytes that are not UTF-8 are base64 wrapped and restored exactly."""
+    blob = bytes(range(256))
+    assert round_trip([1, blob, 'Zoë']) == (1, blob, 'Zoë')
+
+def test_plain_json_values_pass_through():
+    """Numbers, strings, NULLs and booleans need no encoding."""
+    assert round_trip([7, 'bib', None, True, 2.5]) == (7, 'bib', None, True, 2.5)
+
+def test_unknown_types_are_refused():
+    """A value the backup cannot restore stops the dump."""
+    with pytest.raises(TypeError):
+        _encode(object())
+
+class WatermarkCursor:
+    """Cursor answering the watermark queries."""
+
+    def __init__(self, rows, deny_trx: bool = False):
+        self.rows = list(rows)
+        self.deny_trx = deny_trx
+        self.queries = []
+
+    def execute(self, query, params=None):
+        self.queries.append((query, params))
+        if self.deny_trx and 'innodb_trx' in query:
+            raise Error(msg="Access denied; you need the PROCESS privilege")
+
+    def fetchone(self):
+        return self.rows.pop(0)
+
+def test_watermark_goes_back_to_oldest_open_transaction():
+    """Changes by a transaction still open at snapshot time are copied next time."""
+    now, oldest = datetime(2024, 6, 1, 9, 0, 0), datetime(2024, 6, 1, 8, 58, 30)
+    assert BackupEngine()._watermark(WatermarkCursor([(now, oldest)])) == oldest
+
+def test_watermark_is_now_without_open_transactions():
+    """With nothing open the watermark is the current time."""
+    now = datetime(2024, 6, 1, 9, 0, 0)
+    assert BackupEngine()._watermark(WatermarkCursor([(now, None)])) == now
+
+def test_watermark_falls_back_to_margin():
+    """Without the PROCESS privilege the watermark is moved back by the margin."""
+    earlier = datetime(2024, 6, 1, 8, 50, 0)
+    cursor = WatermarkCursor([(earlier,)], deny_trx=True)
+    assert BackupEngine()._watermark(cursor) == earlier
+    assert cursor.queries[-1][1] == (WATERMARK_MARGIN,)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Response Cache Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Behavior of ResponseCache (hits, eviction, prefix invalidation and the
+    generation guard against storing a stale render) and of make_etag and
+    etag_matches.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from libraries.api.cache import ResponseCache, etag_matches, make_etag
+
+def test_get_counts_hits_and_misses():
+    """A stored response is returned and counted as a hit."""
+    cache = ResponseCache()
+    assert cache.get('/races') is None
+    cache.put('/races', '"a"', b'[]')
+    entry = cache.get('/races')
+    assert entry.body == b'[]' and entry.etag == '"a"'
+    assert cache.get_stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+def test_evicts_oldest_entry_when_full():
+    """The first stored key goes when the cache is full."""
+    cache = ResponseCache(max_entries=2)
+    for key in ('/a', '/b', '/c'):
+        cache.put(key, '"x"', b'')
+    assert cache.get('/a') is None
+    assert cache.get('/b') is not None and cache.get('/c') is not None
+
+def test_invalidate_prefix_keeps_other_keys():
+    """Only keys under the prefix are dropped."""
+    cache = ResponseCache()
+    cache.put('/api/races', '"1"', b'')
+    cache.put('/api/races/1', '"2"', b'')
+    cache.put('/api/search', '"3"', b'')
+    cache.invalidate('/api/races')
+    assert cache.get('/api/races') is None and cache.get('/api/races/1') is None
+    assert cache.get('/api/search') is not None
+
+def test_put_after_invalidation_is_not_stored():
+    """A render that started before an invalidation is returned but not cached."""
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.invalidate('/api')
+    entry = cache.put('/api/races', '"old"', b'stale', generation=generation)
+    assert entry.body == b'stale'
+    assert cache.get('/api/races') is None
+
+def test_make_etag_is_strong_and_stable():
+    """Same parts give the same quoted ETag; different parts a different one."""
+    etag = make_etag('race', 12, '2024-06-01 08:00:00')
+    assert etag.startswith('"') and etag.endswith('"') and not etag.startswith('W/')
+    assert etag == make_etag('race', 12, '2024-06-01 08:00:00')
+    assert etag != make_etag('race', 13, '2024-06-01 08:00:00')
+
+def test_etag_matches_lists_and_weak_validators():
+    """If-None-Match compares weakly and accepts a list or *."""
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"zzz", W/"abc"', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"zzz"', etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('', etag)
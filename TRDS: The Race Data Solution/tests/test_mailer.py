@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Email Dispatcher Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    EmailDispatcher draining a small outbox through the local SMTPSink,
+    and requeuing claims abandoned by a crashed peer while it runs. The
+    email_outbox table is an in-memory stand-in for the db_manager calls
+    the dispatcher makes.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import threading
+import time
+from email import message_from_bytes
+
+import pytest
+
+from libraries.registration import mailer
+from libraries.registration.mailer import EmailDispatcher
+from libraries.registration.smtp_sink import SMTPSink
+from libraries.utils.config import EmailConfig, config
+
+class Outbox:
+    """email_outbox rows behind execute_update, execute_query and execute_many."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.rows = {}
+
+    def add(self, to_address, subject='Hello', status='queued', claimed_by=None):
+        email_id = len(self.rows) + 1
+        self.rows[email_id] = {'email_id': email_id, 'to_address': to_address, 'subject': subject,
+                               'body_text': f"Body {email_id}", 'attempts': 0,
+                               'status': status, 'claimed_by': claimed_by}
+        return email_id
+
+    def status(self):
+        return {row['email_id']: row['status'] for row in self.rows.values()}
+
+    def execute_update(self, query, params=None):
+        with self._lock:
+            if "SET status = 'sending'" in query:
+                token, limit = params
+                due = [row for row in self.rows.values() if row['status'] == 'queued'][:limit]
+                for row in due:
+                    row.update(status='sending', claimed_by=token)
+                return len(due)
+            if "SET status = 'sent'" in query:
+                for email_id in params:
+                    self.rows[email_id].update(status='sent', claimed_by=None)
+                    self.rows[email_id]['attempts'] += 1
+                return len(params)
+            if "WHERE status = 'sending' AND claimed_at" in query:
+                # Claims by 'crashed' count as older than STALE_CLAIM_MINUTES
+                stale = [row for row in self.rows.values()
+                         if row['status'] == 'sending' and row['claimed_by'] == 'crashed']
+                for row in stale:
+                    row.update(status='queued', claimed_by=None)
+                return len(stale)
+        raise AssertionError(f"Unexpected update {query}")
+
+    def execute_query(self, query, params=None):
+        with self._lock:
+            return [dict(row) for row in self.rows.values()
+                    if row['claimed_by'] == params[0] and row['status'] == 'sending']
+
+    def execute_many(self, query, params_list):
+        raise AssertionError("No email should be retried or failed")
+
+@pytest.fixture
+def outbox(monkeypatch):
+    """In-memory outbox."""
+    table = Outbox()
+    for name in ('execute_update', 'execute_query', 'execute_many'):
+        monkeypatch.setattr(mailer.db_manager, name, getattr(table, name))
+    return table
+
+@pytest.fixture
+def sink(monkeypatch):
+    """Running SMTP sink the email settings point at."""
+    with SMTPSink(port=0) as running:
+        monkeypatch.setattr(config, 'email', EmailConfig(
+            smtp_host=running.host, smtp_port=running.port, workers=2, batch_size=2, poll_interval=0.05,
+        ))
+        yield running
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    """Poll until condition() holds."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+def test_drain_sends_outbox_through_sink(outbox, sink):
+    """Every queued email is delivered once and marked sent."""
+    for n in range(5):
+        outbox.add(f"runner{n}@example.com", subject=f"You're registered {n}")
+
+    stats = EmailDispatcher().drain()
+
+    assert stats['sent'] == 5
+    assert set(outbox.status().values()) == {'sent'}
+    delivered = sorted(message_from_bytes(message.data)['To'] for message in sink.messages)
+    assert delivered == [f"runner{n}@example.com" for n in range(5)]
+    assert stats['connections'] <= 2
+
+def test_running_dispatcher_requeues_abandoned_claims(outbox, sink):
+    """A claim left by a peer that crashed after start is recovered without a restart."""
+    dispatcher = EmailDispatcher(workers=1)
+    dispatcher.start()
+    try:
+        stuck = outbox.add('late@example.com', status='sending', claimed_by='crashed')
+        assert not wait_for(lambda: outbox.status()[stuck] == 'sent', timeout=0.3)
+
+        # STALE_CLAIM_MINUTES have passed
+        dispatcher._next_requeue = 0.0
+        assert wait_for(lambda: outbox.status()[stuck] == 'sent')
+    finally:
+        dispatcher.stop()
+    assert [message_from_bytes(message.data)['To'] for message in sink.messages] == ['late@example.com']
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Timing Stream Merge Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Behavior of reorder() and TimingStreamMerger: reordering within the
+    window, late reads, dedupe and its expiry, heartbeats from idle live
+    streams and the TimingSink contract.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import queue
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from libraries.timing.merge import (
+    Heartbeat, TimingRead, TimingSink, TimingStreamMerger, SplitTracker, queue_reads, reorder,
+)
+
+GUN = datetime(2024, 6, 1, 8, 0, 0)
+
+def read(point: str, seconds: float, tag: str) -> TimingRead:
+    """A chip read ``seconds`` after the gun."""
+    return TimingRead(GUN + timedelta(seconds=seconds), point, rfid_tag=tag)
+
+def test_reorder_sorts_reads_within_window():
+    """Out-of-order packets inside the window come out in time order."""
+    reads = [read('finish', s, f"T{s}") for s in (1, 3, 2, 5, 4, 6)]
+    ordered = list(reorder(reads, timedelta(seconds=2)))
+    assert [r.read_time for r in ordered] == sorted(r.read_time for r in reads)
+
+def test_reorder_sends_late_reads_to_callback():
+    """A read older than something already emitted is reported, not emitted."""
+    late = []
+    reads = [read('finish', 5, 'A'), read('finish', 10, 'B'), read('finish', 1, 'C')]
+    ordered = list(reorder(reads, timedelta(seconds=2), on_late=late.append))
+    assert [r.key for r in ordered] == ['A', 'B']
+    assert [r.key for r in late] == ['C']
+
+def test_reorder_bounds_buffer():
+    """A full buffer emits its oldest read even inside the window."""
+    reads = [read('finish', s / 10, f"T{s}") for s in range(10)]
+    emitted = []
+    for item in reorder(reads, timedelta(hours=1), max_buffer=3):
+        emitted.append(item)
+        if len(emitted) == 1:
+            break
+    assert emitted[0].key == 'T0'
+
+def test_reorder_heartbeat_flushes_and_passes_on():
+    """A heartbeat releases buffered reads and is passed on moved back by the window."""
+    items = [read('start', 0, 'A'), Heartbeat(GUN + timedelta(seconds=10), 'start')]
+    out = list(reorder(items, timedelta(seconds=2)))
+    assert out[0].key == 'A'
+    assert out[1] == Heartbeat(GUN + timedelta(seconds=8), 'start')
+
+def test_merger_orders_across_points():
+    """Reads from every point are merged into one time-ordered stream."""
+    merger = TimingStreamMerger({
+        'start': iter([read('start', 0, 'A'), read('start', 1, 'B')]),
+        'finish': iter([read('finish', 0.5, 'C'), read('finish', 900, 'A')]),
+    })
+    events = list(merger.events())
+    assert [(e.point, e.key) for e in events] == [('start', 'A'), ('finish', 'C'), ('start', 'B'), ('finish', 'A')]
+    assert merger.event_count == 4
+
+def test_merger_dedupes_repeat_reads():
+    """Only the first read of a chip at a point counts."""
+    merger = TimingStreamMerger({'finish': iter([read('finish', 0, 'A'), read('finish', 0.2, 'A'),
+                                                 read('finish', 0.4, 'A')])})
+    assert [e.key for e in merger.events()] == ['A']
+    assert merger.duplicate_count == 2
+
+def test_merger_forgets_crossings_after_dedupe_window():
+    """A chip seen again after the dedupe window is a new crossing."""
+    merger = TimingStreamMerger({'lap': iter([read('lap', 0, 'A'), read('lap', 5, 'A'), read('lap', 200, 'A')])},
+                                dedupe_window=timedelta(minutes=2))
+    assert len(list(merger.events())) == 2
+    assert merger.duplicate_count == 1
+
+def test_merger_skips_heartbeats():
+    """Heartbeats advance the merge but are not events."""
+    merger = TimingStreamMerger({
+        'start': iter([Heartbeat(GUN + timedelta(seconds=30), 'start')]),
+        'finish': iter([read('finish', 20, 'A')]),
+    })
+    assert [e.key for e in merger.events()] == ['A']
+    assert merger.event_count == 1
+
+def test_idle_live_stream_does_not_stall_merge():
+    """A quiet queue sends heartbeats, so reads on another point still flow."""
+    start_queue, finish_queue = queue.Queue(), queue.Queue()
+    clock = [GUN]
+    merger = TimingStreamMerger({
+        'start': queue_reads(start_queue, 'start', idle=timedelta(milliseconds=10), clock=lambda: clock[0]),
+        'finish': queue_reads(finish_queue, 'finish', idle=timedelta(milliseconds=10), clock=lambda: clock[0]),
+    })
+    finish_queue.put(read('finish', 1, 'A'))
+    clock[0] = GUN + timedelta(seconds=10)
+
+    received = []
+    consumer = threading.Thread(target=lambda: received.append(next(merger.events())), daemon=True)
+    consumer.start()
+    consumer.join(timeout=5)
+    start_queue.put(None)
+    finish_queue.put(None)
+
+    assert [r.key for r in received] == ['A']
+
+def test_split_tracker_records_first_crossing():
+    """Splits are measured from the start mat."""
+    splits = SplitTracker()
+    merger = TimingStreamMerger({
+        'start': iter([read('start', 3, 'A')]),
+        'finish': iter([read('finish', 1203, 'A')]),
+    })
+    merger.run([splits])
+    assert splits.get_splits('A') == {'finish': timedelta(seconds=1200)}
+
+def test_timing_sink_is_abstract():
+    """A sink without handle() cannot be created."""
+    with pytest.raises(TypeError):
+        TimingSink()
+
+    class Incomplete(TimingSink):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
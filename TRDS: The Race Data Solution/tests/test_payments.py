@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Payment Reconciliation Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Behavior of PaymentIndex.match and PaymentReconciler on an in-memory
+    index: reference and email matching, shared emails, refunds, unchanged
+    and skipped lines, chunking and dry runs. apply_updates is replaced so
+    the chunks it would write can be inspected.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from decimal import Decimal
+
+import pytest
+
+from libraries.registration import payments
+from libraries.registration.payments import PaymentIndex, PaymentReconciler, PaymentUpdate, _resolve_columns
+
+def participant(participant_id, email, status='pending', amount=None, reference=None, race_id=12):
+    """Participant row as PaymentIndex.load reads it."""
+    return {'participant_id': participant_id, 'race_id': race_id, 'email': email,
+            'payment_status': status, 'amount_paid': amount, 'payment_reference': reference}
+
+def make_index(*rows) -> PaymentIndex:
+    """Index over the given participants."""
+    index = PaymentIndex()
+    for row in rows:
+        index.add(row)
+    return index
+
+COLUMNS = _resolve_columns(['Transaction ID', 'Customer Email', 'Amount', 'Status'])
+
+def line(reference='', email='', amount='', status='succeeded'):
+    """Settlement export line."""
+    return {'Transaction ID': reference, 'Customer Email': email, 'Amount': amount, 'Status': status}
+
+@pytest.fixture
+def applied(monkeypatch):
+    """Chunks passed to apply_updates."""
+    chunks = []
+    monkeypatch.setattr(payments, 'apply_updates', lambda updates: chunks.append(updates) or len(updates))
+    return chunks
+
+def reconciler(index, **kwargs) -> PaymentReconciler:
+    """Reconciler over a prepared index."""
+    reconciler = PaymentReconciler(**kwargs)
+    reconciler.index = index
+    return reconciler
+
+def test_resolve_columns_matches_processor_headers():
+    """Header names are matched ignoring case and spacing."""
+    assert COLUMNS == {'reference': 'Transaction ID', 'email': 'Customer Email',
+                       'amount': 'Amount', 'status': 'Status'}
+
+def test_match_prefers_reference():
+    """A known reference wins over the email."""
+    index = make_index(participant(1, 'a@example.com', 'paid', reference='ch_1'),
+                       participant(2, 'b@example.com'))
+    assert index.match('ch_1', 'b@example.com', 'paid').participant_id == 1
+
+def test_match_by_email_ignores_case():
+    """Emails are compared lower-cased and trimmed."""
+    index = make_index(participant(1, 'Runner@Example.com'))
+    assert index.match(None, '  runner@example.COM ', 'paid').participant_id == 1
+    assert index.match(None, 'other@example.com', 'paid') is None
+    assert index.match(None, None, 'paid') is None
+
+def test_match_shared_email_picks_by_status():
+    """A payment settles the first pending entry, a refund the first paid one."""
+    index = make_index(participant(1, 'family@example.com', 'paid', reference='ch_old'),
+                       participant(2, 'family@example.com', 'pending'),
+                       participant(3, 'family@example.com', 'paid'))
+    assert index.match(None, 'family@example.com', 'paid').participant_id == 2
+    assert index.match(None, 'family@example.com', 'refunded').participant_id == 3
+
+def test_match_shared_email_without_candidate():
+    """When no entry is in the wanted state the line stays unmatched."""
+    index = make_index(participant(1, 'family@example.com', 'paid', reference='ch_1'),
+                       participant(2, 'family@example.com', 'paid', reference='ch_2'))
+    assert index.match(None, 'family@example.com', 'paid') is None
+
+def test_reconcile_applies_payments_with_race(applied):
+    """Matched payments are written with the participant's race."""
+    index = make_index(participant(1, 'a@example.com'), participant(2, 'b@example.com', race_id=14))
+    report = reconciler(index).reconcile(
+        [line('ch_1', 'a@example.com', '$1,035.00'), line('ch_2', 'B@example.com', '40')], COLUMNS)
+
+    assert report.updated == 2 and report.would_update == 0
+    assert applied == [[
+        PaymentUpdate(1, 12, 'paid', Decimal('1035.00'), 'ch_1'),
+        PaymentUpdate(2, 14, 'paid', Decimal('40'), 'ch_2'),
+    ]]
+
+def test_reconcile_counts_unchanged_skipped_and_unmatched(applied):
+    """Lines that change nothing are counted, not written."""
+    index = make_index(participant(1, 'a@example.com', 'paid', Decimal('40'), 'ch_1'))
+    report = reconciler(index).reconcile([
+        line('ch_1', 'a@example.com', '40'),
+        line('ch_9', 'a@example.com', '40', status='failed'),
+        line('ch_8', 'nobody@example.com', '40'),
+    ], COLUMNS)
+
+    assert report.summary()['unchanged'] == 1
+    assert report.skipped == 1
+    assert len(report.unmatched) == 1
+    assert applied == []
+
+def test_refund_keeps_original_charge(applied):
+    """A refund keeps the charge's reference and amount."""
+    index = make_index(participant(1, 'a@example.com', 'paid', Decimal('40'), 'ch_1'))
+    reconciler(index).reconcile([line('re_1', 'a@example.com', '40', status='refund')], COLUMNS)
+    assert applied == [[PaymentUpdate(1, 12, 'refunded', Decimal('40'), 'ch_1')]]
+
+def test_reconcile_writes_in_chunks(applied):
+    """Updates are applied chunk_size at a time."""
+    index = make_index(*(participant(i, f"r{i}@example.com") for i in range(1, 6)))
+    report = reconciler(index, chunk_size=2).reconcile(
+        [line(f"ch_{i}", f"r{i}@example.com", '40') for i in range(1, 6)], COLUMNS)
+    assert [len(chunk) for chunk in applied] == [2, 2, 1]
+    assert report.chunks == 3
+
+def test_dry_run_counts_would_update(applied):
+    """A dry run writes nothing and reports what it would update."""
+    index = make_index(participant(1, 'a@example.com'), participant(2, 'b@example.com'))
+    report = reconciler(index, dry_run=True).reconcile(
+        [line('ch_1', 'a@example.com', '40'), line('ch_2', 'b@example.com', '40')], COLUMNS)
+    assert applied == []
+    assert report.updated == 0
+    assert report.would_update == 2
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Results Ranking Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Behavior of compute_places: overall, gender and age group places per
+    distance, tie-breaking and runners who did not finish.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from datetime import datetime, timedelta
+
+from libraries.results.ranking import Placement, compute_places
+
+def row(time_id: int, seconds, gender='M', age_group='30-39', distance='5K', status='finished', finish=None):
+    """A race_times row as the reprocessor fetches it."""
+    return {
+        'time_id': time_id,
+        'net_time': timedelta(seconds=seconds) if seconds is not None else None,
+        'finish_time': finish,
+        'timing_status': status,
+        'distance': distance,
+        'gender': gender,
+        'age_group': age_group,
+    }
+
+def places(rows):
+    """Placements keyed by time_id."""
+    return {placement.time_id: placement for placement in compute_places(rows)}
+
+def test_ranks_by_net_time():
+    """The fastest net time is first overall."""
+    result = places([row(1, 1500), row(2, 1200), row(3, 1800)])
+    assert [result[i].overall_place for i in (2, 1, 3)] == [1, 2, 3]
+
+def test_gender_and_age_group_places():
+    """Gender places count within gender, age group places within gender and age group."""
+    result = places([
+        row(1, 1000, 'M', '30-39'),
+        row(2, 1100, 'F', '30-39'),
+        row(3, 1200, 'M', '40-49'),
+        row(4, 1300, 'F', '30-39'),
+    ])
+    assert result[2] == Placement(2, 2, 1, 1)
+    assert result[3] == Placement(3, 3, 2, 1)
+    assert result[4] == Placement(4, 4, 2, 2)
+
+def test_distances_are_ranked_separately():
+    """Each distance has its own first place."""
+    result = places([row(1, 3000, distance='10K'), row(2, 1500, distance='5K'), row(3, 2900, distance='10K')])
+    assert result[3].overall_place == 1
+    assert result[1].overall_place == 2
+    assert result[2].overall_place == 1
+
+def test_ties_break_on_finish_time_then_row():
+    """Equal net times go to whoever crossed the line first, then to row order."""
+    early = datetime(2024, 6, 1, 8, 30)
+    result = places([
+        row(5, 1500, finish=early + timedelta(seconds=2)),
+        row(6, 1500, finish=early),
+        row(7, 1500),
+        row(8, 1500),
+    ])
+    assert [result[i].overall_place for i in (6, 5, 7, 8)] == [1, 2, 3, 4]
+
+def test_non_finishers_get_no_places():
+    """DNF, DSQ and rows without a net time are returned unplaced."""
+    result = places([row(1, 1500), row(2, None), row(3, 1400, status='dnf'), row(4, 1300, status='dsq')])
+    assert result[1].overall_place == 1
+    for time_id in (2, 3, 4):
+        assert result[time_id] == Placement(time_id, None, None, None)
+
+def test_missing_gender_skips_gender_places():
+    """Without a gender only the overall place is known."""
+    result = places([row(1, 1500, gender=None)])
+    assert result[1] == Placement(1, 1, None, None)
+
+def test_every_row_is_returned_once():
+    """compute_places returns one placement per input row."""
+    rows = [row(i, 1000 + i if i % 3 else None) for i in range(1, 30)]
+    assert sorted(p.time_id for p in compute_places(rows)) == list(range(1, 30))
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Rate Limiting Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Behavior of TokenBucket and RateLimiter on a controlled clock: bursts,
+    refill, Retry-After, per-endpoint rules, explicit zero rates and
+    client eviction.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import pytest
+
+from libraries.api import ratelimit
+from libraries.api.ratelimit import MAX_RETRY_AFTER, RateLimiter, TokenBucket
+from libraries.utils.config import config
+
+class Clock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    """Replace the limiter's clock."""
+    fake = Clock()
+    monkeypatch.setattr(ratelimit.time, 'monotonic', fake)
+    return fake
+
+def test_bucket_allows_burst_then_limits(clock):
+    """A full bucket allows ``capacity`` requests, then asks the caller to wait."""
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take() == pytest.approx(0.5)
+
+def test_bucket_refills_over_time(clock):
+    """Tokens come back at ``rate`` per second, up to capacity."""
+    bucket = TokenBucket(rate=2.0, capacity=3)
+    for _ in range(3):
+        bucket.take()
+    clock.now += 1.0
+    assert bucket.take() == 0.0
+    assert bucket.take() == 0.0
+    assert bucket.take() > 0
+    clock.now += 3600
+    assert bucket.tokens <= 3
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+def test_bucket_with_zero_rate_never_refills(clock):
+    """A zero rate is a fixed allowance with a capped Retry-After."""
+    bucket = TokenBucket(rate=0.0, capacity=1)
+    assert bucket.take() == 0.0
+    clock.now += 3600
+    assert bucket.take() == MAX_RETRY_AFTER
+
+def test_limiter_keeps_clients_apart(clock):
+    """One client's burst does not limit another."""
+    limiter = RateLimiter(rate=1.0, burst=1)
+    assert limiter.check('10.0.0.1') == 0.0
+    assert limiter.check('10.0.0.1') > 0
+    assert limiter.check('10.0.0.2') == 0.0
+    assert limiter.get_stats() == {'buckets': 2, 'limited': 1}
+
+def test_limiter_endpoint_rules(clock):
+    """Endpoints with their own rule get their own bucket and rate."""
+    limiter = RateLimiter(rate=10.0, burst=1, endpoint_rules={'results': (1.0, 1.0)})
+    assert limiter.check('client', 'results') == 0.0
+    assert limiter.check('client', 'results') == pytest.approx(1.0)
+    assert limiter.check('client', 'api') == 0.0
+    assert limiter.check('client', 'api') == pytest.approx(0.1)
+
+def test_limiter_accepts_explicit_zero(clock):
+    """rate=0 and burst=0 are settings, not a request for the defaults."""
+    limiter = RateLimiter(rate=0, burst=0)
+    assert limiter.default_rule == (0, 0.0)
+    assert limiter.check('client') == MAX_RETRY_AFTER
+
+def test_limiter_defaults_from_config(clock):
+    """Omitted rate and burst come from the web configuration."""
+    limiter = RateLimiter()
+    assert limiter.default_rule == (config.web.rate_limit_per_second, float(config.web.rate_limit_burst))
+
+def test_limiter_evicts_least_recent_client(clock):
+    """Past max_clients the quietest client's bucket is dropped."""
+    limiter = RateLimiter(rate=1.0, burst=1, max_clients=2)
+    limiter.check('a')
+    limiter.check('b')
+    limiter.check('a')
+    limiter.check('c')
+    assert limiter.get_stats()['buckets'] == 2
+    # 'b' was evicted, so it starts again with a full bucket
+    assert limiter.check('b') == 0.0
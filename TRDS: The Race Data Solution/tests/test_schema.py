@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Schema Upgrade Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Behavior of upgrade_schema on a database created from the first
+    release's tables: missing columns and indexes are added, and a unique
+    key is held back while duplicate rows would break it. information_schema
+    and the ALTER statements are served by a stand-in for db_manager.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import pytest
+
+from libraries.database import schema
+from libraries.database.schema import ADDED_COLUMNS, ADDED_INDEXES, upgrade_schema
+
+class OldDatabase:
+    """information_schema of a first-release database."""
+
+    def __init__(self, duplicate_bibs=()):
+        self.columns = {
+            'races': {'race_id', 'race_name', 'chip_timing'},
+            'participants': {'participant_id', 'race_id', 'gender', 'bib_number', 'amount_paid', 'updated_at'},
+            'race_times': {'time_id', 'race_id', 'participant_id', 'updated_at'},
+        }
+        self.indexes = {'participants': {'PRIMARY', 'idx_bib_number'}, 'race_times': {'PRIMARY'}}
+        self.duplicate_bibs = list(duplicate_bibs)
+        self.alters = []
+
+    def execute_query(self, query, params=None):
+        if 'information_schema.COLUMNS' in query:
+            return [{'name': name} for name in self.columns.get(params[0], ())]
+        if 'information_schema.STATISTICS' in query:
+            return [{'name': name} for name in self.indexes.get(params[0], ())]
+        if 'HAVING COUNT(*) > 1' in query:
+            return self.duplicate_bibs if 'FROM participants' in query else []
+        raise AssertionError(f"Unexpected query {query}")
+
+    def execute_update(self, query, params=None):
+        self.alters.append(query)
+        return 0
+
+@pytest.fixture
+def old_db(monkeypatch):
+    """First-release database without duplicates."""
+    db = OldDatabase()
+    monkeypatch.setattr(schema.db_manager, 'execute_query', db.execute_query)
+    monkeypatch.setattr(schema.db_manager, 'execute_update', db.execute_update)
+    return db
+
+def test_adds_missing_columns_and_indexes(old_db):
+    """Every column and index added since the first release is applied."""
+    report = upgrade_schema()
+
+    expected_columns = [f"{table}.{column}" for table, columns in ADDED_COLUMNS.items() for column, _ in columns]
+    assert report.columns == expected_columns
+    assert report.indexes == [f"{table}.{index.name}" for table, indexes in ADDED_INDEXES.items() for index in indexes]
+    assert report.duplicates == {}
+    assert "ALTER TABLE participants ADD COLUMN rfid_tag VARCHAR(50) AFTER bib_number" in old_db.alters
+    assert any("ADD UNIQUE KEY uq_race_bib (race_id, bib_number)" in alter for alter in old_db.alters)
+
+def test_holds_back_unique_key_over_duplicates(old_db):
+    """uq_race_bib waits for duplicate bibs to be fixed; the other indexes are added."""
+    old_db.duplicate_bibs = [{'race_id': 12, 'bib_number': '7', 'row_count': 2}]
+    report = upgrade_schema()
+
+    assert report.duplicates == {'participants.uq_race_bib': old_db.duplicate_bibs}
+    assert 'participants.uq_race_bib' not in report.indexes
+    assert 'participants.idx_race_rfid' in report.indexes
+    assert not any('uq_race_bib' in alter for alter in old_db.alters)
+
+def test_up_to_date_database_is_left_alone(old_db):
+    """Nothing is altered once every column and index exists."""
+    for table, columns in ADDED_COLUMNS.items():
+        old_db.columns[table] |= {column for column, _ in columns}
+    for table, indexes in ADDED_INDEXES.items():
+        old_db.indexes[table] |= {index.name for index in indexes}
+
+    report = upgrade_schema()
+    assert report == ([], [], {})
+    assert old_db.alters == []
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 System Settings Cache Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Behavior of SettingsManager under concurrent first use and of the
+    shared settled_version check. The system_settings table is served by a
+    slow stand-in for db_manager.execute_query.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pytest
+
+from libraries.database.connection import settled_version
+from libraries.models import settings
+from libraries.models.settings import SettingsManager
+
+NOW = datetime(2024, 6, 1, 9, 0, 0)
+
+@pytest.fixture
+def slow_table(monkeypatch):
+    """system_settings whose queries take a while; counts the loads."""
+    loads = []
+
+    def execute_query(query, params=None):
+        time.sleep(0.05)
+        if 'COUNT(*)' in query:
+            return [{'n': 1, 'latest': NOW - timedelta(minutes=5), 'now': NOW}]
+        loads.append(threading.current_thread().name)
+        return [{'setting_key': 'registration_email_enabled', 'setting_value': 'true'}]
+
+    monkeypatch.setattr(settings.db_manager, 'execute_query', execute_query)
+    return loads
+
+def test_concurrent_first_reads_wait_for_load(slow_table):
+    """No caller sees the default while the first load is running."""
+    manager = SettingsManager()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        seen = list(pool.map(lambda _: manager.get_bool('registration_email_enabled'), range(8)))
+    assert seen == [True] * 8
+    assert len(slow_table) == 1
+
+def test_later_refreshes_do_not_block(slow_table):
+    """Once loaded, callers keep the cached values while another thread refreshes."""
+    manager = SettingsManager(refresh_interval=0)
+    manager.get('registration_email_enabled')
+    with manager._refresh_lock:
+        assert manager.get('registration_email_enabled') == 'true'
+
+def test_settled_version():
+    """A version changed within the last second is not kept."""
+    version = (3, NOW)
+    assert settled_version(version, NOW, NOW + timedelta(seconds=2)) == version
+    assert settled_version(version, NOW, NOW + timedelta(milliseconds=500)) is None
+    assert settled_version((0, None), None, NOW) == (0, None)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Slow Query Log Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Behavior of normalize_sql, fingerprint and sample_params, of read_log
+    merging the per-process log files, and of pruning the files left by
+    exited processes.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from libraries.database.slow_queries import (
+    fingerprint, normalize_sql, process_log_path, prune_process_logs, read_log, sample_params,
+)
+
+@pytest.mark.parametrize('query, shape', [
+    ("SELECT * FROM t WHERE a = 1 AND b = 'x'", "SELECT * FROM t WHERE a = ? AND b = ?"),
+    ("select *  from t -- trailing\n where id in (%s, %s, %s)", "select * from t where id in (?+)"),
+    ("INSERT INTO t (a,b) VALUES (%s,%s), (%s,%s)", "INSERT INTO t (a,b) VALUES (?+)"),
+    ("SELECT /* hint */ col2, 1.5e3, -4 FROM t2", "SELECT col2, ?, ? FROM t2"),
+    ("select * from t where name = 'O''Brien'", "select * from t where name = ?"),
+    ("SELECT %(race_id)s", "SELECT ?"),
+])
+def test_normalize_sql(query, shape):
+    """Literals, placeholders, lists and comments fold to one shape."""
+    assert normalize_sql(query) == shape
+
+def test_normalize_keeps_identifiers_with_digits():
+    """Digits inside names are not literals."""
+    assert normalize_sql("SELECT p2.col3 FROM t1 p2") == "SELECT p2.col3 FROM t1 p2"
+
+def test_fingerprint_ignores_literals_and_list_length():
+    """Queries of the same shape share a fingerprint."""
+    assert fingerprint("SELECT * FROM t WHERE id IN (1, 2)") == fingerprint("SELECT * FROM t WHERE id IN (7,8,9,10)")
+    assert fingerprint("SELECT * FROM t WHERE id = 1") != fingerprint("SELECT * FROM u WHERE id = 1")
+    assert len(fingerprint("SELECT 1")) == 16
+
+def test_sample_params_shortens_values():
+    """Long values are cut and binary values summarized."""
+    assert sample_params(None) is None
+    assert sample_params((1, 'abc')) == ['1', "'abc'"]
+    assert sample_params({'a': b'\x00' * 10}) == ['<10 bytes>']
+    long_text = sample_params(('x' * 100,), limit=20)[0]
+    assert len(long_text) == 20 and long_text.endswith('...')
+
+def test_process_log_path():
+    """Each process gets its own file next to the configured path."""
+    assert process_log_path(Path('/logs/slow_queries.log'), pid=42) == Path('/logs/slow_queries.42.log')
+
+def write_lines(path, *entries, tail: str = ""):
+    """Write slow query log lines, then ``tail`` as raw text."""
+    path.write_text("".join(json.dumps(entry) + "\n" for entry in entries) + tail, encoding='utf-8')
+
+def test_read_log_merges_process_files(tmp_path):
+    """Lines from every process file and rotated backup are summarized together."""
+    base = tmp_path / 'slow_queries.log'
+    write_lines(tmp_path / 'slow_queries.100.log',
+                {'time': '2024-06-01T08:00:02.000', 'fingerprint': 'f1', 'sql': 'q1', 'ms': 600.0,
+                 'plan': [{'type': 'new'}]})
+    write_lines(tmp_path / 'slow_queries.100.log.1',
+                {'time': '2024-06-01T07:00:00.000', 'fingerprint': 'f1', 'sql': 'q1', 'ms': 900.0,
+                 'plan': [{'type': 'old'}]})
+    write_lines(tmp_path / 'slow_queries.200.log',
+                {'time': '2024-06-01T08:00:01.000', 'fingerprint': 'f1', 'sql': 'q1', 'ms': 700.0},
+                {'time': '2024-06-01T08:00:01.000', 'fingerprint': 'f2', 'sql': 'q2', 'ms': 550.0},
+                tail='{"time": "2024-06-01T08:00:03')  # cut off by a crash
+
+    summary = read_log(base, n=10)
+    assert [row['fingerprint'] for row in summary] == ['f1', 'f2']
+    first = summary[0]
+    assert first['count'] == 3
+    assert first['total_ms'] == pytest.approx(2200.0)
+    assert first['max_ms'] == 900.0
+    assert first['last_seen'] == '2024-06-01T08:00:02.000'
+    assert first['plan'] == [{'type': 'new'}]
+
+def test_read_log_without_files(tmp_path):
+    """No log yet is an empty summary."""
+    assert read_log(tmp_path / 'slow_queries.log') == []
+
+def age(path, days: float):
+    """Create a file last written ``days`` ago."""
+    path.write_text("", encoding='utf-8')
+    stamp = time.time() - days * 86400
+    os.utime(path, (stamp, stamp))
+
+def test_prune_removes_old_files_of_exited_processes(tmp_path):
+    """Old files of dead pids go; live pids, recent files and other logs stay."""
+    base = tmp_path / 'slow_queries.log'
+    age(tmp_path / 'slow_queries.100.log', 10)
+    age(tmp_path / 'slow_queries.100.log.1', 12)
+    age(tmp_path / 'slow_queries.200.log', 1)
+    age(tmp_path / 'slow_queries.300.log', 30)
+    age(tmp_path / 'slow_queries.log', 30)
+    age(tmp_path / 'trds.log', 30)
+
+    removed = prune_process_logs(base, max_age_days=7, alive=lambda pid: pid == 300)
+
+    assert removed == 2
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        'slow_queries.200.log', 'slow_queries.300.log', 'slow_queries.log', 'trds.log',
+    ]
+
+def test_prune_caps_files_of_exited_processes(tmp_path):
+    """Only the newest files of exited processes are kept."""
+    base = tmp_path / 'slow_queries.log'
+    for pid in range(1, 6):
+        age(tmp_path / f"slow_queries.{pid}.log", pid / 24)
+
+    assert prune_process_logs(base, max_files=2, alive=lambda pid: False) == 3
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['slow_queries.1.log', 'slow_queries.2.log']
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Timing Writer Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Behavior of TimingWriter when race_times writes fail: transient errors
+    are retried, batches that keep failing are set aside and written once
+    the database is back, and close() returns reads that never made it.
+    race_time_manager's batch writes are replaced by a recorder that can
+    be told to fail.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from mysql.connector import Error
+
+from libraries.timing import writer
+from libraries.timing.merge import TimingRead
+from libraries.timing.writer import TimingWriter
+
+GUN = datetime(2024, 6, 1, 8, 0, 0)
+
+RUNNERS = {tag: SimpleNamespace(participant_id=n, bib_number=str(n)) for n, tag in enumerate(('A', 'B', 'C'), 1)}
+
+class RaceTimes:
+    """Records written rows; fails while ``failures`` is positive or ``down`` is set."""
+
+    def __init__(self):
+        self.finishes = []
+        self.starts = []
+        self.failures = 0
+        self.down = False
+
+    def _check(self):
+        if self.down or self.failures > 0:
+            self.failures -= 1
+            raise Error(msg="Lost connection to MySQL server during query")
+
+    def record_starts(self, race_id, starts):
+        self._check()
+        self.starts.extend(starts)
+        return len(starts)
+
+    def record_finishes(self, race_id, finishes):
+        self._check()
+        self.finishes.extend(finishes)
+        return len(finishes)
+
+@pytest.fixture
+def race_times(monkeypatch):
+    """Stand-in for race_time_manager."""
+    table = RaceTimes()
+    monkeypatch.setattr(writer, 'race_time_manager', table)
+    return table
+
+def make_writer(**kwargs) -> TimingWriter:
+    """Writer with one read per batch and no retry delay."""
+    return TimingWriter(12, RUNNERS.get, batch_size=1, flush_interval=0.01, retry_base_seconds=0, **kwargs)
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    """Poll until condition() holds."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+def finish(tag: str, seconds: float) -> TimingRead:
+    """Finish read ``seconds`` after the gun."""
+    return TimingRead(GUN + timedelta(seconds=seconds), 'finish', rfid_tag=tag)
+
+def test_transient_failure_is_retried(race_times):
+    """Failed attempts are retried without losing the batch."""
+    race_times.failures = 2
+    timing = make_writer()
+    timing.handle(finish('A', 1200))
+    assert timing.close() == []
+    assert [row[0] for row in race_times.finishes] == [1]
+    assert timing.failed_batches == 0
+
+def test_failed_batch_is_written_after_recovery(race_times):
+    """A batch that fails every attempt is written once a later batch succeeds."""
+    race_times.down = True
+    timing = make_writer(write_attempts=2)
+    timing.handle(finish('A', 1200))
+    assert wait_for(lambda: timing.dead_letter)
+
+    race_times.down = False
+    timing.handle(finish('B', 1210))
+    assert timing.close() == []
+    assert sorted(row[0] for row in race_times.finishes) == [1, 2]
+    assert timing.failed_batches == 1
+    assert timing.written == 2
+
+def test_close_returns_unwritten_reads(race_times):
+    """Reads still failing at close are handed back, not dropped."""
+    race_times.down = True
+    timing = make_writer(write_attempts=2)
+    reads = [finish('A', 1200), finish('B', 1210)]
+    for read in reads:
+        timing.handle(read)
+    assert timing.close() == reads
+    assert timing.written == 0
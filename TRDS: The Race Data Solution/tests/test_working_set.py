@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🧪 Race Working Set Tests
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Round trip of build_working_set and WorkingSet: rows come back with
+    their types and NULLs, and bib, RFID and participant ID lookups find
+    the right runner. The race's rows are served by a stand-in for
+    db_manager.execute_query.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from libraries.database import working_set
+from libraries.database.working_set import WorkingSet, WorkingSetStore, build_working_set
+
+RACE = {
+    'race_id': 12, 'race_name': 'Spring 5K', 'race_date': date(2024, 4, 20),
+    'chip_timing': True, 'entry_fee': Decimal('35.00'), 'archived_at': None,
+    'created_at': datetime(2024, 1, 5, 9, 30),
+}
+
+PARTICIPANTS = [
+    {'participant_id': 101, 'race_id': 12, 'first_name': 'Alice', 'last_name': 'Arnold', 'bib_number': '7',
+     'rfid_tag': 'e200-0007', 'city': 'Carmel', 'age_on_race_day': 34, 'cutoff': timedelta(minutes=45)},
+    {'participant_id': 102, 'race_id': 12, 'first_name': 'Bob', 'last_name': 'Bentley', 'bib_number': '70',
+     'rfid_tag': 'E200-0070', 'city': None, 'age_on_race_day': None, 'cutoff': None},
+    {'participant_id': 103, 'race_id': 12, 'first_name': 'José', 'last_name': 'Cortés', 'bib_number': '700',
+     'rfid_tag': None, 'city': 'Carmel', 'age_on_race_day': 51, 'cutoff': timedelta(seconds=1.5)},
+]
+
+BRACKETS = [
+    {'bracket_id': 1, 'race_id': 12, 'label': 'Under 40', 'min_age': 0, 'max_age': 39},
+    {'bracket_id': 2, 'race_id': 12, 'label': '40+', 'min_age': 40, 'max_age': 120},
+]
+
+@pytest.fixture
+def race_file(tmp_path, monkeypatch):
+    """Working set file built from the sample race."""
+    def execute_query(query, params=None):
+        assert params == (12,)
+        if 'FROM races' in query:
+            return [dict(RACE)]
+        if 'FROM participants' in query:
+            return [dict(row) for row in PARTICIPANTS]
+        if 'FROM age_group_brackets' in query:
+            return [dict(row) for row in BRACKETS]
+        raise AssertionError(f"Unexpected query {query}")
+
+    monkeypatch.setattr(working_set.db_manager, 'execute_query', execute_query)
+    monkeypatch.setattr(working_set, 'is_archived', lambda race_id: False)
+    return build_working_set(12, tmp_path / 'race_12.trws')
+
+@pytest.fixture
+def ws(race_file):
+    """Open working set."""
+    opened = WorkingSet(race_file)
+    yield opened
+    opened.close()
+
+def test_rows_round_trip_with_types(ws):
+    """Every row comes back as written, including types and NULLs."""
+    assert ws.race_id == 12
+    assert ws.race() == RACE
+    assert list(ws.rows('participants')) == PARTICIPANTS
+    assert list(ws.rows('age_group_brackets')) == BRACKETS
+    assert ws.count('participants') == 3
+
+def test_find_by_bib_is_exact(ws):
+    """Bib 7 is not confused with 70 or 700."""
+    assert ws.find('participants', 'bib_number', '7')['participant_id'] == 101
+    assert ws.find('participants', 'bib_number', ' 70 ')['participant_id'] == 102
+    assert ws.find('participants', 'bib_number', 700)['participant_id'] == 103
+    assert ws.find('participants', 'bib_number', '8') is None
+
+def test_find_by_rfid_normalizes_tags(ws):
+    """Tags match whatever case the reader reports."""
+    assert ws.find('participants', 'rfid_tag', 'E200-0007')['first_name'] == 'Alice'
+    assert ws.find('participants', 'rfid_tag', 'e200-0070')['first_name'] == 'Bob'
+    assert ws.find('participants', 'rfid_tag', None) is None
+
+def test_find_by_participant_id(ws):
+    """Participant IDs are indexed too."""
+    assert ws.find('participants', 'participant_id', 103)['last_name'] == 'Cortés'
+    assert ws.find('participants', 'participant_id', 999) is None
+
+def test_rejects_other_files(tmp_path):
+    """A file that is not a working set is refused."""
+    path = tmp_path / 'not_a_working_set.trws'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        WorkingSet(path)
+
+def test_store_serves_active_race(race_file):
+    """An activated working set is returned for its race until deactivated."""
+    store = WorkingSetStore()
+    store.activate(race_file)
+    assert store.get(12).race()['race_name'] == 'Spring 5K'
+    assert store.get(13) is None
+    store.deactivate(12)
+    assert store.get(12) is None
@@ -41,19 +41,15 @@ sys.path.insert(0, str(TRDS_DIR / 'libraries'))
 
 # Import from shared libraries
 from models.race import Race, race_manager
+from registration.mailer import EmailDispatcher, get_outbox_status, retry_failed
+from registration.payments import PaymentReconciler, get_payment_summary, write_unmatched
 from database.connection import db_manager
+from database.slow_queries import read_log
 from utils.config import config
-from utils.paths import paths
+from utils.log_setup import setup_logging
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(paths.get_log_dir('trrs') / 'console.log'),
-        logging.StreamHandler()
-    ]
-)
+# Set up logging: queued, rotated per LoggingConfig
+setup_logging('trrs', 'console.log')
 logger = logging.getLogger(__name__)
 
 class TRRSConsole:
@@ -136,9 +132,9 @@ class TRRSConsole:
         elif choice == '3':
             print("📊 Registration reports - Coming soon!")
         elif choice == '4':
-            print("💳 Payment management - Coming soon!")
+            self.payment_menu()
         elif choice == '5':
-            print("📧 Email communications - Coming soon!")
+            self.email_menu()
         elif choice == '6':
             self.settings_menu()
         elif choice == '0':
@@ -294,14 +290,171 @@ class TRRSConsole:
         except Exception as e:
             print(f"❌ Error: {e}")
     
+    def payment_menu(self):
+        """Payment management submenu."""
+        while True:
+            print("\n" + "─"*40)
+            print("💳 PAYMENT MANAGEMENT")
+            print("─"*40)
+            print("1. 📥 Import Settlement File")
+            print("2. 📊 Payment Summary")
+            print("0. ⬅️  Back")
+            
+            choice = input("\n🎯 Select option: ").strip()
+            
+            if choice == '1':
+                self.import_settlement()
+            elif choice == '2':
+                self.payment_summary()
+            elif choice == '0':
+                break
+            else:
+                print("❌ Invalid option")
+    
+    def import_settlement(self):
+        """Reconcile a processor settlement CSV."""
+        file_path = Path(input("\nSettlement CSV path: ").strip()).expanduser()
+        if not file_path.exists():
+            print("❌ File not found")
+            return
+        race_id = input("Race ID (Enter for all races): ").strip()
+        
+        try:
+            report = PaymentReconciler(int(race_id) if race_id else None).reconcile_file(file_path)
+            summary = report.summary()
+            print(f"\n✅ {summary['rows']} lines: {summary['updated']} updated, "
+                  f"{summary['unchanged']} unchanged, {summary['skipped']} skipped, "
+                  f"{summary['unmatched']} unmatched")
+            if report.unmatched:
+                unmatched_path = file_path.with_name(file_path.stem + '_unmatched.csv')
+                write_unmatched(report, unmatched_path)
+                print(f"📝 Unmatched lines saved to {unmatched_path}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    def payment_summary(self):
+        """Show payment totals for a race."""
+        race_id = input("\nEnter Race ID: ").strip()
+        
+        try:
+            rows = get_payment_summary(int(race_id))
+            if not rows:
+                print("\n📭 No participants found")
+                return
+            
+            print(f"\n{'Status':<12} {'Participants':>12} {'Total':>12}")
+            print("-"*38)
+            for row in rows:
+                print(f"{row['payment_status']:<12} {row['participants']:>12} ${row['total']:>11.2f}")
+        except Exception as e:
+            print(f"❌ Error: {e}")
+    
+    def email_menu(self):
+        """Email communications submenu."""
+        while True:
+            print("\n" + "─"*40)
+            print("📧 EMAIL COMMUNICATIONS")
+            print("─"*40)
+            print("1. 📊 Outbox Status")
+            print("2. 📤 Send Pending Now")
+            print("3. 🔁 Retry Failed")
+            print("0. ⬅️  Back")
+            
+            choice = input("\n🎯 Select option: ").strip()
+            
+            if choice == '1':
+                counts = get_outbox_status()
+                print(f"\n📬 Queued: {counts['queued']}  Sending: {counts['sending']}  "
+                      f"Sent: {counts['sent']}  Failed: {counts['failed']}")
+            elif choice == '2':
+                stats = EmailDispatcher().drain()
+                print(f"\n✅ Sent {stats['sent']}, retried {stats['retried']}, failed {stats['failed']}")
+            elif choice == '3':
+                print(f"\n🔁 Requeued {retry_failed()} failed emails")
+            elif choice == '0':
+                break
+            else:
+                print("❌ Invalid option")
+    
     def settings_menu(self):
         """Settings menu."""
-        print("\n⚙️ SETTINGS")
-        print("="*40)
-        print(f"Database: {'CLOUD' if self.db_status['is_cloud'] else 'LOCAL'}")
-        print(f"Host: {self.db_status['host']}")
-        print(f"Database: {self.db_status['database']}")
-        print(f"Connected: {'Yes' if self.db_status['connected'] else 'No'}")
+        while True:
+            print("\n⚙️ SETTINGS")
+            print("="*40)
+            print(f"Database: {'CLOUD' if self.db_status['is_cloud'] else 'LOCAL'}")
+            print(f"Host: {self.db_status['host']}")
+            print(f"Database: {self.db_status['database']}")
+            print(f"Connected: {'Yes' if self.db_status['connected'] else 'No'}")
+            print(f"Slow query threshold: {config.database.slow_query_ms:.0f}ms")
+            print("─"*40)
+            print("1. 🐢 Slow Queries (this console)")
+            print("2. 📜 Slow Query Log (all processes)")
+            print("0. ⬅️  Back")
+            
+            choice = input("\n🎯 Select option: ").strip()
+            
+            if choice == '1':
+                self.show_slow_queries()
+            elif choice == '2':
+                self.show_slow_query_log()
+            elif choice == '0':
+                break
+            else:
+                print("❌ Invalid option")
+    
+    def show_slow_queries(self):
+        """Show the slowest query fingerprints recorded by this process."""
+        db_manager.slow_queries.wait_idle()
+        top = db_manager.slow_queries.top()
+        if not top:
+            print("\n✅ No slow queries recorded")
+            return
+        
+        print(f"\n{'Fingerprint':<17} {'Count':>6} {'Mean':>9} {'Max':>9}  Query")
+        print("-"*80)
+        for stats in top:
+            print(f"{stats.fingerprint:<17} {stats.count:>6} {stats.mean_seconds * 1000:>7.0f}ms "
+                  f"{stats.max_seconds * 1000:>7.0f}ms  {stats.sql[:60]}")
+        
+        detail = input("\nFingerprint to show its plan (Enter to skip): ").strip()
+        for stats in top:
+            if stats.fingerprint == detail:
+                print(f"\n{stats.sql}")
+                for sample in stats.samples:
+                    print(f"  params: {sample}")
+                self.print_plan(stats.plan)
+    
+    def show_slow_query_log(self):
+        """Summarize slow_queries.log, which every TRMS process writes."""
+        rows = read_log()
+        if not rows:
+            print("\n✅ The slow query log is empty")
+            return
+        
+        print(f"\n{'Fingerprint':<17} {'Count':>6} {'Total':>9} {'Max':>9}  Query")
+        print("-"*80)
+        for row in rows:
+            print(f"{row['fingerprint']:<17} {row['count']:>6} {row['total_ms'] / 1000:>8.1f}s "
+                  f"{row['max_ms']:>7.0f}ms  {row['sql'][:60]}")
+        
+        detail = input("\nFingerprint to show its plan (Enter to skip): ").strip()
+        for row in rows:
+            if row['fingerprint'] == detail:
+                print(f"\n{row['sql']}")
+                self.print_plan(row['plan'])
+    
+    @staticmethod
+    def print_plan(plan):
+        """Print EXPLAIN rows."""
+        if not plan:
+            print("  (no plan captured)")
+            return
+        for step in plan:
+            if 'error' in step:
+                print(f"  EXPLAIN failed: {step['error']}")
+                continue
+            print(f"  {step.get('table')}: type={step.get('type')} key={step.get('key')} "
+                  f"rows={step.get('rows')} {step.get('Extra') or ''}")
     
     def cleanup(self):
         """Cleanup on exit."""
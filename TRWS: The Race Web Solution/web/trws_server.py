@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+"""
+═══════════════════════════════════════════════════════════════════════════════
+🌐 TRWS: The Race Web Solution - Application Server
+═══════════════════════════════════════════════════════════════════════════════
+
+📝 DESCRIPTION:
+    Launches the TRWS asyncio application server from the TRDS libraries.
+    Worker count and per-worker database pool size come from WebConfig.
+
+👤 AUTHOR: TRMS Development Team
+📅 CREATED: 2024
+🏷️ VERSION: 1.0.0
+
+═══════════════════════════════════════════════════════════════════════════════
+"""
+
+import sys
+import os
+from pathlib import Path
+
+# Find TRMS base directory and add TRDS to path
+def find_trms_base():
+    """Find TRMS base directory from current location."""
+    current = Path(__file__).resolve()
+    while current != current.parent:
+        for parent in current.parents:
+            if 'TRMS: The Race Management Solution' in parent.name:
+                return parent
+        current = current.parent
+    return Path(os.environ.get('TRMS_BASE', Path.cwd()))
+
+TRMS_BASE = find_trms_base()
+TRDS_DIR = TRMS_BASE / 'TRDS: The Race Data Solution'
+
+sys.path.insert(0, str(TRDS_DIR))
+
+from libraries.api.server import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+#!/bin/bash
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# 🏁 TRWS Server Launcher
+# ═══════════════════════════════════════════════════════════════════════════════
+
+# Detect if we're in Docker
+if [ -f /.dockerenv ]; then
+    echo "🐳 Running in Docker environment"
+    PYTHON_CMD="python3"
+else
+    echo "💻 Running in local environment"
+    
+    # Check for virtual environment
+    if [ -d "venv" ]; then
+        echo "🐍 Activating virtual environment..."
+        source venv/bin/activate
+        PYTHON_CMD="python"
+    elif [ -d ".venv" ]; then
+        echo "🐍 Activating virtual environment..."
+        source .venv/bin/activate
+        PYTHON_CMD="python"
+    else
+        PYTHON_CMD="python3"
+    fi
+fi
+
+# Set environment variables
+export TRMS_BASE="$(pwd)"
+export TRMS_ENV="${TRMS_ENV:-development}"
+
+# Run TRWS server
+echo "🌐 Starting TRWS: The Race Web Solution (Server)"
+echo "════════════════════════════════════════════════════════════"
+
+cd "TRWS: The Race Web Solution/web"
+$PYTHON_CMD trws_server.py "$@"